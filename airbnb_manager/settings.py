@@ -141,6 +141,47 @@ if CHANNELS_AVAILABLE:
             },
         }
 
+# Cache backend. Search indexes and version counters share it across workers
+# when Redis is configured. Local memory is per-process: fine for a single web
+# process on its own, but the scheduled commands (expire_booking_holds,
+# advance_booking_lifecycle, sync_ical_feeds, rebuild_*) bump versions the web
+# processes must see, so they refuse to run without a shared cache.
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', os.environ.get('REDIS_URL', '')).strip()
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'baystays-default',
+        },
+    }
+
+# Rolling window, in days, covered by the in-memory availability calendar.
+AVAILABILITY_WINDOW_DAYS = int(os.environ.get('AVAILABILITY_WINDOW_DAYS', '548'))
+
+# How long a cached explore result list may be served. Catalog writes retire
+# entries earlier by bumping the catalog version.
+SEARCH_RESULT_CACHE_SECONDS = int(os.environ.get('SEARCH_RESULT_CACHE_SECONDS', '300'))
+# Booking date picker quotes; booking and pricing writes retire them earlier.
+STAY_QUOTE_CACHE_SECONDS = int(os.environ.get('STAY_QUOTE_CACHE_SECONDS', '300'))
+# Unanswered pending bookings are released this long after they are made
+# (by `manage.py expire_booking_holds`); 0 keeps them until a host acts.
+BOOKING_HOLD_HOURS = int(os.environ.get('BOOKING_HOLD_HOURS', '24'))
+# Days after checkout before `manage.py advance_booking_lifecycle` completes a stay.
+BOOKING_AUTO_COMPLETE_DAYS = int(os.environ.get('BOOKING_AUTO_COMPLETE_DAYS', '2'))
+# Host live-poll fragments; host and booking announcements retire them earlier.
+HOST_LIVE_CACHE_SECONDS = int(os.environ.get('HOST_LIVE_CACHE_SECONDS', '60'))
+# Host occupancy/ADR/RevPAR series; booking and listing changes retire them earlier.
+HOST_ANALYTICS_CACHE_SECONDS = int(os.environ.get('HOST_ANALYTICS_CACHE_SECONDS', '900'))
+# Per-property iCal export feeds; booking and listing writes retire them earlier.
+ICAL_FEED_CACHE_SECONDS = int(os.environ.get('ICAL_FEED_CACHE_SECONDS', '3600'))
+
 # Database Configuration
 DATABASES = {
     'default': (
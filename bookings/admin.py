@@ -1,3 +1,22 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import CalendarFeed, ExternalBlock
+
+
+class ExternalBlockInline(admin.TabularInline):
+    model = ExternalBlock
+    extra = 0
+    fields = ['uid', 'check_in_date', 'check_out_date', 'summary']
+    readonly_fields = fields
+    can_delete = False
+
+
+class CalendarFeedAdmin(admin.ModelAdmin):
+    list_display = ['property', 'name', 'url', 'is_active', 'last_synced_at', 'last_error']
+    list_filter = ['is_active']
+    raw_id_fields = ['property']
+    readonly_fields = ['etag', 'last_modified', 'last_synced_at', 'last_error']
+    inlines = [ExternalBlockInline]
+
+
+admin.site.register(CalendarFeed, CalendarFeedAdmin)
@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .live import announce_booking_changes
+from .models import Booking, BookingPayment
+from .sync import notify_bookings_changed
+
+HOLD_RELEASE_BATCH_SIZE = 500
+
+
+def expired_holds(now=None):
+    """Pending bookings whose hold has lapsed. Paid requests are left for the host to answer."""
+    return Booking.objects.filter(
+        status='pending',
+        hold_expires_at__lte=now or timezone.now(),
+    ).exclude(payment_status='paid')
+
+
+def release_expired_holds(now=None, batch_size=HOLD_RELEASE_BATCH_SIZE):
+    """Cancel lapsed pending bookings in batches of set-based updates.
+
+    Unfinished M-Pesa charges on them are cancelled too. Each batch commits
+    on its own and sends one ``bookings_changed`` for its properties; live
+    pages hear once per property after the sweep. Returns
+    ``(bookings released, properties affected)``.
+    """
+    now = now or timezone.now()
+    released = 0
+    touched = []
+    while True:
+        rows = list(
+            expired_holds(now)
+            .order_by('hold_expires_at', 'id')
+            .values_list('id', 'property_id', 'property__owner_id', 'guest_id')[:batch_size]
+        )
+        if not rows:
+            break
+        with transaction.atomic():
+            # Re-select under lock so a booking confirmed or paid since the read
+            # keeps its hold and is neither notified nor announced.
+            locked = set(
+                expired_holds(now).filter(id__in=[row[0] for row in rows]).select_for_update().values_list('id', flat=True)
+            )
+            rows = [row for row in rows if row[0] in locked]
+            if rows:
+                booking_ids = [row[0] for row in rows]
+                released += Booking.objects.filter(id__in=booking_ids).update(
+                    status='cancelled',
+                    cancelled_at=now,
+                    hold_expires_at=None,
+                    updated_at=now,
+                )
+                BookingPayment.objects.filter(
+                    booking_id__in=booking_ids,
+                    status__in=['pending', 'initiated'],
+                ).update(
+                    status='cancelled',
+                    failure_reason='The booking request expired before payment completed.',
+                    updated_at=now,
+                )
+                notify_bookings_changed({row[1] for row in rows})
+        touched.extend(row[1:] for row in rows)
+    properties = announce_booking_changes(touched, message='booking-hold-expired') if touched else 0
+    return released, properties
@@ -0,0 +1,280 @@
+import hashlib
+import io
+import os
+import urllib.request
+from datetime import datetime, timedelta, timezone as dt_timezone
+from email.utils import format_datetime
+from urllib.error import HTTPError
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.versioning import get_versions
+from properties.models import Property
+from properties.pricing import pricing_version_namespace
+
+from .intervals import booking_version_namespace
+from .models import Booking, ExternalBlock
+from .sync import notify_bookings_changed
+
+ICAL_FEED_CACHE_SECONDS = getattr(settings, 'ICAL_FEED_CACHE_SECONDS', 3600)
+ICAL_FETCH_TIMEOUT = 20
+ICAL_LINE_OCTETS = 75
+
+
+def _escape(text):
+    return (
+        str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Split a content line into 75-octet chunks, continuation lines starting with a space."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= ICAL_LINE_OCTETS:
+        return line
+    chunks = []
+    limit = ICAL_LINE_OCTETS
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte character.
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        chunks.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = ICAL_LINE_OCTETS - 1
+    return '\r\n '.join(chunks)
+
+
+def _build_feed(property_id):
+    listing = Property.objects.filter(pk=property_id, is_active=True).values('name', 'updated_at').first()
+    if listing is None:
+        return False
+    bookings = list(
+        Booking.objects.filter(property_id=property_id, status__in=Booking.AVAILABILITY_BLOCKING_STATUSES)
+        .order_by('check_in_date', 'id')
+        .values('id', 'check_in_date', 'check_out_date', 'updated_at')
+    )
+    # Cancelled stays count too: a cancel drops the booking from the feed but
+    # must still move Last-Modified forward.
+    latest_booking = Booking.objects.filter(property_id=property_id).aggregate(latest=Max('updated_at'))['latest']
+    last_modified = max(filter(None, [listing['updated_at'], latest_booking]))
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//BayStays//Property Calendar//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f"X-WR-CALNAME:{_escape(listing['name'])} (BayStays)",
+    ]
+    # Only our own bookings go out: re-exporting imported blocks would echo
+    # another site's reservations back to it.
+    for row in bookings:
+        lines += [
+            'BEGIN:VEVENT',
+            f"UID:baystays-booking-{row['id']}@baystays",
+            f"DTSTAMP:{row['updated_at'].astimezone(dt_timezone.utc):%Y%m%dT%H%M%SZ}",
+            f"DTSTART;VALUE=DATE:{row['check_in_date']:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{row['check_out_date']:%Y%m%d}",
+            'SUMMARY:Reserved',
+            'TRANSP:OPAQUE',
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    body = ''.join(f'{_fold(line)}\r\n' for line in lines)
+    etag = f'"{hashlib.sha1(body.encode("utf-8")).hexdigest()}"'
+    # Last-Modified has one-second resolution and a deleted booking leaves no
+    # row behind, so a changed feed always gets a later whole second than the
+    # stamp clients were last given.
+    stamp_key = f'ical-feed-stamp:{property_id}'
+    previous = cache.get(stamp_key)
+    if previous and previous['etag'] != etag and int(last_modified.timestamp()) <= int(previous['last_modified'].timestamp()):
+        last_modified = max(timezone.now(), previous['last_modified'] + timedelta(seconds=1))
+    cache.set(stamp_key, {'etag': etag, 'last_modified': last_modified}, None)
+    return {
+        'body': body,
+        'etag': etag,
+        'last_modified': last_modified,
+    }
+
+
+def property_calendar_feed(property_id):
+    """``{'body', 'etag', 'last_modified'}`` of a property's iCal feed, or None for an unknown or inactive listing.
+
+    Cached under the property's booking and listing versions, so serving an
+    unchanged feed (or a 304 for it) never touches the database.
+    """
+    booking_namespace, listing_namespace = booking_version_namespace(property_id), pricing_version_namespace(property_id)
+    versions = get_versions([booking_namespace, listing_namespace])
+    key = f'ical-feed:{property_id}:{versions[booking_namespace]}:{versions[listing_namespace]}'
+    feed = cache.get(key)
+    if feed is None:
+        feed = _build_feed(property_id)
+        cache.set(key, feed, ICAL_FEED_CACHE_SECONDS)
+    return feed or None
+
+
+def _parse_date(value):
+    value = value.strip()
+    if 'T' in value:
+        moment = datetime.strptime(value.rstrip('Z')[:15], '%Y%m%dT%H%M%S')
+        if value.endswith('Z'):
+            moment = moment.replace(tzinfo=dt_timezone.utc).astimezone(timezone.get_current_timezone())
+        return moment.date()
+    return datetime.strptime(value[:8], '%Y%m%d').date()
+
+
+def _content_lines(lines):
+    """Unfold continuation lines while reading, yielding one logical line at a time."""
+    current = None
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t'):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def parse_events(lines):
+    """Yield ``{'uid', 'start', 'end', 'summary'}`` for each VEVENT in an iterable of ICS text lines.
+
+    Streams: only the event being read is held in memory. Timed events are
+    reduced to their dates, so a stay ending at 11:00 frees that night;
+    events without an end block one night and cancelled events are skipped.
+    """
+    event = None
+    for line in _content_lines(lines):
+        name, _, value = line.partition(':')
+        name = name.partition(';')[0].upper()
+        if name == 'BEGIN' and value.strip().upper() == 'VEVENT':
+            event = {}
+        elif name == 'END' and value.strip().upper() == 'VEVENT' and event is not None:
+            start, end = event.get('start'), event.get('end')
+            if start and event.get('status') != 'CANCELLED':
+                if end is None or end <= start:
+                    end = start + timedelta(days=1)
+                yield {
+                    'uid': event.get('uid') or f'{start:%Y%m%d}-{end:%Y%m%d}',
+                    'start': start,
+                    'end': end,
+                    'summary': event.get('summary', ''),
+                }
+            event = None
+        elif event is not None:
+            try:
+                if name == 'DTSTART':
+                    event['start'] = _parse_date(value)
+                elif name == 'DTEND':
+                    event['end'] = _parse_date(value)
+                elif name == 'UID':
+                    event['uid'] = value.strip()[:255]
+                elif name == 'SUMMARY':
+                    event['summary'] = value.replace('\\,', ',').replace('\\;', ';').replace('\\n', ' ')[:255]
+                elif name == 'STATUS':
+                    event['status'] = value.strip().upper()
+            except ValueError:
+                event = None
+
+
+def _local_path(url):
+    parsed = urlparse(url)
+    if parsed.scheme == 'file':
+        return unquote(parsed.path)
+    return url if not parsed.scheme or len(parsed.scheme) == 1 else None
+
+
+def open_feed(feed):
+    """Open ``feed`` for streaming, or return None when it has not changed since the last sync.
+
+    Returns ``(text stream, etag, last_modified)``. Remote feeds are asked
+    with ``If-None-Match`` / ``If-Modified-Since``; local files compare
+    their modification time.
+    """
+    path = _local_path(feed.url)
+    if path is not None:
+        last_modified = format_datetime(datetime.fromtimestamp(os.path.getmtime(path), dt_timezone.utc), usegmt=True)
+        if feed.last_modified == last_modified:
+            return None
+        return open(path, encoding='utf-8', errors='replace'), '', last_modified
+    request = urllib.request.Request(feed.url, headers={'User-Agent': 'BayStays calendar sync'})
+    if feed.etag:
+        request.add_header('If-None-Match', feed.etag)
+    if feed.last_modified:
+        request.add_header('If-Modified-Since', feed.last_modified)
+    try:
+        response = urllib.request.urlopen(request, timeout=ICAL_FETCH_TIMEOUT)
+    except HTTPError as error:
+        if error.code == 304:
+            return None
+        raise
+    stream = io.TextIOWrapper(response, encoding=response.headers.get_content_charset() or 'utf-8', errors='replace')
+    return stream, response.headers.get('ETag', ''), response.headers.get('Last-Modified', '')
+
+
+def sync_feed(feed, today=None):
+    """Import ``feed`` into its property's ``ExternalBlock`` rows, writing only what changed.
+
+    Events that ended before ``today`` are dropped. Returns
+    ``{'created', 'updated', 'deleted'}`` counts, all zero when the feed
+    was unchanged. Fetch and parse errors are recorded on the feed and
+    re-raised.
+    """
+    today = today or timezone.localdate()
+    counts = {'created': 0, 'updated': 0, 'deleted': 0}
+    try:
+        opened = open_feed(feed)
+        if opened is not None:
+            stream, etag, last_modified = opened
+            with stream:
+                events = {event['uid']: event for event in parse_events(stream) if event['end'] > today}
+    except (OSError, ValueError) as error:
+        feed.last_error = str(error)[:255]
+        feed.save(update_fields=['last_error'])
+        raise
+    feed.last_synced_at = timezone.now()
+    feed.last_error = ''
+    if opened is None:
+        feed.save(update_fields=['last_synced_at', 'last_error'])
+        return counts
+
+    with transaction.atomic():
+        existing = {
+            block.uid: block
+            for block in ExternalBlock.objects.filter(feed=feed).only('uid', 'check_in_date', 'check_out_date', 'summary')
+        }
+        stale = [block.id for uid, block in existing.items() if uid not in events]
+        created, updated = [], []
+        for uid, event in events.items():
+            block = existing.get(uid)
+            if block is None:
+                created.append(ExternalBlock(
+                    feed=feed,
+                    property_id=feed.property_id,
+                    uid=uid,
+                    check_in_date=event['start'],
+                    check_out_date=event['end'],
+                    summary=event['summary'],
+                ))
+            elif (block.check_in_date, block.check_out_date, block.summary) != (event['start'], event['end'], event['summary']):
+                block.check_in_date, block.check_out_date, block.summary = event['start'], event['end'], event['summary']
+                updated.append(block)
+        if stale:
+            ExternalBlock.objects.filter(id__in=stale).delete()
+        ExternalBlock.objects.bulk_create(created)
+        ExternalBlock.objects.bulk_update(updated, ['check_in_date', 'check_out_date', 'summary'])
+        feed.etag, feed.last_modified = etag, last_modified
+        feed.save(update_fields=['etag', 'last_modified', 'last_synced_at', 'last_error'])
+        counts = {'created': len(created), 'updated': len(updated), 'deleted': len(stale)}
+        if any(counts.values()):
+            notify_bookings_changed([feed.property_id])
+    return counts
@@ -0,0 +1,135 @@
+import bisect
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.dispatch import receiver
+
+from core.versioning import bump_version, get_version, get_versions
+
+from .models import Booking, ExternalBlock
+from .sync import bookings_changed
+
+INTERVAL_CACHE_SIZE = 1024
+
+
+def booking_version_namespace(property_id):
+    return f'booking-intervals:{property_id}'
+
+
+class BookingIntervals:
+    """Blocking bookings of one property, sorted by check-in.
+
+    Blocks imported from calendar feeds are rows too, with ``id`` and
+    ``guest_id`` of None and status ``'blocked'``.
+
+    ``_reach[i]`` is the latest check-out among the first ``i + 1``
+    bookings, so an overlap query bisects to the last booking starting
+    before the stay ends and walks back only while bookings can still reach
+    into it: O(log n + k) for k overlaps.
+    """
+
+    def __init__(self, rows):
+        self._rows = sorted(rows, key=lambda row: (row['check_in_date'], row['id'] or 0))
+        self._starts = [row['check_in_date'] for row in self._rows]
+        self._reach = []
+        latest = None
+        for row in self._rows:
+            latest = row['check_out_date'] if latest is None else max(latest, row['check_out_date'])
+            self._reach.append(latest)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def overlapping(self, check_in, check_out):
+        """Bookings whose stay shares at least one night with ``[check_in, check_out)``."""
+        matches = []
+        index = bisect.bisect_left(self._starts, check_out) - 1
+        while index >= 0 and self._reach[index] > check_in:
+            if self._rows[index]['check_out_date'] > check_in:
+                matches.append(self._rows[index])
+            index -= 1
+        matches.reverse()
+        return matches
+
+    def has_conflict(self, check_in, check_out, exclude_id=None, guest_id=None):
+        """True when a booking overlaps the stay, optionally ignoring one booking or limiting to one guest."""
+        return any(
+            (exclude_id is None or row['id'] != exclude_id) and (guest_id is None or row['guest_id'] == guest_id)
+            for row in self.overlapping(check_in, check_out)
+        )
+
+    def next_free_start(self, nights, earliest, exclude_id=None):
+        """First date on or after ``earliest`` that starts ``nights`` free nights."""
+        start = earliest
+        # Bookings before this index all check out by ``earliest``.
+        index = bisect.bisect_right(self._reach, earliest)
+        for row in self._rows[index:]:
+            if (exclude_id is not None and row['id'] == exclude_id) or row['check_out_date'] <= start:
+                continue
+            if row['check_in_date'] >= start + timedelta(days=nights):
+                break
+            start = row['check_out_date']
+        return start
+
+    def ranges(self, limit=None):
+        """``{'check_in_date', 'check_out_date', 'status'}`` dicts in check-in order."""
+        rows = self._rows if limit is None else self._rows[:limit]
+        return [
+            {'check_in_date': row['check_in_date'], 'check_out_date': row['check_out_date'], 'status': row['status']}
+            for row in rows
+        ]
+
+
+class IntervalCache:
+    """Process-local LRU of ``BookingIntervals`` keyed by property, each checked against its own version."""
+
+    def __init__(self, size=INTERVAL_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, property_id):
+        version = get_version(booking_version_namespace(property_id))
+        with self._lock:
+            entry = self._entries.get(property_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(property_id)
+                return entry[1]
+        rows = Booking.objects.filter(
+            property_id=property_id,
+            status__in=Booking.AVAILABILITY_BLOCKING_STATUSES,
+        ).values('id', 'guest_id', 'check_in_date', 'check_out_date', 'status')
+        blocks = ExternalBlock.objects.filter(property_id=property_id).values('check_in_date', 'check_out_date')
+        intervals = BookingIntervals([
+            *rows,
+            *({**block, 'id': None, 'guest_id': None, 'status': 'blocked'} for block in blocks),
+        ])
+        with self._lock:
+            self._entries[property_id] = (version, intervals)
+            self._entries.move_to_end(property_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return intervals
+
+    def invalidate(self, property_ids):
+        for property_id in property_ids:
+            bump_version(booking_version_namespace(property_id))
+
+
+_cache = IntervalCache()
+
+
+def get_booking_intervals(property_id):
+    return _cache.get(property_id)
+
+
+def booking_versions(property_ids):
+    """``{property_id: version}`` of each property's bookings, in one cache round trip."""
+    versions = get_versions(booking_version_namespace(property_id) for property_id in property_ids)
+    return {property_id: versions[booking_version_namespace(property_id)] for property_id in property_ids}
+
+
+@receiver(bookings_changed)
+def invalidate_booking_intervals(sender, property_ids, **kwargs):
+    _cache.invalidate(property_ids)
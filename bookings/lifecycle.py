@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .live import announce_booking_changes
+from .models import Booking
+from .sync import notify_bookings_changed
+
+LIFECYCLE_BATCH_SIZE = 500
+
+
+def scheduled_transitions(today, complete_after_days):
+    """``(from status, to status, timestamp field, eligible filter)`` steps, applied in this order."""
+    settled = today - timedelta(days=complete_after_days)
+    return (
+        ('checked_in', 'checked_out', 'checked_out_at', {'check_out_date__lt': today}),
+        ('checked_out', 'completed', 'completed_at', {'check_out_date__lte': settled}),
+        # Stays the host never checked in are settled the same way once checkout is long past.
+        ('confirmed', 'completed', 'completed_at', {'check_out_date__lte': settled}),
+    )
+
+
+def advance_booking_lifecycle(now=None, complete_after_days=None, batch_size=LIFECYCLE_BATCH_SIZE, dry_run=False):
+    """Move bookings along their lifecycle by date with chunked set-based updates.
+
+    Each chunk commits on its own with one ``bookings_changed`` for its
+    properties; live pages hear once per host after the run. Returns
+    ``{'from->to': count}``.
+    """
+    now = now or timezone.now()
+    if complete_after_days is None:
+        complete_after_days = getattr(settings, 'BOOKING_AUTO_COMPLETE_DAYS', 2)
+    counts = {}
+    touched = []
+    for from_status, to_status, stamp_field, eligible in scheduled_transitions(timezone.localdate(now), complete_after_days):
+        label = f'{from_status}->{to_status}'
+        queryset = Booking.objects.filter(status=from_status, **eligible)
+        if dry_run:
+            counts[label] = queryset.count()
+            continue
+        counts[label] = 0
+        while True:
+            rows = list(queryset.order_by('id').values_list('id', 'property_id', 'property__owner_id', 'guest_id')[:batch_size])
+            if not rows:
+                break
+            with transaction.atomic():
+                counts[label] += queryset.filter(id__in=[row[0] for row in rows]).update(
+                    status=to_status,
+                    updated_at=now,
+                    **{stamp_field: now},
+                )
+                notify_bookings_changed({row[1] for row in rows})
+            touched.extend(row[1:] for row in rows)
+    if touched:
+        announce_booking_changes(touched, message='booking-lifecycle', per='host')
+    return counts
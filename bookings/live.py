@@ -0,0 +1,54 @@
+from django.db import transaction
+
+from core.realtime import announce_live_update
+from core.versioning import bump_version
+
+
+def host_live_version_namespace(owner_id):
+    return f'host-live:{owner_id}'
+
+
+def bump_host_live_versions(owner_ids):
+    """Retire the hosts' cached live fragments once the current transaction commits."""
+    owner_ids = sorted({owner_id for owner_id in owner_ids if owner_id})
+
+    def bump():
+        for owner_id in owner_ids:
+            bump_version(host_live_version_namespace(owner_id))
+
+    if owner_ids:
+        transaction.on_commit(bump)
+
+
+def booking_live_groups(guest_ids, property_id=None, owner_id=None):
+    """Live-update groups that render bookings of these guests, listing and host."""
+    groups = [f'guest-bookings-{guest_id}' for guest_id in guest_ids]
+    if property_id:
+        groups.append(f'property-{property_id}')
+    if owner_id:
+        groups.extend([
+            f'host-dashboard-{owner_id}',
+            f'host-listings-{owner_id}',
+            f'host-bookings-{owner_id}',
+        ])
+    return groups
+
+
+def announce_booking_changes(rows, message='booking-updated', per='property'):
+    """Fan out live updates for many changed bookings with one announcement per property (or per host).
+
+    ``rows`` are ``(property_id, owner_id, guest_id)`` tuples, one per booking.
+    """
+    batches = {}
+    rows = list(rows)
+    bump_host_live_versions(owner_id for _, owner_id, _ in rows)
+    for property_id, owner_id, guest_id in rows:
+        key = property_id if per == 'property' else owner_id
+        batch = batches.setdefault(key, {'owner_id': owner_id, 'property_ids': set(), 'guest_ids': set()})
+        batch['property_ids'].add(property_id)
+        batch['guest_ids'].add(guest_id)
+    for batch in batches.values():
+        groups = booking_live_groups(sorted(batch['guest_ids']), owner_id=batch['owner_id'])
+        groups.extend(f'property-{property_id}' for property_id in sorted(batch['property_ids']))
+        announce_live_update(groups + ['public-explore'], message=message)
+    return len(batches)
@@ -0,0 +1,27 @@
+from bookings.lifecycle import LIFECYCLE_BATCH_SIZE, advance_booking_lifecycle
+from core.management.base import SharedCacheCommand
+
+
+class Command(SharedCacheCommand):
+    help = (
+        'Check out stays whose checkout date has passed and complete stays that ended '
+        'BOOKING_AUTO_COMPLETE_DAYS ago. Meant to run daily.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=LIFECYCLE_BATCH_SIZE)
+        parser.add_argument('--complete-after-days', type=int, default=None)
+        parser.add_argument('--dry-run', action='store_true', help='Only count the bookings each step would move.')
+
+    def requires_shared_cache(self, options):
+        return not options['dry_run']
+
+    def handle(self, *args, **options):
+        counts = advance_booking_lifecycle(
+            complete_after_days=options['complete_after_days'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        verb = 'Would move' if options['dry_run'] else 'Moved'
+        for label, count in counts.items():
+            self.stdout.write(f'{verb} {count} bookings {label.replace("->", " to ")}.')
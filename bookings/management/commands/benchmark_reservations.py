@@ -0,0 +1,147 @@
+import random
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from bookings.models import Booking
+from bookings.reservations import ReservationConflict, overlapping_bookings, reserve_booking
+from properties.models import Property
+from users.models import CustomUser
+
+STAY_NIGHTS = 2
+
+
+def _count_double_bookings(property_ids):
+    """Pairs of active bookings on the same property that share a night."""
+    rows = Booking.objects.filter(
+        property_id__in=property_ids,
+        status__in=Booking.AVAILABILITY_BLOCKING_STATUSES,
+    ).order_by('property_id', 'check_in_date').values_list('property_id', 'check_in_date', 'check_out_date')
+    doubles = 0
+    active = []
+    current_property = None
+    for property_id, check_in, check_out in rows:
+        if property_id != current_property:
+            current_property, active = property_id, []
+        active = [end for end in active if end > check_in]
+        doubles += len(active)
+        active.append(check_out)
+    return doubles
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire parallel booking requests at a few throwaway properties and report '
+        'throughput and how many overlapping bookings got through. Writes to the '
+        'configured database and deletes its fixtures afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=200, help='Booking attempts to make.')
+        parser.add_argument('--properties', type=int, default=4, help='Properties the attempts are spread over.')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent threads, each with its own connection.')
+        parser.add_argument('--slots', type=int, default=10, help='Distinct check-in days per property; fewer means more contention.')
+        parser.add_argument('--unlocked', action='store_true', help='Use a plain check-then-save instead of the locked reservation path.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        host = CustomUser.objects.create_user(username=f'bench-host-{tag}', email=f'bench-host-{tag}@example.com', role='host')
+        guest = CustomUser.objects.create_user(username=f'bench-guest-{tag}', email=f'bench-guest-{tag}@example.com', role='guest')
+        try:
+            property_ids = [
+                Property.objects.create(
+                    owner=host,
+                    name=f'Benchmark listing {tag}-{index}',
+                    description='Reservation benchmark fixture.',
+                    property_type='apartment',
+                    address='Benchmark',
+                    city='Benchmark',
+                    state='Benchmark',
+                    price_per_night=1000,
+                    max_guests=2,
+                    bedrooms=1,
+                    bathrooms=1,
+                    is_active=False,
+                ).id
+                for index in range(max(options['properties'], 1))
+            ]
+            self._run(guest, property_ids, options)
+        finally:
+            Property.objects.filter(owner=host).delete()
+            host.delete()
+            guest.delete()
+
+    def _run(self, guest, property_ids, options):
+        rng = random.Random(options['seed'])
+        first_day = timezone.localdate() + timedelta(days=30)
+        attempts = [
+            (rng.choice(property_ids), first_day + timedelta(days=rng.randrange(max(options['slots'], 1))))
+            for _ in range(options['bookings'])
+        ]
+        book = self._book_unlocked if options['unlocked'] else self._book_locked
+        outcomes = {'reserved': 0, 'conflicts': 0, 'errors': 0}
+        tally = threading.Lock()
+        queue = list(reversed(attempts))
+
+        def worker():
+            try:
+                while True:
+                    with tally:
+                        if not queue:
+                            return
+                        property_id, check_in = queue.pop()
+                    booking = Booking(
+                        guest=guest,
+                        property_id=property_id,
+                        check_in_date=check_in,
+                        check_out_date=check_in + timedelta(days=STAY_NIGHTS),
+                        num_guests=1,
+                        total_price=1000 * STAY_NIGHTS,
+                    )
+                    try:
+                        outcome = 'reserved' if book(booking) else 'conflicts'
+                    except DatabaseError:
+                        outcome = 'errors'
+                    with tally:
+                        outcomes[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(max(options['workers'], 1))]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        doubles = _count_double_bookings(property_ids)
+        mode = 'unlocked check-then-save' if options['unlocked'] else 'locked reservation'
+        self.stdout.write(
+            f'{mode} on {connection.vendor}: {len(attempts)} attempts over {len(property_ids)} properties '
+            f'with {len(threads)} workers in {elapsed:.2f}s ({len(attempts) / elapsed if elapsed else 0:.1f} attempts/s)'
+        )
+        self.stdout.write(
+            f"reserved {outcomes['reserved']}, rejected {outcomes['conflicts']}, database errors {outcomes['errors']}"
+        )
+        style = self.style.ERROR if doubles else self.style.SUCCESS
+        self.stdout.write(style(f'Double bookings: {doubles}'))
+
+    def _book_locked(self, booking):
+        try:
+            reserve_booking(booking)
+        except ReservationConflict:
+            return False
+        return True
+
+    def _book_unlocked(self, booking):
+        if overlapping_bookings(booking.property_id, booking.check_in_date, booking.check_out_date).exists():
+            return False
+        booking.save()
+        return True
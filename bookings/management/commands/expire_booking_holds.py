@@ -0,0 +1,23 @@
+import time
+
+from bookings.holds import HOLD_RELEASE_BATCH_SIZE, release_expired_holds
+from core.management.base import SharedCacheCommand
+
+
+class Command(SharedCacheCommand):
+    help = (
+        'Cancel pending booking requests whose hold has expired so their dates open up again. '
+        'Run it from cron every few minutes, or leave it running with --interval.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=HOLD_RELEASE_BATCH_SIZE)
+        parser.add_argument('--interval', type=int, default=0, help='Keep sweeping every N seconds instead of exiting.')
+
+    def handle(self, *args, **options):
+        while True:
+            released, properties = release_expired_holds(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Released {released} expired holds across {properties} properties.'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+import time
+
+from bookings.ical import sync_feed
+from bookings.models import CalendarFeed
+from core.management.base import SharedCacheCommand
+
+
+class Command(SharedCacheCommand):
+    help = (
+        'Import external iCal feeds as blocked dates, writing only the ranges that changed. '
+        'Run it from cron, or leave it running with --interval.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--feed', type=int, action='append', dest='feeds', help='Only sync this feed id; repeatable.')
+        parser.add_argument('--interval', type=int, default=0, help='Keep syncing every N seconds instead of exiting.')
+
+    def handle(self, *args, **options):
+        while True:
+            feeds = CalendarFeed.objects.filter(is_active=True).select_related('property')
+            if options['feeds']:
+                feeds = feeds.filter(id__in=options['feeds'])
+            for feed in feeds:
+                try:
+                    counts = sync_feed(feed)
+                except (OSError, ValueError) as error:
+                    self.stderr.write(self.style.ERROR(f'{feed}: {error}'))
+                    continue
+                self.stdout.write(
+                    f"{feed}: {counts['created']} added, {counts['updated']} changed, {counts['deleted']} removed"
+                )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
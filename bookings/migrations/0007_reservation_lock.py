@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_booking_cancelled_at_booking_checked_in_at_and_more'),
+        ('properties', '0017_property_ranking_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationLock',
+            fields=[
+                ('property', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='reservation_lock', serialize=False, to='properties.property')),
+                ('acquired_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_booking_hold_expires_at'),
+        ('properties', '0018_pricing_rule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarFeed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('url', models.CharField(max_length=500)),
+                ('is_active', models.BooleanField(default=True)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.CharField(blank=True, max_length=100)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_feeds', to='properties.property')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ExternalBlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uid', models.CharField(max_length=255)),
+                ('check_in_date', models.DateField()),
+                ('check_out_date', models.DateField()),
+                ('summary', models.CharField(blank=True, max_length=255)),
+                ('feed', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocks', to='bookings.calendarfeed')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='external_blocks', to='properties.property')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['property', 'check_in_date'], name='bookings_ex_propert_6e8704_idx')],
+                'constraints': [models.UniqueConstraint(fields=('feed', 'uid'), name='unique_external_block_uid')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0009_calendar_feeds'),
+        ('properties', '0018_pricing_rule'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['property', '-created_at', '-id'], name='booking_property_recent_idx'),
+        ),
+    ]
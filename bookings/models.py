@@ -1,6 +1,11 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 import builtins
 from properties.models import Property
+from properties.pricing import stay_price
 from users.models import CustomUser
 
 # bookings/models.py - Add these features
@@ -14,6 +19,7 @@ class Booking(models.Model):
     )
 
     REVENUE_ACTIVE_STATUSES = ['confirmed', 'checked_in', 'checked_out', 'completed']
+    AVAILABILITY_BLOCKING_STATUSES = ['confirmed', 'pending', 'checked_in']
 
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -39,18 +45,26 @@ class Booking(models.Model):
     checked_out_at = models.DateTimeField(blank=True, null=True)
     completed_at = models.DateTimeField(blank=True, null=True)
     cancelled_at = models.DateTimeField(blank=True, null=True)
+    # Pending requests stop blocking the calendar after this; see bookings.holds.
+    hold_expires_at = models.DateTimeField(blank=True, null=True, db_index=True)
     
     # Payment fields
     payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS_CHOICES, default='pending')
     payment_intent_id = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        # Serves the hosts' newest-first keyset pages per listing.
+        indexes = [models.Index(fields=['property', '-created_at', '-id'], name='booking_property_recent_idx')]
     
     def calculate_total_price(self):
-        nights = (self.check_out_date - self.check_in_date).days
-        return nights * self.property.price_per_night
+        return stay_price(self.property, self.check_in_date, self.check_out_date)
     
     def save(self, *args, **kwargs):
         if not self.total_price:
             self.total_price = self.calculate_total_price()
+        hold_hours = getattr(settings, 'BOOKING_HOLD_HOURS', 24)
+        if self._state.adding and self.status == 'pending' and self.hold_expires_at is None and hold_hours:
+            self.hold_expires_at = timezone.now() + timedelta(hours=hold_hours)
         super().save(*args, **kwargs)
 
     @builtins.property
@@ -136,3 +150,56 @@ class Review(models.Model):
     
     def __str__(self):
         return f"Review for {self.booking.property.name}"
+
+
+class ReservationLock(models.Model):
+    """One row per property, written first by a reservation so SQLite serializes competing writers."""
+
+    property = models.OneToOneField(Property, on_delete=models.CASCADE, primary_key=True, related_name='reservation_lock')
+    acquired_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Reservation lock for property {self.property_id}"
+
+
+class CalendarFeed(models.Model):
+    """An iCal feed from another listing site whose events block this property's nights."""
+
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='calendar_feeds')
+    name = models.CharField(max_length=100, blank=True)
+    # http(s)://, file:// or a plain path on the server.
+    url = models.CharField(max_length=500)
+    is_active = models.BooleanField(default=True)
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=100, blank=True)
+    last_synced_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name or self.url} for {self.property.name}"
+
+
+class ExternalBlock(models.Model):
+    """A date range imported from a calendar feed; blocks availability like an active booking."""
+
+    feed = models.ForeignKey(CalendarFeed, on_delete=models.CASCADE, related_name='blocks')
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='external_blocks')
+    uid = models.CharField(max_length=255)
+    check_in_date = models.DateField()
+    check_out_date = models.DateField()
+    summary = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['feed', 'uid'], name='unique_external_block_uid')]
+        indexes = [models.Index(fields=['property', 'check_in_date'])]
+
+    def __str__(self):
+        return f"{self.property.name} blocked {self.check_in_date} - {self.check_out_date}"
+
+
+def blocked_stays(**filters):
+    """``(property_id, check_in_date, check_out_date)`` of blocking bookings and imported blocks matching ``filters``."""
+    fields = ('property_id', 'check_in_date', 'check_out_date')
+    bookings = Booking.objects.filter(status__in=Booking.AVAILABILITY_BLOCKING_STATUSES, **filters).values_list(*fields)
+    return bookings.union(ExternalBlock.objects.filter(**filters).values_list(*fields), all=True)
@@ -0,0 +1,242 @@
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.versioning import bump_version, get_version
+
+from .models import blocked_stays
+from .sync import bookings_changed
+
+OCCUPANCY_VERSION_NAMESPACE = 'booking-occupancy'
+DEFAULT_FLEXIBLE_START_LIMIT = 3
+
+
+def _free_run_starts(booked_bits, nights, span):
+    """Bitset of offsets ``s`` in ``[0, span - nights]`` whose ``nights`` nights are all free.
+
+    ANDs the free-night bitset with shifted copies of itself, doubling the
+    covered run each step, so a stay length costs O(log nights) big-int ops.
+    """
+    if nights <= 0 or nights > span:
+        return 0
+    runs = ~booked_bits & ((1 << span) - 1)
+    covered = 1
+    while covered < nights:
+        step = min(covered, nights - covered)
+        runs &= runs >> step
+        covered += step
+    return runs & ((1 << (span - nights + 1)) - 1)
+
+
+def _first_offsets(bits, limit):
+    offsets = []
+    while bits and len(offsets) < limit:
+        lowest = bits & -bits
+        offsets.append(lowest.bit_length() - 1)
+        bits ^= lowest
+    return offsets
+
+
+class OccupancyCalendar:
+    """Per-property night occupancy bitsets over a rolling window starting today.
+
+    Bit ``n`` of a property's bitset is set when the night of
+    ``window_start + n`` is held by a booking that blocks availability or by
+    a block imported from a calendar feed, so a
+    date-range check is a single AND against a precomputed mask.
+    """
+
+    def __init__(self, window_days):
+        self.window_days = window_days
+        self.window_start = None
+        self.version = None
+        self._bits = {}
+        self._lock = threading.RLock()
+
+    @property
+    def window_end(self):
+        return self.window_start + timedelta(days=self.window_days)
+
+    def _stay_mask(self, check_in, check_out):
+        start = max(check_in, self.window_start)
+        end = min(check_out, self.window_end)
+        if end <= start:
+            return 0
+        offset = (start - self.window_start).days
+        return ((1 << (end - start).days) - 1) << offset
+
+    def _blocking_stays(self, window_start, window_end, **filters):
+        return blocked_stays(check_in_date__lt=window_end, check_out_date__gt=window_start, **filters)
+
+    def rebuild(self):
+        # Read the version before the bookings so a write that lands while we
+        # load leaves us behind the counter and triggers another rebuild.
+        version = get_version(OCCUPANCY_VERSION_NAMESPACE)
+        window_start = timezone.localdate()
+        window_end = window_start + timedelta(days=self.window_days)
+        with self._lock:
+            self.window_start = window_start
+            bits = {}
+            for property_id, check_in, check_out in self._blocking_stays(window_start, window_end).iterator():
+                bits[property_id] = bits.get(property_id, 0) | self._stay_mask(check_in, check_out)
+            self._bits = bits
+            self.version = version
+
+    def ensure_fresh(self):
+        if self.window_start != timezone.localdate() or self.version != get_version(OCCUPANCY_VERSION_NAMESPACE):
+            self.rebuild()
+
+    def refresh_properties(self, property_ids):
+        """Reload the bitsets of a handful of properties after their bookings changed."""
+        with self._lock:
+            if self.window_start is None:
+                return
+            rows = self._blocking_stays(self.window_start, self.window_end, property_id__in=property_ids)
+            bits = dict.fromkeys(property_ids, 0)
+            for property_id, check_in, check_out in rows:
+                bits[property_id] |= self._stay_mask(check_in, check_out)
+            for property_id, value in bits.items():
+                if value:
+                    self._bits[property_id] = value
+                else:
+                    self._bits.pop(property_id, None)
+
+    def apply_changes(self, property_ids):
+        previous = self.version
+        current = bump_version(OCCUPANCY_VERSION_NAMESPACE)
+        if previous is not None and current == previous + 1:
+            self.refresh_properties(property_ids)
+            self.version = current
+        else:
+            # Another process moved the counter too; rebuild lazily on next read.
+            self.version = None
+
+    def covers(self, check_in, check_out):
+        self.ensure_fresh()
+        return self.window_start <= check_in < check_out <= self.window_end
+
+    def booked_property_ids(self, check_in, check_out):
+        """Return ids of properties with a blocking booking inside the stay, or None outside the window."""
+        if not self.covers(check_in, check_out):
+            return None
+        mask = self._stay_mask(check_in, check_out)
+        with self._lock:
+            return {property_id for property_id, bits in self._bits.items() if bits & mask}
+
+    def booked_bits(self, property_ids, window_start, window_end):
+        """``{property_id: bits}`` for nights from ``window_start``, or None outside the window."""
+        if not self.covers(window_start, window_end):
+            return None
+        offset = (window_start - self.window_start).days
+        span_mask = (1 << (window_end - window_start).days) - 1
+        with self._lock:
+            return {
+                property_id: (self._bits.get(property_id, 0) >> offset) & span_mask
+                for property_id in property_ids
+            }
+
+    def is_available(self, property_id, check_in, check_out):
+        return self.available_many([(property_id, check_in, check_out)])[0]
+
+    def available_many(self, checks):
+        """Answer ``(property_id, check_in, check_out)`` checks in one pass.
+
+        Each answer is True/False, or None when that stay falls outside the window.
+        """
+        self.ensure_fresh()
+        with self._lock:
+            return [
+                not (self._bits.get(property_id, 0) & self._stay_mask(check_in, check_out))
+                if self.window_start <= check_in < check_out <= self.window_end else None
+                for property_id, check_in, check_out in checks
+            ]
+
+
+_calendar = OccupancyCalendar(getattr(settings, 'AVAILABILITY_WINDOW_DAYS', 548))
+
+
+def get_occupancy_calendar():
+    return _calendar
+
+
+def booked_property_ids(check_in, check_out):
+    """Ids of properties that cannot take a stay from ``check_in`` to ``check_out``.
+
+    Served from the in-memory calendar when the stay falls inside its window,
+    otherwise from a single bookings query.
+    """
+    booked = _calendar.booked_property_ids(check_in, check_out)
+    if booked is not None:
+        return booked
+    return {row[0] for row in blocked_stays(check_in_date__lt=check_out, check_out_date__gt=check_in)}
+
+
+def _booked_bits(property_ids, window_start, window_end):
+    """``{property_id: bits}`` of booked nights from the calendar, or from one bookings query outside it."""
+    booked = _calendar.booked_bits(property_ids, window_start, window_end)
+    if booked is not None:
+        return booked
+    span = (window_end - window_start).days
+    booked = dict.fromkeys(property_ids, 0)
+    rows = blocked_stays(property_id__in=property_ids, check_in_date__lt=window_end, check_out_date__gt=window_start)
+    for property_id, check_in, check_out in rows:
+        start = max((check_in - window_start).days, 0)
+        end = min((check_out - window_start).days, span)
+        booked[property_id] |= ((1 << (end - start)) - 1) << start
+    return booked
+
+
+def _run_lengths(bits, span):
+    """Alternating free/booked run lengths over ``span`` nights, starting with a (possibly empty) free run."""
+    runs = []
+    position = 0
+    booked = False
+    while position < span:
+        rest = bits >> position
+        if booked:
+            rest = ~rest
+        # Trailing zeros of ``rest`` are the nights left in the current run.
+        length = (rest & -rest).bit_length() - 1 if rest else span
+        length = min(length, span - position)
+        runs.append(length)
+        position += length
+        booked = not booked
+    return runs
+
+
+def occupancy_runs(property_ids, window_start, window_end):
+    """Run-length encoded nights from ``window_start`` for each property: ``{property_id: [free, booked, free, ...]}``."""
+    property_ids = list(property_ids)
+    span = (window_end - window_start).days
+    if not property_ids or span <= 0:
+        return {}
+    booked = _booked_bits(property_ids, window_start, window_end)
+    return {property_id: _run_lengths(booked[property_id], span) for property_id in property_ids}
+
+
+def earliest_stay_starts(property_ids, nights, window_start, window_end, limit=DEFAULT_FLEXIBLE_START_LIMIT):
+    """Earliest start dates for a ``nights``-night stay that fits inside ``[window_start, window_end)``.
+
+    Returns ``{property_id: [date, ...]}`` for the properties that have at
+    least one feasible start, at most ``limit`` dates each. Nights come from
+    the calendar, or from one bookings query when the window lies outside it.
+    """
+    property_ids = list(property_ids)
+    span = (window_end - window_start).days
+    if not property_ids or nights <= 0 or span < nights:
+        return {}
+    booked = _booked_bits(property_ids, window_start, window_end)
+    starts = {}
+    for property_id, bits in booked.items():
+        offsets = _first_offsets(_free_run_starts(bits, nights, span), limit)
+        if offsets:
+            starts[property_id] = [window_start + timedelta(days=offset) for offset in offsets]
+    return starts
+
+
+@receiver(bookings_changed)
+def refresh_occupancy(sender, property_ids, **kwargs):
+    _calendar.apply_changes(property_ids)
@@ -0,0 +1,100 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from properties.models import Property
+
+from .models import Booking, ExternalBlock, ReservationLock
+
+
+class ReservationConflict(Exception):
+    """The requested dates were taken before the reservation could be written."""
+
+
+class _PropertyLocks:
+    """Process-local mutex per property; entries are dropped once nobody holds or waits on them."""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks = {}
+
+    @contextmanager
+    def hold(self, property_id):
+        with self._guard:
+            entry = self._locks.setdefault(property_id, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[property_id]
+
+
+_process_locks = _PropertyLocks()
+
+
+def _lock_row(property_id):
+    # Writing first takes SQLite's write lock before any availability read,
+    # so another process cannot check the same dates in between.
+    if ReservationLock.objects.filter(property_id=property_id).update(acquired_at=timezone.now()):
+        return
+    try:
+        with transaction.atomic():
+            ReservationLock.objects.create(property_id=property_id, acquired_at=timezone.now())
+    except IntegrityError:
+        ReservationLock.objects.filter(property_id=property_id).update(acquired_at=timezone.now())
+
+
+@contextmanager
+def property_lock(property_id):
+    """Serialize reservations for one property; other properties are not blocked.
+
+    Opens a transaction and holds the property's Property row lock
+    (``SELECT ... FOR UPDATE``) where the database supports it, or a
+    process mutex plus a write to its ``ReservationLock`` row on SQLite.
+    Locks last until the outermost transaction commits.
+    """
+    with _process_locks.hold(property_id), transaction.atomic():
+        if connection.features.has_select_for_update:
+            list(Property.objects.select_for_update().filter(pk=property_id).values_list('pk', flat=True))
+        else:
+            _lock_row(property_id)
+        yield
+
+
+def overlapping_bookings(property_id, check_in_date, check_out_date, exclude_id=None):
+    queryset = Booking.objects.filter(
+        property_id=property_id,
+        check_in_date__lt=check_out_date,
+        check_out_date__gt=check_in_date,
+        status__in=Booking.AVAILABILITY_BLOCKING_STATUSES,
+    )
+    if exclude_id:
+        queryset = queryset.exclude(id=exclude_id)
+    return queryset
+
+
+def reserve_booking(booking):
+    """Save ``booking`` if its dates are still free, re-checking the database under the property lock.
+
+    Cached interval checks are fast but may lag a concurrent submit; this is
+    the authoritative check. Raises ``ReservationConflict`` when another
+    active booking or an imported calendar block overlaps (an existing
+    booking is excluded from its own check).
+    """
+    with property_lock(booking.property_id):
+        if overlapping_bookings(booking.property_id, booking.check_in_date, booking.check_out_date, exclude_id=booking.pk).exists():
+            raise ReservationConflict
+        if ExternalBlock.objects.filter(
+            property_id=booking.property_id,
+            check_in_date__lt=booking.check_out_date,
+            check_out_date__gt=booking.check_in_date,
+        ).exists():
+            raise ReservationConflict
+        booking.save()
+    return booking
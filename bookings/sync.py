@@ -0,0 +1,35 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Booking, ExternalBlock
+
+# Sent once a transaction that touched bookings has committed. Receivers get
+# ``property_ids`` (a set) and refresh whatever they derive from bookings.
+bookings_changed = Signal()
+
+
+def notify_bookings_changed(property_ids):
+    """Announce booking writes for the given properties once they are committed.
+
+    Bulk ``update()`` / ``bulk_update()`` paths bypass model signals, so they
+    must call this directly with every property they touched.
+    """
+    property_ids = {property_id for property_id in property_ids if property_id}
+    if not property_ids:
+        return
+    transaction.on_commit(
+        lambda: bookings_changed.send(sender=Booking, property_ids=property_ids)
+    )
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_save, sender=ExternalBlock)
+def booking_saved(sender, instance, **kwargs):
+    notify_bookings_changed([instance.property_id])
+
+
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=ExternalBlock)
+def booking_deleted(sender, instance, **kwargs):
+    notify_bookings_changed([instance.property_id])
@@ -1,3 +1,442 @@
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import parse_http_date
+
+from bookings import holds
+from bookings.holds import release_expired_holds
+from bookings.ical import sync_feed
+from bookings.intervals import BookingIntervals, get_booking_intervals
+from bookings.lifecycle import advance_booking_lifecycle
+from bookings.models import Booking, CalendarFeed, ExternalBlock
+from bookings.occupancy import booked_property_ids, earliest_stay_starts, get_occupancy_calendar
+from bookings.reservations import ReservationConflict, reserve_booking
+from bookings.utils import check_availability_batch, check_property_availability, get_available_properties
+from properties.models import Property
+from users.models import CustomUser
+
+
+class OccupancyCalendarTests(TestCase):
+    def setUp(self):
+        self.host = CustomUser.objects.create_user(
+            username='calendarhost',
+            email='calendarhost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        self.guest = CustomUser.objects.create_user(
+            username='calendarguest',
+            email='calendarguest@example.com',
+            password='testpass123',
+            role='guest',
+        )
+        self.listing = Property.objects.create(
+            owner=self.host,
+            name='Lakeside Loft',
+            description='Quiet loft by the lake.',
+            property_type='loft',
+            address='Milimani, Kisumu',
+            city='Kisumu',
+            state='Kisumu County',
+            price_per_night=2500,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+        self.today = timezone.localdate()
+        get_occupancy_calendar().rebuild()
+
+    def _book(self, start, nights, status='confirmed'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                guest=self.guest,
+                property=self.listing,
+                check_in_date=self.today + timedelta(days=start),
+                check_out_date=self.today + timedelta(days=start + nights),
+                num_guests=1,
+                status=status,
+            )
+
+    def test_blocking_booking_marks_property_booked_for_overlapping_stays(self):
+        self._book(start=5, nights=3)
+
+        self.assertIn(self.listing.id, booked_property_ids(self.today + timedelta(days=6), self.today + timedelta(days=9)))
+        self.assertNotIn(self.listing.id, booked_property_ids(self.today + timedelta(days=8), self.today + timedelta(days=10)))
+        self.assertNotIn(self.listing.id, booked_property_ids(self.today + timedelta(days=2), self.today + timedelta(days=5)))
+
+    def test_cancelling_and_rescheduling_refreshes_the_bitset(self):
+        booking = self._book(start=5, nights=3)
+        stay = (self.today + timedelta(days=5), self.today + timedelta(days=7))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.check_in_date = self.today + timedelta(days=20)
+            booking.check_out_date = self.today + timedelta(days=22)
+            booking.save()
+        self.assertNotIn(self.listing.id, booked_property_ids(*stay))
+        self.assertIn(self.listing.id, booked_property_ids(self.today + timedelta(days=21), self.today + timedelta(days=23)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.status = 'cancelled'
+            booking.save()
+        self.assertNotIn(self.listing.id, booked_property_ids(self.today + timedelta(days=21), self.today + timedelta(days=23)))
+
+    def test_stays_outside_the_window_fall_back_to_the_database(self):
+        self._book(start=900, nights=4)
+
+        self.assertIn(self.listing.id, booked_property_ids(self.today + timedelta(days=901), self.today + timedelta(days=902)))
+
+    def test_batch_checks_share_the_calendar_and_one_fallback_query(self):
+        self._book(start=5, nights=3)
+        self._book(start=900, nights=4)
+        day = lambda offset: self.today + timedelta(days=offset)
+
+        with self.assertNumQueries(1):
+            results = check_availability_batch([
+                (self.listing, day(6), day(7)),
+                (self.listing.id, day(10), day(12)),
+                (self.listing, day(899), day(901)),
+                (self.listing, day(904), day(906)),
+            ])
+
+        self.assertEqual(results, [False, True, False, True])
+        self.assertFalse(check_property_availability(self.listing, day(5), day(6)))
+        self.assertEqual(get_available_properties(day(6), day(7)), [])
+        self.assertEqual(get_available_properties(day(2).isoformat(), day(5).isoformat()), [self.listing])
+
+    def test_flexible_search_returns_earliest_feasible_starts(self):
+        self._book(start=2, nights=3)
+        day = lambda offset: self.today + timedelta(days=offset)
+
+        self.assertEqual(
+            earliest_stay_starts([self.listing.id], 2, day(0), day(10)),
+            {self.listing.id: [day(0), day(5), day(6)]},
+        )
+        self.assertEqual(earliest_stay_starts([self.listing.id], 3, day(1), day(5)), {})
+
+        self._book(start=901, nights=2)
+        self.assertEqual(
+            earliest_stay_starts([self.listing.id], 2, day(900), day(905), limit=5),
+            {self.listing.id: [day(903)]},
+        )
+
+
+class BookingIntervalsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.day = lambda offset: timezone.localdate() + timedelta(days=offset)
+        self.intervals = BookingIntervals([
+            {'id': 1, 'guest_id': 7, 'check_in_date': self.day(10), 'check_out_date': self.day(13), 'status': 'confirmed'},
+            {'id': 2, 'guest_id': 8, 'check_in_date': self.day(2), 'check_out_date': self.day(6), 'status': 'pending'},
+            {'id': 3, 'guest_id': 8, 'check_in_date': self.day(6), 'check_out_date': self.day(8), 'status': 'confirmed'},
+        ])
+
+    def test_overlaps_respect_exclusions_and_guests(self):
+        self.assertEqual([row['id'] for row in self.intervals.overlapping(self.day(5), self.day(11))], [2, 3, 1])
+        self.assertFalse(self.intervals.has_conflict(self.day(8), self.day(10)))
+        self.assertFalse(self.intervals.has_conflict(self.day(11), self.day(12), exclude_id=1))
+        self.assertTrue(self.intervals.has_conflict(self.day(7), self.day(9), guest_id=8))
+        self.assertFalse(self.intervals.has_conflict(self.day(7), self.day(9), guest_id=7))
+
+    def test_next_free_start_skips_back_to_back_bookings(self):
+        self.assertEqual(self.intervals.next_free_start(2, self.day(3)), self.day(8))
+        self.assertEqual(self.intervals.next_free_start(3, self.day(3)), self.day(13))
+        self.assertEqual(self.intervals.next_free_start(3, self.day(3), exclude_id=1), self.day(8))
+
+    def test_booking_form_reports_the_next_free_stay(self):
+        host = CustomUser.objects.create_user(username='slothost', email='slothost@example.com', password='testpass123', role='host')
+        guest = CustomUser.objects.create_user(username='slotguest', email='slotguest@example.com', password='testpass123', role='guest')
+        listing = Property.objects.create(
+            owner=host,
+            name='Slot House',
+            description='Busy house.',
+            property_type='house',
+            address='Kisumu',
+            city='Kisumu',
+            state='Kisumu County',
+            price_per_night=2000,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+        Booking.objects.create(
+            guest=host,
+            property=listing,
+            check_in_date=self.day(5),
+            check_out_date=self.day(9),
+            num_guests=1,
+            total_price=8000,
+            status='confirmed',
+        )
+        self.client.force_login(guest)
+
+        response = self.client.post(
+            reverse('bookings:create_booking', args=[listing.id]),
+            {'check_in_date': self.day(6), 'check_out_date': self.day(8), 'num_guests': 1},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['next_available'], {'check_in': self.day(9).isoformat(), 'check_out': self.day(11).isoformat()})
+        self.assertEqual(len(response.json()['unavailable_ranges']), 1)
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.day = lambda offset: timezone.localdate() + timedelta(days=offset)
+        self.host = CustomUser.objects.create_user(username='lockhost', email='lockhost@example.com', password='testpass123', role='host')
+        self.guest = CustomUser.objects.create_user(username='lockguest', email='lockguest@example.com', password='testpass123', role='guest')
+        self.listing = Property.objects.create(
+            owner=self.host,
+            name='Lock House',
+            description='Contested house.',
+            property_type='house',
+            address='Nakuru',
+            city='Nakuru',
+            state='Nakuru County',
+            price_per_night=3000,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+
+    def _booking(self, check_in, check_out):
+        return Booking(guest=self.guest, property=self.listing, check_in_date=self.day(check_in), check_out_date=self.day(check_out), num_guests=1)
+
+    def test_reservation_rechecks_the_database_under_the_lock(self):
+        # bulk_create skips the signals that refresh cached intervals, like a
+        # concurrent request that has not committed its invalidation yet.
+        Booking.objects.bulk_create([
+            Booking(guest=self.host, property=self.listing, check_in_date=self.day(5), check_out_date=self.day(8), num_guests=1, total_price=9000),
+        ])
+
+        with self.assertRaises(ReservationConflict):
+            reserve_booking(self._booking(6, 9))
+        booking = reserve_booking(self._booking(8, 10))
+        self.assertIsNotNone(booking.pk)
+
+        booking.check_in_date, booking.check_out_date = self.day(9), self.day(11)
+        reserve_booking(booking)
+        self.assertEqual(Booking.objects.filter(property=self.listing).count(), 2)
+
+
+class HoldExpiryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.day = lambda offset: timezone.localdate() + timedelta(days=offset)
+        self.host = CustomUser.objects.create_user(username='holdhost', email='holdhost@example.com', password='testpass123', role='host')
+        self.guest = CustomUser.objects.create_user(username='holdguest', email='holdguest@example.com', password='testpass123', role='guest')
+        self.first, self.second = (
+            Property.objects.create(
+                owner=self.host,
+                name=name,
+                description='Held stay.',
+                property_type='house',
+                address='Eldoret',
+                city='Eldoret',
+                state='Uasin Gishu',
+                price_per_night=2500,
+                max_guests=2,
+                bedrooms=1,
+                bathrooms=1,
+            )
+            for name in ('Hold One', 'Hold Two')
+        )
+
+    def _booking(self, listing, offset, **fields):
+        return Booking.objects.create(
+            guest=self.guest,
+            property=listing,
+            check_in_date=self.day(offset),
+            check_out_date=self.day(offset + 2),
+            num_guests=1,
+            **fields,
+        )
+
+    def test_sweeper_releases_lapsed_holds_in_batches_with_one_announcement_per_property(self):
+        fresh = self._booking(self.first, 10)
+        self.assertIsNotNone(fresh.hold_expires_at)
+        lapsed = timezone.now() - timedelta(minutes=1)
+        expired = [self._booking(self.first, 2, hold_expires_at=lapsed), self._booking(self.first, 5, hold_expires_at=lapsed), self._booking(self.second, 2, hold_expires_at=lapsed)]
+        paid = self._booking(self.second, 6, hold_expires_at=lapsed, payment_status='paid')
+        self.assertTrue(get_booking_intervals(self.first.id).has_conflict(self.day(2), self.day(3)))
+
+        with mock.patch('bookings.live.announce_live_update') as announce, self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(release_expired_holds(batch_size=2), (3, 2))
+
+        self.assertEqual(announce.call_count, 2)
+        self.assertEqual(
+            set(Booking.objects.filter(status='cancelled').values_list('id', flat=True)),
+            {booking.id for booking in expired},
+        )
+        self.assertEqual(Booking.objects.get(id=paid.id).status, 'pending')
+        self.assertFalse(get_booking_intervals(self.first.id).has_conflict(self.day(2), self.day(3)))
+
+    def test_booking_confirmed_after_the_read_is_neither_released_nor_announced(self):
+        lapsed = timezone.now() - timedelta(minutes=1)
+        raced = self._booking(self.first, 2, hold_expires_at=lapsed)
+        released = self._booking(self.second, 2, hold_expires_at=lapsed)
+        real_expired_holds = holds.expired_holds
+        calls = []
+
+        def confirm_between_read_and_update(now=None):
+            calls.append(now)
+            if len(calls) == 2:
+                Booking.objects.filter(id=raced.id).update(status='confirmed')
+            return real_expired_holds(now)
+
+        with (
+            mock.patch('bookings.holds.expired_holds', side_effect=confirm_between_read_and_update),
+            mock.patch('bookings.holds.notify_bookings_changed') as notify,
+            mock.patch('bookings.live.announce_live_update') as announce,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.assertEqual(release_expired_holds(), (1, 1))
+
+        notify.assert_called_once_with({self.second.id})
+        self.assertEqual(announce.call_count, 1)
+        self.assertEqual(Booking.objects.get(id=raced.id).status, 'confirmed')
+        self.assertEqual(Booking.objects.get(id=released.id).status, 'cancelled')
+
+
+class LifecycleJobTests(TestCase):
+    def setUp(self):
+        self.day = lambda offset: timezone.localdate() + timedelta(days=offset)
+        guest = CustomUser.objects.create_user(username='cycleguest', email='cycleguest@example.com', password='testpass123', role='guest')
+        self.bookings = {}
+        for host_name in ('cyclehost1', 'cyclehost2'):
+            host = CustomUser.objects.create_user(username=host_name, email=f'{host_name}@example.com', password='testpass123', role='host')
+            listing = Property.objects.create(
+                owner=host,
+                name=f'{host_name} stay',
+                description='Lifecycle stay.',
+                property_type='house',
+                address='Kericho',
+                city='Kericho',
+                state='Kericho',
+                price_per_night=2000,
+                max_guests=2,
+                bedrooms=1,
+                bathrooms=1,
+            )
+            for key, status, checkout in (
+                ('in_past', 'checked_in', -1),
+                ('out_old', 'checked_out', -5),
+                ('out_recent', 'checked_out', -1),
+                ('confirmed_old', 'confirmed', -5),
+                ('confirmed_future', 'confirmed', 6),
+            ):
+                self.bookings[host_name, key] = Booking.objects.create(
+                    guest=guest,
+                    property=listing,
+                    check_in_date=self.day(checkout - 2),
+                    check_out_date=self.day(checkout),
+                    num_guests=1,
+                    total_price=4000,
+                    status=status,
+                )
+
+    def test_advances_bookings_by_date_with_one_announcement_per_host(self):
+        with mock.patch('bookings.live.announce_live_update') as announce, self.captureOnCommitCallbacks(execute=True):
+            counts = advance_booking_lifecycle(complete_after_days=2, batch_size=3)
+
+        self.assertEqual(counts, {'checked_in->checked_out': 2, 'checked_out->completed': 2, 'confirmed->completed': 2})
+        self.assertEqual(announce.call_count, 2)
+        statuses = {key: Booking.objects.get(id=booking.id).status for key, booking in self.bookings.items()}
+        self.assertEqual(
+            {key: status for (host_name, key), status in statuses.items() if host_name == 'cyclehost1'},
+            {'in_past': 'checked_out', 'out_old': 'completed', 'out_recent': 'checked_out', 'confirmed_old': 'completed', 'confirmed_future': 'confirmed'},
+        )
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.day = lambda offset: timezone.localdate() + timedelta(days=offset)
+        self.host = CustomUser.objects.create_user(username='feedhost', email='feedhost@example.com', password='testpass123', role='host')
+        self.guest = CustomUser.objects.create_user(username='feedguest', email='feedguest@example.com', password='testpass123', role='guest')
+        self.listing = Property.objects.create(
+            owner=self.host,
+            name='Feed Cottage',
+            description='Listed on two sites.',
+            property_type='cottage',
+            address='Naivasha',
+            city='Naivasha',
+            state='Nakuru County',
+            price_per_night=4000,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+        handle, self.path = tempfile.mkstemp(suffix='.ics')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        self.feed = CalendarFeed.objects.create(property=self.listing, name='Other site', url=f'file://{self.path}')
+
+    def _write_feed(self, events, mtime):
+        lines = ['BEGIN:VCALENDAR', 'VERSION:2.0']
+        for uid, start, end in events:
+            lines += [
+                'BEGIN:VEVENT',
+                f'UID:{uid}',
+                f'DTSTART;VALUE=DATE:{self.day(start):%Y%m%d}',
+                f'DTEND;VALUE=DATE:{self.day(end):%Y%m%d}',
+                'SUMMARY:Reserved on another',
+                '  site',
+                'END:VEVENT',
+            ]
+        lines.append('END:VCALENDAR')
+        with open(self.path, 'w', encoding='utf-8', newline='') as stream:
+            stream.write('\r\n'.join(lines) + '\r\n')
+        os.utime(self.path, (mtime, mtime))
+
+    def test_sync_applies_only_changed_ranges_and_blocks_availability(self):
+        self._write_feed([('a', 3, 5), ('b', 10, 12), ('old', -6, -3)], 1_000_000)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(sync_feed(self.feed), {'created': 2, 'updated': 0, 'deleted': 0})
+        self.assertEqual(ExternalBlock.objects.get(uid='a').summary, 'Reserved on another site')
+        self.assertFalse(check_property_availability(self.listing, self.day(4), self.day(6)))
+        self.assertIn(self.listing.id, booked_property_ids(self.day(11), self.day(13)))
+        self.assertTrue(get_booking_intervals(self.listing.id).has_conflict(self.day(4), self.day(6)))
+        with self.assertRaises(ReservationConflict):
+            reserve_booking(Booking(guest=self.guest, property=self.listing, check_in_date=self.day(4), check_out_date=self.day(6), num_guests=1))
+
+        self.assertEqual(sync_feed(self.feed), {'created': 0, 'updated': 0, 'deleted': 0})
+
+        self._write_feed([('b', 11, 13), ('c', 20, 21)], 1_000_100)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(sync_feed(self.feed), {'created': 1, 'updated': 1, 'deleted': 1})
+        self.assertTrue(check_property_availability(self.listing, self.day(3), self.day(5)))
+        self.assertFalse(get_booking_intervals(self.listing.id).has_conflict(self.day(3), self.day(5)))
+        self.assertEqual(sorted(ExternalBlock.objects.values_list('uid', flat=True)), ['b', 'c'])
+
+    def test_export_feed_is_cached_and_revalidates(self):
+        booking = Booking.objects.create(
+            guest=self.guest, property=self.listing, check_in_date=self.day(5), check_out_date=self.day(7), num_guests=1, status='confirmed',
+        )
+        url = reverse('properties:property_calendar', args=[self.listing.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'UID:baystays-booking-{booking.id}@baystays', response.content.decode())
+        self.assertIn(f'DTSTART;VALUE=DATE:{self.day(5):%Y%m%d}', response.content.decode())
+
+        with self.assertNumQueries(0):
+            revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
 
-# Create your tests here.
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.status = 'cancelled'
+            booking.save()
+        refreshed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertNotIn('BEGIN:VEVENT', refreshed.content.decode())
+        # The cancelled booking left the feed, but Last-Modified must not go backwards.
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 200)
+        self.assertGreater(parse_http_date(refreshed['Last-Modified']), parse_http_date(response['Last-Modified']))
@@ -1,20 +1,61 @@
 # bookings/utils.py
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from django.db.models import Q
 from properties.models import Property
-from bookings.models import Booking
+from bookings.models import blocked_stays
+from bookings.occupancy import booked_property_ids, get_occupancy_calendar
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), '%Y-%m-%d').date()
+
+
+def _blocking_ranges(property_ids, start, end):
+    """Map property id -> [(check_in, check_out), ...] of blocking bookings and imported blocks overlapping [start, end)."""
+    ranges = {}
+    rows = blocked_stays(property_id__in=property_ids, check_in_date__lt=end, check_out_date__gt=start)
+    for property_id, booked_in, booked_out in rows:
+        ranges.setdefault(property_id, []).append((booked_in, booked_out))
+    return ranges
+
+
+def check_availability_batch(checks):
+    """
+    Check many (property, check_in, check_out) stays at once.
+    Returns one boolean per check, in order. Stays inside the occupancy
+    calendar window are answered from memory; the rest share one query.
+    """
+    checks = [
+        (getattr(property, 'pk', property), _as_date(check_in), _as_date(check_out))
+        for property, check_in, check_out in checks
+    ]
+    results = get_occupancy_calendar().available_many(checks)
+    pending = [index for index, available in enumerate(results) if available is None]
+    if pending:
+        ranges = _blocking_ranges(
+            {checks[index][0] for index in pending},
+            min(checks[index][1] for index in pending),
+            max(checks[index][2] for index in pending),
+        )
+        for index in pending:
+            property_id, check_in, check_out = checks[index]
+            results[index] = not any(
+                booked_in < check_out and booked_out > check_in
+                for booked_in, booked_out in ranges.get(property_id, ())
+            )
+    return results
+
 
 def check_property_availability(property, check_in, check_out):
     """
     Check if a property is available for the given dates
     """
-    conflicting_bookings = Booking.objects.filter(
-        property=property,
-        check_in_date__lt=check_out,
-        check_out_date__gt=check_in,
-        status__in=['confirmed', 'checked_in', 'pending']
-    )
-    return not conflicting_bookings.exists()
+    return check_availability_batch([(property, check_in, check_out)])[0]
+
 
 def get_available_properties(check_in, check_out, guests=1, location=None):
     """
@@ -32,9 +73,4 @@ def get_available_properties(check_in, check_out, guests=1, location=None):
             Q(country__icontains=location)
         )
     
-    available_properties = []
-    for property in properties:
-        if check_property_availability(property, check_in, check_out):
-            available_properties.append(property)
-    
-    return available_properties
\ No newline at end of file
+    return list(properties.exclude(id__in=booked_property_ids(_as_date(check_in), _as_date(check_out))))
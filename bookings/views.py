@@ -1,5 +1,5 @@
 import json
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 from io import BytesIO
 
@@ -26,33 +26,31 @@ from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, Tabl
 from core.realtime import announce_live_update
 from hosts.models import Host
 from properties.models import Property
+from properties.pricing import stay_price
 
 from .forms import BookingForm
+from .intervals import get_booking_intervals
+from .live import booking_live_groups, bump_host_live_versions
 from .models import Booking, BookingPayment
+from .reservations import ReservationConflict, reserve_booking
 from .services import initiate_mpesa_payment
 
 
 def _unavailable_ranges_for_property(property_obj):
-    return list(
-        Booking.objects.filter(
-            property=property_obj,
-            status__in=['confirmed', 'pending', 'checked_in']
-        )
-        .order_by('check_in_date')
-        .values('check_in_date', 'check_out_date', 'status')[:12]
-    )
+    return get_booking_intervals(property_obj.id).ranges(limit=12)
 
 
-def _booking_overlap_queryset(property_obj, check_in_date, check_out_date, exclude_id=None):
-    queryset = Booking.objects.filter(
-        property=property_obj,
-        check_in_date__lt=check_out_date,
-        check_out_date__gt=check_in_date,
-        status__in=['confirmed', 'pending', 'checked_in'],
-    )
-    if exclude_id:
-        queryset = queryset.exclude(id=exclude_id)
-    return queryset
+def _next_free_stay(intervals, check_in_date, check_out_date, exclude_id=None):
+    """The first stay of the same length, from tomorrow or the requested check-in, that has no overlap."""
+    nights = max((check_out_date - check_in_date).days, 1)
+    earliest = max(check_in_date, timezone.localdate() + timedelta(days=1))
+    start = intervals.next_free_start(nights, earliest, exclude_id=exclude_id)
+    return start, start + timedelta(days=nights)
+
+
+def _unavailable_dates_message(prefix, next_stay):
+    start, end = next_stay
+    return f'{prefix} The next free stay of that length is {start:%b %d} to {end:%b %d, %Y}.'
 
 
 def _coalesce_decimal(value):
@@ -234,22 +232,10 @@ def _build_pdf_response(filename, title, subtitle, sections):
     return response
 
 
-def _guest_live_groups(guest_id, property_id=None, owner_id=None):
-    groups = [f'guest-bookings-{guest_id}']
-    if property_id:
-        groups.append(f'property-{property_id}')
-    if owner_id:
-        groups.extend([
-            f'host-dashboard-{owner_id}',
-            f'host-listings-{owner_id}',
-            f'host-bookings-{owner_id}',
-        ])
-    return groups
-
-
 def _announce_booking_update(booking, message='booking-updated'):
+    bump_host_live_versions([booking.property.owner_id])
     announce_live_update(
-        _guest_live_groups(booking.guest_id, property_id=booking.property_id, owner_id=booking.property.owner_id) + ['public-explore'],
+        booking_live_groups([booking.guest_id], property_id=booking.property_id, owner_id=booking.property.owner_id) + ['public-explore'],
         message=message,
     )
 
@@ -399,32 +385,28 @@ class BookingCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         property_obj = get_object_or_404(Property, pk=self.kwargs['property_id'])
-        unavailable_ranges = _unavailable_ranges_for_property(property_obj)
+        intervals = get_booking_intervals(property_obj.id)
+        unavailable_ranges = intervals.ranges(limit=12)
 
         if property_obj.owner_id == self.request.user.id:
             form.add_error(None, 'Hosts cannot book their own listing from BayStays. Use availability controls or manual guest coordination instead.')
             return self.form_invalid(form, unavailable_ranges=unavailable_ranges)
 
-        overlapping_bookings = _booking_overlap_queryset(
-            property_obj,
-            form.instance.check_in_date,
-            form.instance.check_out_date,
-        )
-
-        if overlapping_bookings.exists():
-            form.add_error(None, 'These dates are not available')
+        check_in_date = form.instance.check_in_date
+        check_out_date = form.instance.check_out_date
+        if check_out_date <= check_in_date:
+            form.add_error('check_out_date', 'Check-out must be after check-in')
             return self.form_invalid(form, unavailable_ranges=unavailable_ranges)
 
-        if Booking.objects.filter(
-            guest=self.request.user,
-            property=property_obj,
-            check_in_date__lt=form.instance.check_out_date,
-            check_out_date__gt=form.instance.check_in_date,
-            status__in=['pending', 'confirmed', 'checked_in']
-        ).exists():
+        if intervals.has_conflict(check_in_date, check_out_date, guest_id=self.request.user.id):
             form.add_error(None, 'You already have an active booking for this stay within that period.')
             return self.form_invalid(form, unavailable_ranges=unavailable_ranges)
 
+        if intervals.has_conflict(check_in_date, check_out_date):
+            next_stay = _next_free_stay(intervals, check_in_date, check_out_date)
+            form.add_error(None, _unavailable_dates_message('These dates are not available.', next_stay))
+            return self.form_invalid(form, unavailable_ranges=unavailable_ranges, next_stay=next_stay)
+
         if form.instance.check_in_date <= timezone.localdate():
             form.add_error('check_in_date', 'Check-in must be at least 1 day in advance')
             return self.form_invalid(form, unavailable_ranges=unavailable_ranges)
@@ -433,8 +415,7 @@ class BookingCreateView(LoginRequiredMixin, CreateView):
             form.add_error('num_guests', f'This property accommodates maximum {property_obj.max_guests} guests')
             return self.form_invalid(form, unavailable_ranges=unavailable_ranges)
 
-        num_nights = (form.instance.check_out_date - form.instance.check_in_date).days
-        form.instance.total_price = num_nights * property_obj.price_per_night
+        form.instance.total_price = stay_price(property_obj, check_in_date, check_out_date)
         form.instance.guest = self.request.user
         form.instance.property = property_obj
         form.instance.payment_status = 'pending'
@@ -450,12 +431,19 @@ class BookingCreateView(LoginRequiredMixin, CreateView):
             form.add_error('mpesa_phone_number', 'Add an M-Pesa number to charge this booking now.')
             return self.form_invalid(form, unavailable_ranges=unavailable_ranges)
 
-        with transaction.atomic():
-            response = super().form_valid(form)
-            payment = None
-            payment_result = None
-            if charge_now:
-                payment, payment_result = _run_mpesa_charge(self.object, mpesa_phone_number)
+        try:
+            with transaction.atomic():
+                self.object = reserve_booking(form.instance)
+                payment = None
+                payment_result = None
+                if charge_now:
+                    payment, payment_result = _run_mpesa_charge(self.object, mpesa_phone_number)
+        except ReservationConflict:
+            intervals = get_booking_intervals(property_obj.id)
+            next_stay = _next_free_stay(intervals, check_in_date, check_out_date)
+            form.add_error(None, _unavailable_dates_message('These dates were just booked by someone else.', next_stay))
+            return self.form_invalid(form, unavailable_ranges=intervals.ranges(limit=12), next_stay=next_stay)
+        response = redirect(self.get_success_url())
 
         _announce_booking_update(self.object, message='booking-created')
         messages.success(self.request, 'Booking request submitted successfully!')
@@ -473,10 +461,14 @@ class BookingCreateView(LoginRequiredMixin, CreateView):
             })
         return response
 
-    def form_invalid(self, form, unavailable_ranges=None):
+    def form_invalid(self, form, unavailable_ranges=None, next_stay=None):
         response = super().form_invalid(form)
         if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({
+                'next_available': {
+                    'check_in': next_stay[0].isoformat(),
+                    'check_out': next_stay[1].isoformat(),
+                } if next_stay else None,
                 'ok': False,
                 'errors': form.errors,
                 'non_field_errors': form.non_field_errors(),
@@ -753,26 +745,30 @@ def reschedule_booking(request, booking_id):
         form = BookingForm(request.POST, instance=booking)
         if form.is_valid():
             rescheduled = form.save(commit=False)
-            unavailable_ranges = _unavailable_ranges_for_property(booking.property)
-            overlaps = _booking_overlap_queryset(
-                booking.property,
-                rescheduled.check_in_date,
-                rescheduled.check_out_date,
-                exclude_id=booking.id,
-            )
-            if overlaps.exists():
-                form.add_error(None, 'Those new dates overlap with another active booking.')
+            intervals = get_booking_intervals(booking.property_id)
+            unavailable_ranges = intervals.ranges(limit=12)
+            if rescheduled.check_out_date <= rescheduled.check_in_date:
+                form.add_error('check_out_date', 'Check-out must be after check-in')
+            elif intervals.has_conflict(rescheduled.check_in_date, rescheduled.check_out_date, exclude_id=booking.id):
+                next_stay = _next_free_stay(intervals, rescheduled.check_in_date, rescheduled.check_out_date, exclude_id=booking.id)
+                form.add_error(None, _unavailable_dates_message('Those new dates overlap with another active booking.', next_stay))
             elif rescheduled.check_in_date <= timezone.localdate():
                 form.add_error('check_in_date', 'Check-in must be at least 1 day in advance')
             elif rescheduled.num_guests > booking.property.max_guests:
                 form.add_error('num_guests', f'This property accommodates maximum {booking.property.max_guests} guests')
             else:
-                nights = (rescheduled.check_out_date - rescheduled.check_in_date).days
-                rescheduled.total_price = nights * booking.property.price_per_night
-                rescheduled.save()
-                _announce_booking_update(rescheduled, message='booking-rescheduled')
-                messages.success(request, f'{booking.property.name} was rescheduled successfully.')
-                return redirect('bookings:booking_list')
+                rescheduled.total_price = stay_price(booking.property, rescheduled.check_in_date, rescheduled.check_out_date)
+                try:
+                    reserve_booking(rescheduled)
+                except ReservationConflict:
+                    intervals = get_booking_intervals(booking.property_id)
+                    unavailable_ranges = intervals.ranges(limit=12)
+                    next_stay = _next_free_stay(intervals, rescheduled.check_in_date, rescheduled.check_out_date, exclude_id=booking.id)
+                    form.add_error(None, _unavailable_dates_message('Those new dates were just booked by someone else.', next_stay))
+                else:
+                    _announce_booking_update(rescheduled, message='booking-rescheduled')
+                    messages.success(request, f'{booking.property.name} was rescheduled successfully.')
+                    return redirect('bookings:booking_list')
         else:
             unavailable_ranges = _unavailable_ranges_for_property(booking.property)
     else:
@@ -13,4 +13,10 @@ fi
 python manage.py collectstatic --no-input
 
 # Apply any outstanding database migrations
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+
+# Keep the derived amenity/policy bitmask columns in step with the JSON lists
+python manage.py backfill_choice_masks
+
+# Refresh the recommended ranking scores (schedule this daily as well)
+python manage.py rebuild_ranking_scores
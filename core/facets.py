@@ -0,0 +1,77 @@
+from collections import Counter
+
+from properties.models import Property
+
+# Nightly price buckets in KES; the last one is open-ended.
+PRICE_BUCKETS = ((0, 2500), (2500, 5000), (5000, 10000), (10000, None))
+# Mirrors the guest options on the explore form: each band means "at least n guests".
+GUEST_BANDS = (('1 Guest', 1), ('2 Guests', 2), ('3 Guests', 3), ('4+ Guests', 4))
+CITY_FACET_LIMIT = 12
+
+
+def _price_bucket(price):
+    for index, (low, high) in enumerate(PRICE_BUCKETS):
+        if price >= low and (high is None or price < high):
+            return index
+    return None
+
+
+def compute_facets(rows, property_type=None, min_guests=None, min_price=None, max_price=None, amenities_mask=0):
+    """Count explore facets from ``(property_type, price, max_guests, amenities_mask, city)`` rows.
+
+    Property type, guest and price counts apply every active filter except
+    their own, so each number is what picking that value would return.
+    Amenity and city counts apply all filters, since amenities narrow
+    together and city is not a filter.
+    """
+    type_counts = Counter()
+    guest_counts = Counter()
+    price_counts = Counter()
+    amenity_counts = Counter()
+    city_counts = Counter()
+    matched = 0
+    for row_type, price, guests, mask, city in rows:
+        type_ok = not property_type or row_type == property_type
+        guests_ok = not min_guests or guests >= min_guests
+        price_ok = (min_price is None or price >= min_price) and (max_price is None or price <= max_price)
+        amenities_ok = mask & amenities_mask == amenities_mask
+
+        if guests_ok and price_ok and amenities_ok:
+            type_counts[row_type] += 1
+        if type_ok and price_ok and amenities_ok:
+            for label, minimum in GUEST_BANDS:
+                if guests >= minimum:
+                    guest_counts[label] += 1
+        if type_ok and guests_ok and amenities_ok:
+            price_counts[_price_bucket(price)] += 1
+        if type_ok and guests_ok and price_ok and amenities_ok:
+            matched += 1
+            if city:
+                city_counts[city] += 1
+            for amenity, bit in Property.AMENITY_BITS.items():
+                if mask & bit:
+                    amenity_counts[amenity] += 1
+
+    return {
+        'results_count': matched,
+        'property_type': [
+            {'value': value, 'label': label, 'count': type_counts[value]}
+            for value, label in Property.PROPERTY_TYPES
+        ],
+        'price': [
+            {'min': low, 'max': high, 'count': price_counts[index]}
+            for index, (low, high) in enumerate(PRICE_BUCKETS)
+        ],
+        'guests': [
+            {'value': label, 'min_guests': minimum, 'count': guest_counts[label]}
+            for label, minimum in GUEST_BANDS
+        ],
+        'amenities': [
+            {'value': value, 'label': label, 'count': amenity_counts[value]}
+            for value, label in Property.AMENITY_CHOICES
+        ],
+        'city': [
+            {'value': city, 'count': count}
+            for city, count in sorted(city_counts.items(), key=lambda item: (-item[1], item[0]))[:CITY_FACET_LIMIT]
+        ],
+    }
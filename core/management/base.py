@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError, OutputWrapper
+
+from core.versioning import shared_cache_configured
+
+
+class SharedCacheCommand(BaseCommand):
+    """Base for scheduled commands whose writes must retire caches held by the web processes.
+
+    Those caches are keyed by version counters in the default cache. With a
+    per-process backend the command's bumps never leave the command, so it
+    refuses to run unless ``--allow-local-cache`` says that is intended.
+    """
+
+    def requires_shared_cache(self, options):
+        return True
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.add_argument(
+            '--allow-local-cache',
+            action='store_true',
+            help='Run even though the cache is per-process; the site keeps serving its cached pages until they expire.',
+        )
+        return parser
+
+    def execute(self, *args, **options):
+        if self.requires_shared_cache(options) and not shared_cache_configured():
+            message = (
+                'The default cache is per-process, so this command cannot retire the web '
+                "processes' cached calendars, quotes and pages. Set REDIS_URL (or CACHE_REDIS_URL) "
+                'to the same cache the site uses, or pass --allow-local-cache.'
+            )
+            if not options.get('allow_local_cache'):
+                raise CommandError(message)
+            # BaseCommand.execute only adopts the caller's stderr after this runs.
+            stderr = OutputWrapper(options['stderr']) if options.get('stderr') else self.stderr
+            stderr.write(self.style.WARNING(message))
+        return super().execute(*args, **options)
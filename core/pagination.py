@@ -0,0 +1,105 @@
+import datetime
+import hashlib
+from decimal import Decimal
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+
+CURSOR_SALT = 'baystays.keyset-cursor'
+
+
+def query_fingerprint(params, ignore=('cursor', 'page', 'count')):
+    """Stable short hash of query parameters, used to tie a cursor to the search it came from."""
+    items = sorted(
+        (key, value)
+        for key in params
+        if key not in ignore
+        for value in params.getlist(key)
+        if value not in ('', None)
+    )
+    return hashlib.sha1(repr(items).encode('utf-8')).hexdigest()[:16]
+
+
+def encode_cursor(payload):
+    return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token):
+    """Return the cursor payload, or None for a missing, tampered or malformed token."""
+    if not token:
+        return None
+    try:
+        payload = signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _split_ordering(ordering):
+    return [(term.lstrip('-'), term.startswith('-')) for term in ordering]
+
+
+def _dump_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def _load_value(model, field_name, value):
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return value
+    return field.to_python(value)
+
+
+def _after_filter(model, ordering, values):
+    """Rows strictly after ``values`` in ``ordering``: (a > x) | (a = x & b > y) | ..."""
+    condition = Q()
+    equal_prefix = {}
+    for (field_name, descending), raw in zip(_split_ordering(ordering), values):
+        value = _load_value(model, field_name, raw)
+        lookup = 'lt' if descending else 'gt'
+        condition |= Q(**equal_prefix, **{f'{field_name}__{lookup}': value})
+        equal_prefix[field_name] = value
+    return condition
+
+
+def row_key(row, ordering):
+    """JSON-safe keyset key of ``row`` under ``ordering``, as used for cursors."""
+    return [_dump_value(getattr(row, field_name)) for field_name, _ in _split_ordering(ordering)]
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, next_key):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.next_key = next_key
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def keyset_paginate(queryset, ordering, page_size, after=None):
+    """Fetch one page of ``queryset`` ordered by ``ordering``, starting after the key ``after``.
+
+    ``ordering`` must end in a unique, non-null column (normally ``-id``) so
+    every row has a distinct key. The cost is one LIMIT query however deep
+    the page is; no COUNT or OFFSET is issued.
+    """
+    queryset = queryset.order_by(*ordering)
+    if after:
+        queryset = queryset.filter(_after_filter(queryset.model, ordering, after))
+    rows = list(queryset[:page_size + 1])
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    next_key = None
+    if has_next and rows:
+        next_key = row_key(rows[-1], ordering)
+    return KeysetPage(rows, has_next, next_key)
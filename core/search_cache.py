@@ -0,0 +1,70 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bookings.sync import bookings_changed
+from properties.models import Property, Review
+
+from .versioning import bump_version, get_version
+
+# Bumped on every committed Property, Review or Booking write. Cached search
+# results are keyed by it, so a bump retires them all at once.
+CATALOG_VERSION_NAMESPACE = 'catalog'
+
+SEARCH_RESULT_CACHE_SECONDS = getattr(settings, 'SEARCH_RESULT_CACHE_SECONDS', 300)
+PAGING_PARAMS = ('cursor', 'page', 'count', 'csrfmiddlewaretoken')
+
+
+def _normalize(value, fold_case):
+    value = ' '.join(str(value).split())
+    return value.casefold() if fold_case else value
+
+
+def canonical_params(params, ignore=PAGING_PARAMS, defaults=None, case_insensitive=()):
+    """Sorted ``(key, values)`` pairs for ``params`` with paging, blank and default values dropped.
+
+    Two requests for the same search, whatever their parameter order,
+    spacing or letter case in ``case_insensitive`` keys, produce the same
+    pairs.
+    """
+    defaults = defaults or {}
+    canonical = []
+    for key in sorted(params):
+        if key in ignore:
+            continue
+        values = sorted({
+            _normalize(value, key in case_insensitive)
+            for value in params.getlist(key)
+        } - {'', _normalize(defaults.get(key, ''), key in case_insensitive)})
+        if values:
+            canonical.append((key, tuple(values)))
+    return tuple(canonical)
+
+
+def search_results_key(scope, params, **options):
+    """Cache key for a search in ``scope``, tied to the current catalog version."""
+    digest = hashlib.sha1(repr(canonical_params(params, **options)).encode('utf-8')).hexdigest()
+    return f'search-results:{scope}:{get_version(CATALOG_VERSION_NAMESPACE)}:{digest}'
+
+
+def get_search_results(key):
+    return cache.get(key)
+
+
+def set_search_results(key, results):
+    cache.set(key, results, SEARCH_RESULT_CACHE_SECONDS)
+
+
+@receiver([post_save, post_delete], sender=Property)
+@receiver([post_save, post_delete], sender=Review)
+def catalog_row_changed(sender, **kwargs):
+    transaction.on_commit(lambda: bump_version(CATALOG_VERSION_NAMESPACE))
+
+
+@receiver(bookings_changed)
+def catalog_bookings_changed(sender, property_ids, **kwargs):
+    bump_version(CATALOG_VERSION_NAMESPACE)
@@ -1,3 +1,263 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import Booking
+from core.versioning import shared_cache_configured
+from core.views import _explore_summary
+from properties.models import Property
+from properties.search_index import get_text_index
+from users.models import CustomUser
+
+
+class ExploreKeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        host = CustomUser.objects.create_user(
+            username='explorehost',
+            email='explorehost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        for index in range(14):
+            Property.objects.create(
+                owner=host,
+                name=f'Stay {index}',
+                description='Explore stay.',
+                property_type='apartment',
+                address='Kisumu',
+                city='Kisumu',
+                state='Kisumu County',
+                price_per_night=1000 + (index % 3) * 500,
+                average_rating=4.0 + (index % 2) * 0.5,
+                max_guests=2,
+                bedrooms=1,
+                bathrooms=1,
+            )
+
+    def _page(self, cursor=''):
+        response = self.client.get(
+            reverse('core:properties_list'),
+            {'sort': 'recommended', 'cursor': cursor},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        return response.json(), [property_obj.id for property_obj in response.context['properties']]
+
+    def test_cursor_walks_every_result_once_in_sort_order(self):
+        payload, seen = self._page()
+        self.assertEqual(payload['results_count'], 14)
+        while payload['has_next']:
+            payload, page_ids = self._page(payload['next_cursor'])
+            self.assertTrue(payload['results_count_approximate'])
+            seen.extend(page_ids)
+
+        expected = list(
+            Property.objects.order_by('-ranking_score', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_approximate_summary_only_reads_the_capped_slice(self):
+        with mock.patch('core.views.APPROXIMATE_COUNT_CAP', 5), CaptureQueriesContext(connection) as queries:
+            summary = _explore_summary(Property.objects.all(), approximate=True)
+
+        self.assertEqual(summary['results_count'], 5)
+        self.assertTrue(summary['results_count_approximate'])
+        self.assertTrue(all('LIMIT 6' in query['sql'] for query in queries))
+
+    def test_tampered_cursor_restarts_from_the_first_page(self):
+        first, first_ids = self._page()
+        _, restarted_ids = self._page(first['next_cursor'][:-2] + 'xx')
+
+        self.assertEqual(restarted_ids, first_ids)
+
+
+class ExploreResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.host = CustomUser.objects.create_user(
+            username='cachehost',
+            email='cachehost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        for index in range(9):
+            self._listing(f'Cached Stay {index}', 2000 + index * 100)
+        get_text_index().rebuild()
+
+    def _listing(self, name, price):
+        return Property.objects.create(
+            owner=self.host,
+            name=name,
+            description='Cached stay.',
+            property_type='apartment',
+            address='Milimani',
+            city='Kisumu',
+            state='Kisumu County',
+            price_per_night=price,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+
+    def _ids(self, params):
+        response = self.client.get(reverse('core:properties_list'), params)
+        return [property_obj.id for property_obj in response.context['properties']]
+
+    def test_equivalent_searches_share_one_cached_result_list(self):
+        first_ids = self._ids({'location': 'Kisumu', 'sort': 'price_asc', 'guests': 'All Guests'})
+
+        with CaptureQueriesContext(connection) as queries:
+            repeat_ids = self._ids({'sort': 'price_asc', 'location': '  kisumu '})
+
+        self.assertEqual(repeat_ids, first_ids)
+        sql = [query['sql'] for query in queries]
+        row_loads = [statement for statement in sql if statement.startswith('SELECT "properties_property"."id", "properties_property"."owner_id"')]
+        self.assertEqual(len(row_loads), 1)
+        self.assertIn(' IN (', row_loads[0])
+        self.assertFalse([statement for statement in sql if 'AVG(' in statement])
+
+    def test_catalog_writes_retire_cached_results(self):
+        self._ids({'location': 'Kisumu', 'sort': 'price_asc'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            budget = self._listing('Budget Stay', 500)
+
+        self.assertEqual(self._ids({'location': 'Kisumu', 'sort': 'price_asc'})[0], budget.id)
+
+
+class ExploreFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        host = CustomUser.objects.create_user(
+            username='facethost',
+            email='facethost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        listings = [
+            ('villa', 12000, 6, ['pool', 'wifi'], 'Kisumu'),
+            ('villa', 4000, 2, ['wifi'], 'Homa Bay'),
+            ('apartment', 1800, 2, ['wifi'], 'Kisumu'),
+            ('apartment', 3000, 4, [], 'Kisumu'),
+        ]
+        for index, (property_type, price, guests, amenities, city) in enumerate(listings):
+            Property.objects.create(
+                owner=host,
+                name=f'Facet Stay {index}',
+                description='Facet stay.',
+                property_type=property_type,
+                address=city,
+                city=city,
+                state='Nyanza',
+                price_per_night=price,
+                max_guests=guests,
+                bedrooms=1,
+                bathrooms=1,
+                amenities=amenities,
+            )
+
+    def test_counts_skip_their_own_filter_and_are_cached(self):
+        url = reverse('core:properties_facets')
+        params = {'property-type': 'villa', 'amenities': 'wifi'}
+        facets = self.client.get(url, params).json()
+
+        self.assertEqual(facets['results_count'], 2)
+        type_counts = {item['value']: item['count'] for item in facets['property_type']}
+        self.assertEqual((type_counts['villa'], type_counts['apartment']), (2, 1))
+        self.assertEqual([item['count'] for item in facets['price']], [0, 1, 0, 1])
+        self.assertEqual([item['count'] for item in facets['guests']], [2, 2, 1, 1])
+        self.assertEqual(facets['city'], [{'value': 'Homa Bay', 'count': 1}, {'value': 'Kisumu', 'count': 1}])
+        self.assertEqual({item['value']: item['count'] for item in facets['amenities']}['pool'], 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, {**params, 'sort': 'price_asc'}).json(), facets)
+
+    def test_non_finite_prices_are_ignored(self):
+        for params in ({'min_price': 'NaN'}, {'max_price': 'sNaN'}, {'min_price': 'Infinity'}):
+            facets = self.client.get(reverse('core:properties_facets'), params).json()
+            self.assertEqual(facets['results_count'], 4)
+            self.assertEqual(self.client.get(reverse('core:properties_list'), params).status_code, 200)
+
+    def test_explore_form_renders_amenity_filters(self):
+        response = self.client.get(reverse('core:properties_list'), {'amenities': 'pool'})
+        self.assertContains(response, 'name="amenities" value="pool" checked')
+        self.assertContains(response, 'name="amenities" value="wifi" >')
+        self.assertEqual(response.context['results_count'], 1)
+
+
+class ExploreFlexibleDateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        host = CustomUser.objects.create_user(
+            username='flexhost',
+            email='flexhost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        guest = CustomUser.objects.create_user(
+            username='flexguest',
+            email='flexguest@example.com',
+            password='testpass123',
+            role='guest',
+        )
+        self.open_stay, self.busy_stay = [
+            Property.objects.create(
+                owner=host,
+                name=name,
+                description='Flexible stay.',
+                property_type='house',
+                address='Kisumu',
+                city='Kisumu',
+                state='Kisumu County',
+                price_per_night=2000,
+                max_guests=2,
+                bedrooms=1,
+                bathrooms=1,
+            )
+            for name in ('Open Stay', 'Busy Stay')
+        ]
+        today = timezone.localdate()
+        Booking.objects.create(
+            guest=guest,
+            property=self.busy_stay,
+            check_in_date=today,
+            check_out_date=today + timedelta(days=29),
+            num_guests=1,
+            total_price=58000,
+            status='confirmed',
+        )
+
+    def test_only_properties_with_a_free_run_are_listed_with_start_dates(self):
+        response = self.client.get(reverse('core:properties_list'), {'flex_nights': '3'})
+
+        properties = list(response.context['properties'])
+        self.assertEqual([property_obj.id for property_obj in properties], [self.open_stay.id])
+        self.assertEqual(properties[0].flex_starts[0], timezone.localdate())
+
+    def test_out_of_range_month_is_ignored(self):
+        response = self.client.get(reverse('core:properties_list'), {'flex_nights': '2', 'flex_month': '9999-12'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['properties']), 2)
+
+
+class SharedCacheCommandTests(TestCase):
+    def test_scheduled_commands_refuse_a_per_process_cache(self):
+        with self.assertRaisesMessage(CommandError, 'REDIS_URL'):
+            call_command('expire_booking_holds', stdout=StringIO())
+        stderr = StringIO()
+        call_command('expire_booking_holds', allow_local_cache=True, stdout=StringIO(), stderr=stderr)
+        self.assertIn('per-process', stderr.getvalue())
+        # Read-only modes do not bump anything.
+        call_command('advance_booking_lifecycle', dry_run=True, stdout=StringIO())
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache:6379'}})
+    def test_redis_counts_as_shared(self):
+        self.assertTrue(shared_cache_configured())
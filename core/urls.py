@@ -8,6 +8,7 @@ urlpatterns = [
     # Add your property-related URLs here
     path('', views.home, name='home'),
     path('all_properties/', views.properties_list, name='properties_list'),
+    path('all_properties/facets/', views.properties_facets, name='properties_facets'),
     path('hosts/', views.hosts_view, name='hosts'),
     
     # Placeholder paths for the other links in the hosts.html template.
@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def _version_key(namespace):
+    return f'version:{namespace}'
+
+
+def _seed_version():
+    # Seed from the clock so a counter that was evicted never restarts at a
+    # value an in-process index may already have been built against.
+    return int(time.time() * 1000)
+
+
+def get_version(namespace):
+    """Return the current version counter for a namespace, creating it when missing."""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _seed_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(namespaces):
+    """Return a {namespace: version} dict using a single cache round trip."""
+    namespaces = list(dict.fromkeys(namespaces))
+    keys = {_version_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(list(keys))
+    versions = {keys[key]: value for key, value in found.items()}
+    for namespace in namespaces:
+        if namespace not in versions:
+            versions[namespace] = get_version(namespace)
+    return versions
+
+
+def bump_version(namespace):
+    """Advance a namespace counter and return the new value."""
+    key = _version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, _seed_version(), timeout=None)
+        return cache.incr(key)
+
+
+def shared_cache_configured():
+    """Whether counters bumped in this process are seen by every other process."""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHE_BACKENDS
@@ -13,11 +13,19 @@ from django.shortcuts import render
 from django.http import HttpResponse
 from django.template import loader
 import decimal
-from datetime import datetime
-from properties.models import Property, Review
+from datetime import date, datetime
+from core.pagination import decode_cursor, encode_cursor, keyset_paginate, query_fingerprint, row_key
+from core.facets import compute_facets
+from core.search_cache import PAGING_PARAMS, get_search_results, search_results_key, set_search_results
+from properties.choice_masks import choice_facet_counts, filter_by_choices
+from properties.geo import DEFAULT_SEARCH_RADIUS_KM, nearby_properties, valid_pin
+from properties.models import Property, Review, choices_mask
+from properties.pricing import attach_stay_totals
+from properties.search_index import LOCATION_FIELDS, order_by_relevance, search_property_ids
 from bookings.models import Booking
+from bookings.occupancy import booked_property_ids, earliest_stay_starts
 from hosts.models import Host
-from django.db.models import Avg, Count, Max
+from django.db.models import Avg, Case, Count, F, IntegerField, Max, Value, When
 from datetime import timedelta
 from django.utils import timezone
 from django.template.loader import render_to_string
@@ -79,55 +87,179 @@ from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.http import JsonResponse
 from properties.models import Property  # Import the Property model from your host app
 
-def properties_list(request):
+EXPLORE_PAGE_SIZE = 6
+APPROXIMATE_COUNT_CAP = 1000
+
+# Every ordering ends in a unique column so keyset cursors are unambiguous.
+EXPLORE_SORT_ORDERINGS = {
+    'recommended': ('-ranking_score', '-id'),
+    'price_asc': ('price_per_night', '-average_rating', '-id'),
+    'price_desc': ('-price_per_night', '-average_rating', '-id'),
+    'top_rated': ('-average_rating', '-review_count', '-id'),
+    'most_guests': ('-max_guests', '-average_rating', '-id'),
+    'nearest': ('distance_rank', '-id'),
+}
+MAX_FLEXIBLE_NIGHTS = 30
+FLEXIBLE_DEFAULT_WINDOW_DAYS = 30
+# Values that mean "no filter", so they share a result cache entry with an absent parameter.
+EXPLORE_PARAM_DEFAULTS = {'sort': 'recommended', 'property-type': 'All Types', 'guests': 'All Guests'}
+# Filters the facet endpoint counts alternatives for.
+EXPLORE_FACET_PARAMS = ('property-type', 'guests', 'min_price', 'max_price', 'amenities')
+
+
+def _explore_summary(filtered_properties, approximate=False, results_count=None):
+    """Headline numbers for the explore page, as JSON-safe values.
+
+    Pass ``results_count`` when the caller already knows it to skip the COUNT.
+    In ``approximate`` mode every figure, including the version stamp, is
+    taken over at most ``APPROXIMATE_COUNT_CAP + 1`` matching rows, so the
+    cost stays bounded however many properties match.
     """
-    View to list properties and handle search/filtering.
-    It responds with JSON for AJAX requests and renders a full template otherwise.
+    if approximate and results_count is None:
+        bounded_ids = filtered_properties.order_by().values('id')[:APPROXIMATE_COUNT_CAP + 1]
+        filtered_properties = Property.objects.filter(id__in=bounded_ids)
+    destination = (
+        filtered_properties.exclude(city__exact='')
+        .values('city')
+        .annotate(total=Count('id'))
+        .order_by('-total', 'city')
+        .first()
+    )
+    summary = filtered_properties.aggregate(
+        avg_price=Avg('price_per_night'),
+        avg_rating=Avg('average_rating'),
+        latest_update=Max('updated_at'),
+        **({'total_results': Count('id')} if results_count is None else {}),
+    )
+    results_count_approximate = False
+    if results_count is None:
+        results_count = summary['total_results'] or 0
+        if approximate:
+            results_count_approximate = results_count > APPROXIMATE_COUNT_CAP
+            results_count = min(results_count, APPROXIMATE_COUNT_CAP)
+    return {
+        'results_count': results_count,
+        'results_count_approximate': results_count_approximate,
+        'avg_price': float(summary['avg_price'] or 0),
+        'avg_rating': float(summary['avg_rating'] or 0),
+        'top_destination': destination['city'] if destination else '',
+        'version': f"{results_count}:{summary['latest_update'].isoformat() if summary['latest_update'] else 'none'}",
+    }
+
+
+def _attach_distances(properties, geo_distances):
+    for property_obj in properties:
+        distance = geo_distances.get(property_obj.id)
+        property_obj.distance_km = round(distance, 1) if distance is not None else None
+
+
+def _attach_flex_starts(properties, flex_starts):
+    for property_obj in properties:
+        property_obj.flex_starts = [
+            date.fromisoformat(start) if isinstance(start, str) else start
+            for start in flex_starts.get(property_obj.id, ())
+        ]
+
+
+def _stay_dates(params):
+    try:
+        check_in = datetime.strptime(params.get('check_in') or '', '%Y-%m-%d').date()
+        check_out = datetime.strptime(params.get('check_out') or '', '%Y-%m-%d').date()
+    except ValueError:
+        return None
+    return (check_in, check_out) if check_out > check_in else None
+
+
+def _attach_explore_stay_totals(properties, params):
+    """Price the searched stay, or each card's first flexible start, on every card in one pass."""
+    stay = _stay_dates(params)
+    flexible = None if stay else _flexible_window(params)
+    stays = {}
+    for property_obj in properties:
+        if stay:
+            stays[property_obj.id] = stay
+        elif flexible and getattr(property_obj, 'flex_starts', None):
+            start = property_obj.flex_starts[0]
+            stays[property_obj.id] = (start, start + timedelta(days=flexible[0]))
+    if stays:
+        attach_stay_totals(properties, stays)
+
+
+def _price_param(value):
+    """A price filter as a Decimal, or None when missing, malformed or not finite (NaN, Infinity)."""
+    if not value:
+        return None
+    try:
+        price = Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return price if price.is_finite() else None
+
+
+def _flexible_window(params):
+    """``(nights, window_start, window_end)`` for an "N nights anytime in a month" search, or None."""
+    try:
+        nights = int(params.get('flex_nights') or 0)
+    except (TypeError, ValueError):
+        return None
+    if not 1 <= nights <= MAX_FLEXIBLE_NIGHTS:
+        return None
+    today = timezone.localdate()
+    month = params.get('flex_month')
+    if month:
+        try:
+            window_start = datetime.strptime(month, '%Y-%m').date()
+            window_end = (window_start + timedelta(days=32)).replace(day=1)
+        except (ValueError, OverflowError):
+            return None
+    else:
+        window_start, window_end = today, today + timedelta(days=FLEXIBLE_DEFAULT_WINDOW_DAYS)
+    window_start = max(window_start, today)
+    if (window_end - window_start).days < nights:
+        return None
+    return nights, window_start, window_end
+
+
+def _explore_queryset(params):
+    """Filter and order active properties for an explore query.
+
+    Returns ``(queryset, ordering, geo_distances, flex_starts)`` where
+    ``geo_distances`` maps property ids to kilometres from the search pin,
+    nearest first, and ``flex_starts`` maps ids to their earliest start
+    dates in a flexible-date search.
     """
-    # Start with all active Propertys
-    filtered_properties = Property.objects.filter(is_active=True).order_by('id')
+    filtered_properties = Property.objects.filter(is_active=True)
 
-    # Get filter parameters from the request
-    location_query = request.GET.get('location')
-    location_lat = request.GET.get('location_lat')
-    location_lng = request.GET.get('location_lng')
-    property_type_query = request.GET.get('property-type')
-    guests_query = request.GET.get('guests')
-    min_price = request.GET.get('min_price')
-    max_price = request.GET.get('max_price')
-    check_in = request.GET.get('check_in')
-    check_out = request.GET.get('check_out')
-    sort_by = request.GET.get('sort', 'recommended')
+    location_query = params.get('location')
+    location_lat = params.get('location_lat')
+    location_lng = params.get('location_lng')
+    property_type_query = params.get('property-type')
+    guests_query = params.get('guests')
+    min_price = params.get('min_price')
+    max_price = params.get('max_price')
+    check_in = params.get('check_in')
+    check_out = params.get('check_out')
+    sort_by = params.get('sort', 'recommended')
 
-    # Apply filters if they exist
+    geo_distances = {}
     if location_query:
-        geo_filtered = None
         if location_lat and location_lng:
             try:
-                lat = Decimal(location_lat)
-                lng = Decimal(location_lng)
-                delta = Decimal('0.45')
-                geo_filtered = filtered_properties.filter(
-                    latitude__isnull=False,
-                    longitude__isnull=False,
-                    latitude__gte=lat - delta,
-                    latitude__lte=lat + delta,
-                    longitude__gte=lng - delta,
-                    longitude__lte=lng + delta,
-                )
-            except (InvalidOperation, TypeError):
-                geo_filtered = None
-
-        if geo_filtered is not None and geo_filtered.exists():
-            filtered_properties = geo_filtered
+                radius_km = float(params.get('radius_km') or DEFAULT_SEARCH_RADIUS_KM)
+                pin = float(location_lat), float(location_lng)
+            except (ValueError, TypeError):
+                pin = None
+            # An unusable pin (inf, NaN, off the globe) falls back to the text match.
+            if pin and valid_pin(*pin):
+                geo_distances = dict(nearby_properties(*pin, radius_km=radius_km))
+
+        if geo_distances:
+            filtered_properties = filtered_properties.filter(id__in=list(geo_distances))
         else:
-            filtered_properties = filtered_properties.filter(
-                Q(city__icontains=location_query) |
-                Q(state__icontains=location_query) |
-                Q(country__icontains=location_query) |
-                Q(address__icontains=location_query) |
-                Q(name__icontains=location_query)
-            )
+            # Only the match set is used; the explore sorts below decide the order.
+            text_matches = search_property_ids(location_query, fields=LOCATION_FIELDS)
+            if text_matches is not None:
+                filtered_properties = filtered_properties.filter(id__in=text_matches)
 
     if property_type_query and property_type_query != 'All Types':
         filtered_properties = filtered_properties.filter(property_type=property_type_query)
@@ -141,60 +273,129 @@ def properties_list(request):
         except (ValueError, TypeError):
             pass
 
-    if min_price:
-        try:
-            filtered_properties = filtered_properties.filter(price_per_night__gte=Decimal(min_price))
-        except (InvalidOperation, TypeError):
-            pass
+    min_price, max_price = _price_param(min_price), _price_param(max_price)
+    if min_price is not None:
+        filtered_properties = filtered_properties.filter(price_per_night__gte=min_price)
 
-    if max_price:
-        try:
-            filtered_properties = filtered_properties.filter(price_per_night__lte=Decimal(max_price))
-        except (InvalidOperation, TypeError):
-            pass
+    if max_price is not None:
+        filtered_properties = filtered_properties.filter(price_per_night__lte=max_price)
+
+    amenities = params.getlist('amenities')
+    if amenities:
+        filtered_properties = filter_by_choices(filtered_properties, 'amenities', amenities)
 
     if check_in and check_out:
         try:
             check_in_date = datetime.strptime(check_in, '%Y-%m-%d').date()
             check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
-            booked_properties = Booking.objects.filter(
-                check_in_date__lt=check_out_date,
-                check_out_date__gt=check_in_date,
-                status__in=['confirmed', 'pending', 'checked_in']
-            ).values_list('property_id', flat=True)
-            filtered_properties = filtered_properties.exclude(id__in=booked_properties)
+            filtered_properties = filtered_properties.exclude(
+                id__in=booked_property_ids(check_in_date, check_out_date)
+            )
         except ValueError:
             pass
 
+    flex_starts = {}
+    flexible_window = None if check_in and check_out else _flexible_window(params)
+    if flexible_window:
+        # One id query, then a bitset scan per candidate rather than a query per start date.
+        flex_starts = earliest_stay_starts(filtered_properties.values_list('id', flat=True), *flexible_window)
+        filtered_properties = filtered_properties.filter(id__in=list(flex_starts))
+
     filtered_properties = filtered_properties.annotate(
         review_count=Count('reviews')
     )
 
-    if sort_by == 'price_asc':
-        filtered_properties = filtered_properties.order_by('price_per_night', '-average_rating')
-    elif sort_by == 'price_desc':
-        filtered_properties = filtered_properties.order_by('-price_per_night', '-average_rating')
-    elif sort_by == 'top_rated':
-        filtered_properties = filtered_properties.order_by('-average_rating', '-review_count', '-id')
-    elif sort_by == 'most_guests':
-        filtered_properties = filtered_properties.order_by('-max_guests', '-average_rating')
+    if sort_by == 'nearest' and geo_distances:
+        # geo_distances is already ordered nearest first by the spatial index.
+        filtered_properties = filtered_properties.annotate(
+            distance_rank=Case(
+                *[When(id=property_id, then=Value(rank)) for rank, property_id in enumerate(geo_distances)],
+                output_field=IntegerField(),
+            )
+        )
+        ordering = EXPLORE_SORT_ORDERINGS['nearest']
+    elif sort_by in EXPLORE_SORT_ORDERINGS and sort_by != 'nearest':
+        ordering = EXPLORE_SORT_ORDERINGS[sort_by]
     else:
-        filtered_properties = filtered_properties.order_by('-average_rating', 'price_per_night', '-id')
+        ordering = EXPLORE_SORT_ORDERINGS['recommended']
+    return filtered_properties.order_by(*ordering), ordering, geo_distances, flex_starts
 
-    destination = (
-        filtered_properties.exclude(city__exact='')
-        .values('city')
-        .annotate(total=Count('id'))
-        .order_by('-total', 'city')
-        .first()
-    )
-    summary = filtered_properties.aggregate(
-        avg_price=Avg('price_per_night'),
-        avg_rating=Avg('average_rating'),
-        total_results=Count('id'),
-        latest_update=Max('updated_at'),
+
+def _build_explore_results(params):
+    """Full ordered id list and summary for an explore query, in cacheable form."""
+    filtered_properties, ordering, geo_distances, flex_starts = _explore_queryset(params)
+    property_ids = list(filtered_properties.values_list('id', flat=True))
+    ranks = {property_id: rank for rank, property_id in enumerate(geo_distances)}
+    return {
+        'ids': property_ids,
+        'ordering': list(ordering),
+        'distances': {property_id: geo_distances[property_id] for property_id in property_ids if property_id in geo_distances},
+        'ranks': {property_id: ranks[property_id] for property_id in property_ids if property_id in ranks},
+        'flex_starts': {
+            property_id: [start.isoformat() for start in flex_starts[property_id]]
+            for property_id in property_ids if property_id in flex_starts
+        },
+        'summary': _explore_summary(filtered_properties, results_count=len(property_ids)),
+    }
+
+
+def _explore_page_rows(property_ids, results):
+    """Load only the properties shown on one page, in cached result order."""
+    rows = Property.objects.filter(id__in=property_ids).annotate(review_count=Count('reviews'))
+    rows_by_id = {row.id: row for row in rows}
+    page_rows = [rows_by_id[property_id] for property_id in property_ids if property_id in rows_by_id]
+    for row in page_rows:
+        if row.id in results['ranks']:
+            row.distance_rank = results['ranks'][row.id]
+    _attach_distances(page_rows, results['distances'])
+    _attach_flex_starts(page_rows, results['flex_starts'])
+    return page_rows
+
+
+def properties_list(request):
+    """
+    View to list properties and handle search/filtering.
+    It responds with JSON for AJAX requests and renders a full template otherwise.
+    """
+    # Get filter parameters from the request
+    location_query = request.GET.get('location')
+    location_lat = request.GET.get('location_lat')
+    location_lng = request.GET.get('location_lng')
+    property_type_query = request.GET.get('property-type')
+    guests_query = request.GET.get('guests')
+    min_price = request.GET.get('min_price')
+    max_price = request.GET.get('max_price')
+    check_in = request.GET.get('check_in')
+    check_out = request.GET.get('check_out')
+    sort_by = request.GET.get('sort', 'recommended')
+
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    # Infinite scroll opts into keyset paging by sending a (possibly empty) cursor.
+    cursor_mode = is_ajax and 'cursor' in request.GET
+    approximate = cursor_mode and request.GET.get('count') == 'approx'
+    search_fingerprint = query_fingerprint(request.GET)
+    cursor = decode_cursor(request.GET.get('cursor')) if cursor_mode else None
+    if cursor and cursor.get('q') != search_fingerprint:
+        cursor = None
+
+    results_key = search_results_key(
+        'explore',
+        request.GET,
+        defaults=EXPLORE_PARAM_DEFAULTS,
+        case_insensitive=('location',),
     )
-    live_version = f"{summary['total_results'] or 0}:{summary['latest_update'].isoformat() if summary['latest_update'] else 'none'}"
+    results = get_search_results(results_key)
+    position = None
+    if results is not None:
+        if cursor is None:
+            position = 0
+        elif cursor.get('p') and 0 < cursor['p'] <= len(results['ids']) and results['ids'][cursor['p'] - 1] == cursor['k'][-1]:
+            position = cursor['p']
+    elif cursor is None and not approximate:
+        results = _build_explore_results(request.GET)
+        set_search_results(results_key, results)
+        position = 0
+
     user_booked_property_ids = []
     if request.user.is_authenticated and request.user.role in ['guest', 'both']:
         user_booked_property_ids = list(
@@ -204,8 +405,71 @@ def properties_list(request):
             .distinct()
         )
 
-    # Set up pagination
-    paginator = Paginator(filtered_properties, 6) # Show 6 properties per page
+    if cursor_mode:
+        if position is None:
+            # Cache miss mid-scroll (or an approximate first page): page straight from the database.
+            filtered_properties, ordering, geo_distances, flex_starts = _explore_queryset(request.GET)
+            if cursor and cursor.get('o') != list(ordering):
+                cursor = None
+            explore_summary = cursor['s'] if cursor else _explore_summary(filtered_properties, approximate=approximate)
+            keyset_page = keyset_paginate(
+                filtered_properties,
+                ordering,
+                EXPLORE_PAGE_SIZE,
+                after=cursor['k'] if cursor else None,
+            )
+            page_rows = keyset_page.object_list
+            _attach_distances(page_rows, geo_distances)
+            _attach_flex_starts(page_rows, flex_starts)
+            has_next, next_key, next_position = keyset_page.has_next, keyset_page.next_key, None
+        else:
+            # Deeper pages reuse the summary snapshot taken on the first page.
+            explore_summary = cursor['s'] if cursor else results['summary']
+            ordering = results['ordering']
+            page_ids = results['ids'][position:position + EXPLORE_PAGE_SIZE]
+            page_rows = _explore_page_rows(page_ids, results)
+            next_position = position + len(page_ids)
+            has_next = next_position < len(results['ids'])
+            next_key = row_key(page_rows[-1], ordering) if has_next and page_rows else None
+        _attach_explore_stay_totals(page_rows, request.GET)
+
+        next_cursor = None
+        if has_next and next_key:
+            next_cursor = encode_cursor({
+                'q': search_fingerprint,
+                'o': list(ordering),
+                'k': next_key,
+                'p': next_position,
+                's': {**explore_summary, 'results_count_approximate': True},
+            })
+        results_html = render_to_string(
+            'core/_property_results.html',
+            {
+                'properties': page_rows,
+                'user': request.user,
+                'user_booked_property_ids': user_booked_property_ids,
+            },
+            request=request,
+        )
+        return JsonResponse({
+            'html': results_html,
+            'version': explore_summary['version'],
+            'has_next': has_next,
+            'next_cursor': next_cursor,
+            'location': location_query,
+            'property_type': property_type_query,
+            'guests': guests_query,
+            'results_count': explore_summary['results_count'],
+            'results_count_approximate': explore_summary['results_count_approximate'],
+            'avg_price': explore_summary['avg_price'],
+            'avg_rating': explore_summary['avg_rating'],
+            'top_destination': explore_summary['top_destination'],
+        })
+
+    explore_summary = results['summary']
+
+    # Set up pagination over the cached id list; only the page's rows are loaded.
+    paginator = Paginator(results['ids'], EXPLORE_PAGE_SIZE)
     page_number = request.GET.get('page', 1)
     try:
         page_obj = paginator.page(page_number)
@@ -213,9 +477,11 @@ def properties_list(request):
         page_obj = paginator.page(1)
     except EmptyPage:
         page_obj = paginator.page(paginator.num_pages)
+    page_obj.object_list = _explore_page_rows(list(page_obj.object_list), results)
+    _attach_explore_stay_totals(page_obj.object_list, request.GET)
 
     # Check if the request is an AJAX request
-    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+    if is_ajax:
         results_html = render_to_string(
             'core/_property_results.html',
             {
@@ -227,7 +493,7 @@ def properties_list(request):
         )
         data = {
             'html': results_html,
-            'version': live_version,
+            'version': explore_summary['version'],
             'page': page_obj.number,
             'total_pages': paginator.num_pages,
             'has_next': page_obj.has_next(),
@@ -235,10 +501,10 @@ def properties_list(request):
             'location': location_query,
             'property_type': property_type_query,
             'guests': guests_query,
-            'results_count': summary['total_results'] or 0,
-            'avg_price': summary['avg_price'] or 0,
-            'avg_rating': summary['avg_rating'] or 0,
-            'top_destination': destination['city'] if destination else '',
+            'results_count': explore_summary['results_count'],
+            'avg_price': explore_summary['avg_price'],
+            'avg_rating': explore_summary['avg_rating'],
+            'top_destination': explore_summary['top_destination'],
         }
         return JsonResponse(data)
     
@@ -250,45 +516,99 @@ def properties_list(request):
         'location': location_query,
         'location_lat': location_lat,
         'location_lng': location_lng,
+        'radius_km': request.GET.get('radius_km'),
+        'flex_nights': request.GET.get('flex_nights'),
+        'flex_month': request.GET.get('flex_month'),
         'property_type': property_type_query,
         'guests': guests_query,
         'min_price': min_price,
         'max_price': max_price,
+        'amenity_choices': Property.AMENITY_CHOICES,
+        'amenities': request.GET.getlist('amenities'),
         'check_in': check_in,
         'check_out': check_out,
         'sort': sort_by,
-        'results_count': summary['total_results'] or 0,
-        'avg_price': summary['avg_price'] or 0,
-        'avg_rating': summary['avg_rating'] or 0,
-        'top_destination': destination['city'] if destination else '',
+        'results_count': explore_summary['results_count'],
+        'avg_price': explore_summary['avg_price'],
+        'avg_rating': explore_summary['avg_rating'],
+        'top_destination': explore_summary['top_destination'],
         'user_booked_property_ids': user_booked_property_ids,
-        'live_version': live_version,
+        'live_version': explore_summary['version'],
     }
     return render(request, 'core/properties.html', context)
 
 
 
+def _explore_facet_selection(params):
+    """The facet-owned explore filters, parsed the way ``_explore_queryset`` reads them."""
+    selection = {
+        'property_type': None,
+        'min_guests': None,
+        'min_price': None,
+        'max_price': None,
+        'amenities_mask': choices_mask(params.getlist('amenities'), Property.AMENITY_BITS),
+    }
+    property_type = params.get('property-type')
+    if property_type and property_type != 'All Types':
+        selection['property_type'] = property_type
+    guests = params.get('guests')
+    if guests and guests != 'All Guests':
+        try:
+            selection['min_guests'] = 4 if guests == '4+ Guests' else int(str(guests).split(' ')[0])
+        except (ValueError, TypeError):
+            pass
+    for key in ('min_price', 'max_price'):
+        selection[key] = _price_param(params.get(key))
+    return selection
+
+
+def properties_facets(request):
+    """
+    Facet counts for the explore filters as JSON.
+    One query loads the facet columns of every property matching the
+    non-facet filters; all counts are then taken from that snapshot.
+    """
+    cache_key = search_results_key(
+        'explore-facets',
+        request.GET,
+        ignore=PAGING_PARAMS + ('sort',),
+        defaults=EXPLORE_PARAM_DEFAULTS,
+        case_insensitive=('location',),
+    )
+    facets = get_search_results(cache_key)
+    if facets is None:
+        base_params = request.GET.copy()
+        for key in EXPLORE_FACET_PARAMS:
+            base_params.pop(key, None)
+        base_properties = _explore_queryset(base_params)[0]
+        rows = base_properties.order_by().values_list(
+            'property_type', 'price_per_night', 'max_guests', 'amenities_mask', 'city'
+        )
+        facets = compute_facets(rows.iterator(), **_explore_facet_selection(request.GET))
+        set_search_results(cache_key, facets)
+    return JsonResponse(facets)
+
+
 def home(request):
     """Data-driven home page with dynamic content"""
     
     # Top-rated properties (minimum 3 reviews, rating >= 4.5)
     top_rated_properties = Property.objects.filter(
-        is_active=True
+        is_active=True,
+        average_rating__gte=4.5,
+        reviews_count__gte=3,
     ).annotate(
-        avg_rating=Avg('reviews__rating'),
-        review_count=Count('reviews')
-    ).filter(
-        avg_rating__gte=4.5,
-        review_count__gte=3
-    ).order_by('-avg_rating', '-review_count')[:6]
+        avg_rating=F('average_rating'),
+        review_count=F('reviews_count')
+    ).order_by('-average_rating', '-reviews_count')[:6]
     
-    # Most booked properties
+    # Most booked properties (bookings in the ranking window)
     most_booked_properties = Property.objects.filter(
         is_active=True
     ).annotate(
-        booking_count=Count('bookings'),
-        avg_rating=Avg('reviews__rating')
-    ).order_by('-booking_count', '-avg_rating')[:6]
+        booking_count=F('recent_bookings_count'),
+        avg_rating=F('average_rating')
+    ).order_by('-recent_bookings_count', '-ranking_score')[:6]
     
     # Superhosts with their properties
     superhosts = Host.objects.filter(
@@ -301,12 +621,12 @@ def home(request):
     recently_booked_properties = Property.objects.filter(
         bookings__created_at__gte=thirty_days_ago,
         is_active=True
-    ).distinct().annotate(avg_rating=Avg('reviews__rating')).order_by('-bookings__created_at')[:6]
+    ).distinct().annotate(avg_rating=F('average_rating')).order_by('-bookings__created_at')[:6]
     
     # Properties with special offers (you can add a discount field later)
     special_offer_properties = Property.objects.filter(
         is_active=True
-    ).annotate(avg_rating=Avg('reviews__rating')).order_by('?')[:4]  # Random selection for now
+    ).annotate(avg_rating=F('average_rating')).order_by('?')[:4]  # Random selection for now
 
     # Popular destinations (by number of active properties)
     popular_destinations = Property.objects.filter(
@@ -369,11 +689,9 @@ def property_search(request):
     
     # Apply filters
     if location:
-        properties = properties.filter(
-            Q(city__icontains=location) |
-            Q(state__icontains=location) |
-            Q(country__icontains=location)
-        )
+        location_matches = search_property_ids(location, fields=('city', 'state', 'country'))
+        if location_matches is not None:
+            properties = order_by_relevance(properties.filter(id__in=location_matches), location_matches)
     
     if property_type:
         properties = properties.filter(property_type=property_type)
@@ -388,7 +706,7 @@ def property_search(request):
         properties = properties.filter(price_per_night__lte=decimal.Decimal(max_price))
     
     if amenities:
-        properties = properties.filter(amenities__contains=amenities)
+        properties = filter_by_choices(properties, 'amenities', amenities)
     
     # Date availability filtering
     if check_in and check_out:
@@ -397,13 +715,7 @@ def property_search(request):
             check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
             
             # Get properties with no conflicting bookings
-            booked_properties = Booking.objects.filter(
-                check_in_date__lt=check_out_date,
-                check_out_date__gt=check_in_date,
-                status__in=['confirmed', 'checked_in']
-            ).values_list('property_id', flat=True)
-            
-            properties = properties.exclude(id__in=booked_properties)
+            properties = properties.exclude(id__in=booked_property_ids(check_in_date, check_out_date))
         except ValueError:
             pass
     
@@ -423,6 +735,7 @@ def property_search(request):
         'search_params': request.GET,
         'property_types': dict(Property.PROPERTY_TYPES),
         'amenity_choices': Property.AMENITY_CHOICES,
+        'amenity_counts': choice_facet_counts(properties, 'amenities'),
     }
     
     return render(request, 'core/property_search.html', context)
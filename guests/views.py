@@ -126,7 +126,7 @@ def guest_dashboard_view(request):
     payment_history = BookingPayment.objects.filter(guest=request.user).select_related('booking', 'booking__property').order_by('-created_at')
     recommended_stays = Property.objects.filter(is_active=True).exclude(
         id__in=bookings.values_list('property_id', flat=True)
-    ).order_by('-average_rating', 'price_per_night')[:4]
+    ).order_by('-ranking_score', '-id')[:4]
     review_ready_bookings = bookings.filter(
         status__in=['checked_out', 'completed']
     ).order_by('-check_out_date')[:3]
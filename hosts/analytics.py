@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from bookings.live import host_live_version_namespace
+from bookings.models import Booking
+from core.versioning import get_version
+from properties.models import Property
+
+HOST_ANALYTICS_CACHE_SECONDS = getattr(settings, 'HOST_ANALYTICS_CACHE_SECONDS', 900)
+ANALYTICS_PAST_DAYS = 365
+ANALYTICS_FUTURE_DAYS = 90
+
+
+def _ratio(numerator, denominator, digits):
+    out = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out.round(digits).tolist()
+
+
+def _metrics(nights, revenue, available):
+    return {
+        'occupancy': _ratio(nights, available, 4),
+        'adr': _ratio(revenue, nights, 2),
+        'revpar': _ratio(revenue, available, 2),
+    }
+
+
+def _series(labels, nights, revenue, available, listings):
+    """One chart block: per-listing rows of the ``(listing, bucket)`` grids plus the portfolio total."""
+    return {
+        'labels': labels,
+        'listings': [
+            {'id': listing_id, 'name': name, **_metrics(nights[row], revenue[row], available[row])}
+            for row, (listing_id, name) in enumerate(listings)
+        ],
+        'total': _metrics(nights.sum(axis=0), revenue.sum(axis=0), available.sum(axis=0)),
+    }
+
+
+def _build_analytics(owner_id, today):
+    start = today - timedelta(days=ANALYTICS_PAST_DAYS)
+    end = today + timedelta(days=ANALYTICS_FUTURE_DAYS)
+    first, days = start.toordinal(), (end - start).days
+    listings = list(Property.objects.filter(owner_id=owner_id).order_by('id').values_list('id', 'name', 'created_at'))
+    rows = list(
+        Booking.objects.filter(
+            property__owner_id=owner_id,
+            status__in=Booking.REVENUE_ACTIVE_STATUSES,
+            check_in_date__lt=end,
+            check_out_date__gt=start,
+        ).values_list('property_id', 'check_in_date', 'check_out_date', 'total_price')
+    )
+
+    listing_ids = np.array([listing[0] for listing in listings], dtype=np.int64)
+    opened = np.array([timezone.localtime(listing[2]).date().toordinal() - first for listing in listings], dtype=np.int64)
+    available = (np.arange(days)[None, :] >= opened[:, None]).astype(np.int64)
+
+    nights = np.zeros((len(listings), days), dtype=np.int64)
+    revenue = np.zeros((len(listings), days))
+    if rows:
+        stay_row = np.searchsorted(listing_ids, np.array([row[0] for row in rows], dtype=np.int64))
+        stay_in = np.array([row[1].toordinal() for row in rows], dtype=np.int64) - first
+        stay_out = np.array([row[2].toordinal() for row in rows], dtype=np.int64) - first
+        # The stay's price is spread evenly over all its nights before clipping to the window.
+        stay_rate = np.array([float(row[3] or 0) for row in rows]) / np.maximum(stay_out - stay_in, 1)
+        clipped_in, clipped_out = np.maximum(stay_in, 0), np.minimum(stay_out, days)
+        stay_nights = np.maximum(clipped_out - clipped_in, 0)
+
+        night_stay = np.repeat(np.arange(len(rows)), stay_nights)
+        night_offset = np.arange(len(night_stay)) - np.repeat(np.cumsum(stay_nights) - stay_nights, stay_nights)
+        buckets = stay_row[night_stay] * days + clipped_in[night_stay] + night_offset
+        # Overlapping stays still add revenue but a night is only occupied once.
+        nights = np.minimum(np.bincount(buckets, minlength=nights.size).reshape(nights.shape), 1)
+        revenue = np.bincount(buckets, weights=stay_rate[night_stay], minlength=revenue.size).reshape(revenue.shape)
+    # Nights before a listing went up are not part of its supply.
+    nights *= available
+    revenue *= available
+
+    # Weeks start on Monday; ordinal 1 is a Monday.
+    week = (np.arange(days) + first - 1) // 7
+    week -= week[0]
+    week_count = int(week[-1]) + 1 if days else 0
+    week_starts = [start - timedelta(days=start.weekday()) + timedelta(weeks=index) for index in range(week_count)]
+
+    def weekly(grid):
+        return np.stack([np.bincount(week, weights=row, minlength=week_count) for row in grid]) if len(grid) else np.zeros((0, week_count))
+
+    listing_labels = [(listing[0], listing[1]) for listing in listings]
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'today': today.isoformat(),
+        'daily': _series([(start + timedelta(days=index)).isoformat() for index in range(days)], nights, revenue, available, listing_labels),
+        'weekly': _series([day.isoformat() for day in week_starts], weekly(nights), weekly(revenue), weekly(available), listing_labels),
+    }
+
+
+def host_performance_analytics(owner_id, today=None):
+    """Daily and weekly occupancy, ADR and RevPAR per listing from a year back to 90 days ahead.
+
+    Built from one bookings query expanded into ``(listing, day)`` arrays
+    and cached under the host's live version, which every booking, payment
+    and listing change moves. Revenue counts confirmed and later stays,
+    spread evenly over their nights; weekly buckets start on Monday and
+    are labelled with that date, so the first and last may be partial.
+    """
+    today = today or timezone.localdate()
+    version = get_version(host_live_version_namespace(owner_id))
+    key = f'host-analytics:{owner_id}:{version}:{today:%Y%m%d}'
+    analytics = cache.get(key)
+    if analytics is None:
+        analytics = _build_analytics(owner_id, today)
+        cache.set(key, analytics, HOST_ANALYTICS_CACHE_SECONDS)
+    return analytics
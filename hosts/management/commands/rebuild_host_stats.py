@@ -0,0 +1,31 @@
+from core.management.base import SharedCacheCommand
+from hosts.stats import rebuild_stats, stats_drift
+
+
+class Command(SharedCacheCommand):
+    help = (
+        'Recompute the per-listing and per-host stats rollups from scratch. '
+        'With --check, report rows that drifted from a fresh computation instead of writing. '
+        'Writes keep the rollups current; run it daily as a safety net.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--check', action='store_true', help='Only report drift; exit non-zero when any is found.')
+
+    def requires_shared_cache(self, options):
+        return not options['check']
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = stats_drift(batch_size=options['batch_size'])
+            for kind, object_id, differences in drift:
+                details = ', '.join(f'{field}: {stored!r} != {expected!r}' for field, (stored, expected) in differences.items())
+                self.stdout.write(f'{kind} {object_id}: {details}')
+            if drift:
+                self.stderr.write(self.style.ERROR(f'{len(drift)} stats rows drifted.'))
+                raise SystemExit(1)
+            self.stdout.write(self.style.SUCCESS('Stats rollups match the source tables.'))
+            return
+        properties, hosts = rebuild_stats(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {properties} listings and {hosts} hosts.'))
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hosts', '0010_host_mpesa_phone_number_host_payout_method_and_more'),
+        ('properties', '0018_pricing_rule'),
+        ('users', '0007_customuser_government_id_document_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HostStats',
+            fields=[
+                ('booking_count', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('confirmed_count', models.PositiveIntegerField(default=0)),
+                ('active_count', models.PositiveIntegerField(default=0)),
+                ('cancelled_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_payment_count', models.PositiveIntegerField(default=0)),
+                ('next_arrival_date', models.DateField(blank=True, null=True)),
+                ('image_count', models.PositiveIntegerField(default=0)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.FloatField(default=0)),
+                ('latest_booking_update', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('host', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='host_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('property_count', models.PositiveIntegerField(default=0)),
+                ('active_property_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PropertyStats',
+            fields=[
+                ('booking_count', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('confirmed_count', models.PositiveIntegerField(default=0)),
+                ('active_count', models.PositiveIntegerField(default=0)),
+                ('cancelled_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_payment_count', models.PositiveIntegerField(default=0)),
+                ('next_arrival_date', models.DateField(blank=True, null=True)),
+                ('image_count', models.PositiveIntegerField(default=0)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.FloatField(default=0)),
+                ('latest_booking_update', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('property', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='properties.property')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
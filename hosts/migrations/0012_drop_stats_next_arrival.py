@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:15
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hosts', '0011_property_host_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='hoststats',
+            name='next_arrival_date',
+        ),
+        migrations.RemoveField(
+            model_name='propertystats',
+            name='next_arrival_date',
+        ),
+    ]
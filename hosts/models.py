@@ -114,3 +114,41 @@ class Host(models.Model):
         ]
         completed = sum(1 for field in required_fields if field)
         return int((completed / len(required_fields)) * 100)
+
+
+class StatsFields(models.Model):
+    """Booking and payment rollups shared by the per-listing and per-host tables; see hosts.stats."""
+
+    booking_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    confirmed_count = models.PositiveIntegerField(default=0)
+    active_count = models.PositiveIntegerField(default=0)
+    cancelled_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_payment_count = models.PositiveIntegerField(default=0)
+    image_count = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(default=0)
+    latest_booking_update = models.DateTimeField(blank=True, null=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class PropertyStats(StatsFields):
+    property = models.OneToOneField('properties.Property', on_delete=models.CASCADE, primary_key=True, related_name='stats')
+
+    def __str__(self):
+        return f"Stats for {self.property.name}"
+
+
+class HostStats(StatsFields):
+    host = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='host_stats')
+    property_count = models.PositiveIntegerField(default=0)
+    active_property_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Stats for {self.host.get_display_name()}"
@@ -0,0 +1,250 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bookings.live import bump_host_live_versions
+from bookings.models import Booking, BookingPayment
+from bookings.sync import bookings_changed
+from properties.models import Property, PropertyImage, Review
+
+from .models import Host, HostStats, PropertyStats
+
+BOOKING_COUNT_FIELDS = ['booking_count', 'pending_count', 'confirmed_count', 'active_count', 'cancelled_count', 'completed_count']
+PROPERTY_STAT_FIELDS = BOOKING_COUNT_FIELDS + [
+    'revenue',
+    'paid_total',
+    'paid_payment_count',
+    'image_count',
+    'review_count',
+    'average_rating',
+    'latest_booking_update',
+]
+HOST_STAT_FIELDS = PROPERTY_STAT_FIELDS + ['property_count', 'active_property_count']
+ZERO = Decimal('0.00')
+
+
+def _grouped(queryset, key, **aggregates):
+    return {row.pop(key): row for row in queryset.order_by().values(key).annotate(**aggregates)}
+
+
+def compute_property_stats(property_ids):
+    """``{property_id: {field: value}}`` for ``PROPERTY_STAT_FIELDS``, from one grouped query per source table.
+
+    Only values that change with writes are stored; date-relative figures
+    such as the next arrival are queried live, so rows never go stale overnight.
+    """
+    property_ids = list(property_ids)
+    bookings = _grouped(
+        Booking.objects.filter(property_id__in=property_ids),
+        'property_id',
+        booking_count=Count('id'),
+        pending_count=Count('id', filter=Q(status='pending')),
+        confirmed_count=Count('id', filter=Q(status='confirmed')),
+        active_count=Count('id', filter=Q(status='checked_in')),
+        cancelled_count=Count('id', filter=Q(status='cancelled')),
+        completed_count=Count('id', filter=Q(status__in=['completed', 'checked_out'])),
+        revenue=Sum('total_price', filter=Q(status__in=Booking.REVENUE_ACTIVE_STATUSES)),
+        latest_booking_update=Max('updated_at'),
+    )
+    payments = _grouped(
+        BookingPayment.objects.filter(booking__property_id__in=property_ids, status='paid'),
+        'booking__property_id',
+        paid_total=Sum('amount'),
+        paid_payment_count=Count('id'),
+    )
+    images = _grouped(PropertyImage.objects.filter(property_id__in=property_ids), 'property_id', image_count=Count('id'))
+    reviews = _grouped(
+        Review.objects.filter(property_id__in=property_ids),
+        'property_id',
+        review_count=Count('id'),
+        average_rating=Avg('rating'),
+    )
+    stats = {}
+    for property_id in property_ids:
+        row = {field: 0 for field in BOOKING_COUNT_FIELDS}
+        row.update(bookings.get(property_id, {}), **payments.get(property_id, {}))
+        row.update(images.get(property_id, {}), **reviews.get(property_id, {}))
+        row['revenue'] = row.get('revenue') or ZERO
+        row['paid_total'] = row.get('paid_total') or ZERO
+        row['average_rating'] = round(row.get('average_rating') or 0, 2)
+        for field in PROPERTY_STAT_FIELDS:
+            row.setdefault(field, 0 if field.endswith('_count') else None)
+        stats[property_id] = row
+    return stats
+
+
+def compute_host_stats(host_ids):
+    """``{host_id: {field: value}}`` for ``HOST_STAT_FIELDS``, summed from the hosts' ``PropertyStats`` rows."""
+    host_ids = list(host_ids)
+    sums = {field: Sum(f'stats__{field}') for field in BOOKING_COUNT_FIELDS + ['revenue', 'paid_total', 'paid_payment_count', 'image_count', 'review_count']}
+    rows = _grouped(
+        Property.objects.filter(owner_id__in=host_ids),
+        'owner_id',
+        property_count=Count('id'),
+        active_property_count=Count('id', filter=Q(is_active=True)),
+        average_rating=Avg('stats__average_rating'),
+        latest_booking_update=Max('stats__latest_booking_update'),
+        **sums,
+    )
+    stats = {}
+    for host_id in host_ids:
+        row = rows.get(host_id, {})
+        for field in HOST_STAT_FIELDS:
+            if field in ('revenue', 'paid_total'):
+                row[field] = row.get(field) or ZERO
+            elif field == 'average_rating':
+                row[field] = round(row.get(field) or 0, 2)
+            elif field != 'latest_booking_update':
+                row[field] = row.get(field) or 0
+            else:
+                row.setdefault(field, None)
+        stats[host_id] = row
+    return stats
+
+
+def _store(model, key, stats, fields):
+    model.objects.bulk_create(
+        [model(**{key: object_id}, **values) for object_id, values in stats.items()],
+        update_conflicts=True,
+        unique_fields=[key],
+        update_fields=fields + ['refreshed_at'],
+    )
+
+
+def refresh_host_stats(host_ids):
+    """Recompute the given hosts' rollups and mirror the headline totals onto their ``Host`` profiles."""
+    stats = compute_host_stats({host_id for host_id in host_ids if host_id})
+    if not stats:
+        return stats
+    _store(HostStats, 'host_id', stats, HOST_STAT_FIELDS)
+    # Payments, reviews and imported blocks change the dashboard without a live announcement.
+    bump_host_live_versions(stats)
+    for host_profile in Host.objects.filter(user_id__in=stats).select_related('user'):
+        row = stats[host_profile.user_id]
+        totals = {
+            'total_properties': row['property_count'],
+            'total_bookings': row['booking_count'],
+            'total_earnings': row['revenue'],
+            'average_rating': Decimal(str(row['average_rating'])).quantize(ZERO),
+        }
+        if any(getattr(host_profile, field) != value for field, value in totals.items()):
+            for field, value in totals.items():
+                setattr(host_profile, field, value)
+            # save() also re-evaluates superhost status from the new totals.
+            host_profile.save()
+    return stats
+
+
+def refresh_property_stats(property_ids):
+    """Recompute the given listings' rollups, then their owners'. Missing (deleted) listings are skipped."""
+    owners = dict(Property.objects.filter(id__in=set(property_ids)).values_list('id', 'owner_id'))
+    if owners:
+        stats = compute_property_stats(owners)
+        _store(PropertyStats, 'property_id', stats, PROPERTY_STAT_FIELDS)
+        refresh_host_stats(set(owners.values()))
+    return owners
+
+
+def rebuild_stats(batch_size=500):
+    """Recompute every listing's and host's rollups. Returns ``(properties, hosts)`` counts."""
+    property_ids = list(Property.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(property_ids), batch_size):
+        _store(PropertyStats, 'property_id', compute_property_stats(property_ids[start:start + batch_size]), PROPERTY_STAT_FIELDS)
+    PropertyStats.objects.exclude(property_id__in=Property.objects.values('id')).delete()
+    host_ids = list(Property.objects.order_by().values_list('owner_id', flat=True).distinct())
+    host_ids += list(HostStats.objects.exclude(host_id__in=host_ids).values_list('host_id', flat=True))
+    for start in range(0, len(host_ids), batch_size):
+        refresh_host_stats(host_ids[start:start + batch_size])
+    return len(property_ids), len(host_ids)
+
+
+def _differences(stored, expected, fields):
+    return {
+        field: (getattr(stored, field, None), expected[field])
+        for field in fields
+        if stored is None or getattr(stored, field) != expected[field]
+    }
+
+
+def stats_drift(batch_size=500):
+    """Compare stored rollups with a fresh computation without writing.
+
+    Returns ``[(kind, object_id, {field: (stored, expected)})]`` for every
+    listing or host whose row is missing or differs.
+    """
+    drift = []
+    property_ids = list(Property.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(property_ids), batch_size):
+        batch = property_ids[start:start + batch_size]
+        stored = PropertyStats.objects.in_bulk(batch)
+        for property_id, expected in compute_property_stats(batch).items():
+            differences = _differences(stored.get(property_id), expected, PROPERTY_STAT_FIELDS)
+            if differences:
+                drift.append(('property', property_id, differences))
+    host_ids = list(Property.objects.order_by('owner_id').values_list('owner_id', flat=True).distinct())
+    for start in range(0, len(host_ids), batch_size):
+        batch = host_ids[start:start + batch_size]
+        stored = HostStats.objects.in_bulk(batch)
+        for host_id, expected in compute_host_stats(batch).items():
+            # Host totals are summed from the stored listing rows, so only
+            # listing drift can make them wrong; comparing is still cheap.
+            differences = _differences(stored.get(host_id), expected, HOST_STAT_FIELDS)
+            if differences:
+                drift.append(('host', host_id, differences))
+    return drift
+
+
+def property_stats_for(properties):
+    """``{property_id: PropertyStats}`` for listings, computing rows that do not exist yet."""
+    property_ids = [property_obj.id for property_obj in properties]
+    stats = PropertyStats.objects.in_bulk(property_ids)
+    missing = [property_id for property_id in property_ids if property_id not in stats]
+    if missing:
+        refresh_property_stats(missing)
+        stats.update(PropertyStats.objects.in_bulk(missing))
+    return stats
+
+
+def host_stats_for(user):
+    stats = HostStats.objects.filter(host=user).first()
+    if stats is None:
+        refresh_host_stats([user.id])
+        stats = HostStats.objects.get(host=user)
+    return stats
+
+
+def _refresh_on_commit(property_ids):
+    property_ids = set(property_ids)
+    transaction.on_commit(lambda: refresh_property_stats(property_ids))
+
+
+@receiver(bookings_changed)
+def bookings_changed_stats(sender, property_ids, **kwargs):
+    refresh_property_stats(property_ids)
+
+
+@receiver([post_save, post_delete], sender=BookingPayment)
+def payment_changed_stats(sender, instance, **kwargs):
+    property_id = Booking.objects.filter(id=instance.booking_id).values_list('property_id', flat=True).first()
+    if property_id:
+        _refresh_on_commit([property_id])
+
+
+@receiver([post_save, post_delete], sender=Review)
+@receiver([post_save, post_delete], sender=PropertyImage)
+def listing_detail_changed_stats(sender, instance, **kwargs):
+    _refresh_on_commit([instance.property_id])
+
+
+@receiver(post_save, sender=Property)
+def property_saved_stats(sender, instance, **kwargs):
+    _refresh_on_commit([instance.id])
+
+
+@receiver(post_delete, sender=Property)
+def property_deleted_stats(sender, instance, **kwargs):
+    owner_id = instance.owner_id
+    transaction.on_commit(lambda: refresh_host_stats([owner_id]))
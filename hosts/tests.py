@@ -1,10 +1,22 @@
+from datetime import timedelta
 from io import BytesIO
+from unittest import mock
 
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from PIL import Image
 
+from bookings.models import Booking, BookingPayment
+from bookings.sync import notify_bookings_changed
+from hosts import views as host_views
+from hosts.analytics import ANALYTICS_PAST_DAYS
+from hosts.models import Host, HostStats, PropertyStats
+from hosts.stats import rebuild_stats, stats_drift
 from properties.models import Property
 from users.models import CustomUser
 
@@ -59,3 +71,311 @@ class HostListingCreationTests(TestCase):
         self.assertEqual(response.status_code, 302)
         listing = Property.objects.get(name='Test Stay')
         self.assertEqual(listing.images.count(), 1)
+
+
+class BulkBookingActionTests(TestCase):
+    def setUp(self):
+        self.host = CustomUser.objects.create_user(username='bulkhost', email='bulkhost@example.com', password='testpass123', role='host')
+        other_host = CustomUser.objects.create_user(username='otherhost', email='otherhost@example.com', password='testpass123', role='host')
+        guest = CustomUser.objects.create_user(username='bulkguest', email='bulkguest@example.com', password='testpass123', role='guest')
+        day = lambda offset: timezone.localdate() + timedelta(days=offset)
+        listings = [
+            Property.objects.create(
+                owner=owner,
+                name=name,
+                description='Bulk stay.',
+                property_type='apartment',
+                address='Machakos',
+                city='Machakos',
+                state='Machakos',
+                price_per_night=1800,
+                max_guests=2,
+                bedrooms=1,
+                bathrooms=1,
+            )
+            for owner, name in ((self.host, 'Bulk A'), (self.host, 'Bulk B'), (other_host, 'Not Mine'))
+        ]
+        self.pending = [
+            Booking.objects.create(guest=guest, property=listing, check_in_date=day(5 + index), check_out_date=day(7 + index), num_guests=1, total_price=3600)
+            for index, listing in enumerate(listings)
+        ]
+        self.confirmed = Booking.objects.create(guest=guest, property=listings[0], check_in_date=day(20), check_out_date=day(22), num_guests=1, total_price=3600, status='confirmed')
+        self.client.force_login(self.host)
+
+    def test_confirms_eligible_bookings_in_one_batch(self):
+        with mock.patch('bookings.live.announce_live_update') as announce, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('hosts:bulk_update_booking_status'),
+                {'action': 'confirm', 'booking_ids': [booking.id for booking in self.pending] + [self.confirmed.id]},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+            )
+
+        payload = response.json()
+        self.assertEqual(payload['updated'], sorted([self.pending[0].id, self.pending[1].id]))
+        self.assertEqual({row['id'] for row in payload['skipped']}, {self.pending[2].id, self.confirmed.id})
+        self.assertEqual(announce.call_count, 1)
+        self.assertEqual(
+            list(Booking.objects.filter(id__in=[booking.id for booking in self.pending]).order_by('id').values_list('status', flat=True)),
+            ['confirmed', 'confirmed', 'pending'],
+        )
+        self.assertIsNone(Booking.objects.get(id=self.pending[0].id).hold_expires_at)
+
+    def test_malformed_ids_are_rejected(self):
+        response = self.client.post(
+            reverse('hosts:bulk_update_booking_status'),
+            {'action': 'confirm', 'booking_ids': ['²']},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class HostDashboardQueryTests(TestCase):
+    def setUp(self):
+        self.host = CustomUser.objects.create_user(username='counthost', email='counthost@example.com', password='testpass123', role='host')
+        self.guest = CustomUser.objects.create_user(username='countguest', email='countguest@example.com', password='testpass123', role='guest')
+        self.day = lambda offset: timezone.localdate() + timedelta(days=offset)
+        self.client.force_login(self.host)
+        self._add_listing(0)
+
+    def _add_listing(self, index):
+        listing = Property.objects.create(
+            owner=self.host,
+            name=f'Count {index}',
+            description='Query budget stay.',
+            property_type='apartment',
+            address='Thika',
+            city='Thika',
+            state='Kiambu',
+            price_per_night=2000,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+        for offset, status in ((3, 'pending'), (10, 'confirmed')):
+            Booking.objects.create(
+                guest=self.guest, property=listing, check_in_date=self.day(offset + index), check_out_date=self.day(offset + index + 2),
+                num_guests=1, total_price=4000, status=status,
+            )
+
+    def test_dashboard_query_count_does_not_grow_with_listings(self):
+        url = reverse('hosts:dashboard_live')
+        self.client.get(url)
+        # Drop the cached live fragment so each measured poll rebuilds the context.
+        cache.clear()
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(1, 6):
+                self._add_listing(index)
+
+        cache.clear()
+        with self.assertNumQueries(len(baseline)):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        context = self.client.get(reverse('hosts:dashboard')).context
+        self.assertEqual((context['total_properties'], context['total_bookings'], context['pending_bookings']), (6, 12, 6))
+        self.assertEqual(context['revenue'], 24000)
+        self.assertEqual(context['top_properties'][0]['booking_count'], 2)
+
+
+class HostStatsTests(TestCase):
+    def setUp(self):
+        self.host = CustomUser.objects.create_user(username='statshost', email='statshost@example.com', password='testpass123', role='host')
+        self.guest = CustomUser.objects.create_user(username='statsguest', email='statsguest@example.com', password='testpass123', role='guest')
+        self.day = lambda offset: timezone.localdate() + timedelta(days=offset)
+        Host.objects.create(user=self.host)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.listing = Property.objects.create(
+                owner=self.host,
+                name='Stats Villa',
+                description='Rollup stay.',
+                property_type='villa',
+                address='Kilifi',
+                city='Kilifi',
+                state='Kilifi',
+                price_per_night=5000,
+                max_guests=4,
+                bedrooms=2,
+                bathrooms=2,
+            )
+
+    def test_write_paths_keep_rollups_current_and_drift_is_reported(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.create(
+                guest=self.guest, property=self.listing, check_in_date=self.day(4), check_out_date=self.day(6), num_guests=2, total_price=10000,
+            )
+        stats = PropertyStats.objects.get(property=self.listing)
+        self.assertEqual((stats.booking_count, stats.pending_count, stats.revenue), (1, 1, 0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.filter(id=booking.id).update(status='confirmed')
+            notify_bookings_changed([self.listing.id])
+            BookingPayment.objects.create(booking=booking, guest=self.guest, host=self.host, amount=10000, status='paid')
+        host_stats = HostStats.objects.get(host=self.host)
+        self.assertEqual((host_stats.property_count, host_stats.confirmed_count, host_stats.revenue, host_stats.paid_total), (1, 1, 10000, 10000))
+        self.assertEqual(Host.objects.get(user=self.host).total_earnings, 10000)
+        self.assertEqual(stats_drift(), [])
+
+        # bulk_create skips signals, so the rollups fall behind until a rebuild.
+        Booking.objects.bulk_create([
+            Booking(guest=self.guest, property=self.listing, check_in_date=self.day(9), check_out_date=self.day(10), num_guests=1, total_price=5000),
+        ])
+        drift = {(kind, object_id): differences for kind, object_id, differences in stats_drift()}
+        self.assertEqual(drift[('property', self.listing.id)]['booking_count'], (1, 2))
+        rebuild_stats()
+        self.assertEqual(stats_drift(), [])
+        self.assertEqual(HostStats.objects.get(host=self.host).booking_count, 2)
+
+
+class HostLiveCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.host = CustomUser.objects.create_user(username='livehost', email='livehost@example.com', password='testpass123', role='host')
+        guest = CustomUser.objects.create_user(username='liveguest', email='liveguest@example.com', password='testpass123', role='guest')
+        listing = Property.objects.create(
+            owner=self.host,
+            name='Live Loft',
+            description='Polled stay.',
+            property_type='apartment',
+            address='Nyeri',
+            city='Nyeri',
+            state='Nyeri',
+            price_per_night=2200,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+        day = timezone.localdate()
+        self.booking = Booking.objects.create(
+            guest=guest, property=listing, check_in_date=day + timedelta(days=5), check_out_date=day + timedelta(days=7), num_guests=1, total_price=4400,
+        )
+        self.client.force_login(self.host)
+
+    def test_unchanged_polls_reuse_the_fragment_until_an_announcement(self):
+        url = reverse('hosts:property_bookings_live')
+        self.client.get(reverse('hosts:property_bookings'))
+        with mock.patch.object(host_views, '_host_bookings_context', wraps=host_views._host_bookings_context) as build:
+            first = self.client.get(url).json()
+            with CaptureQueriesContext(connection) as poll:
+                self.assertEqual(self.client.get(url).json(), first)
+            self.assertEqual(build.call_count, 1)
+            self.assertFalse([query for query in poll.captured_queries if 'bookings_booking' in query['sql']])
+
+            with mock.patch('bookings.live.announce_live_update'), self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('hosts:update_booking_status', args=[self.booking.id, 'confirmed']))
+            refreshed = self.client.get(url).json()
+        self.assertEqual(build.call_count, 2)
+        self.assertNotEqual(refreshed['html'], first['html'])
+
+
+class HostAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.host = CustomUser.objects.create_user(username='chartshost', email='chartshost@example.com', password='testpass123', role='host')
+        self.guest = CustomUser.objects.create_user(username='chartsguest', email='chartsguest@example.com', password='testpass123', role='guest')
+        self.listing = Property.objects.create(
+            owner=self.host,
+            name='Chart Cottage',
+            description='Measured stay.',
+            property_type='house',
+            address='Kisumu',
+            city='Kisumu',
+            state='Kisumu',
+            price_per_night=2000,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+        self.today = timezone.localdate()
+        self.client.force_login(self.host)
+
+    def _book(self, offset, nights, total, status):
+        return Booking.objects.create(
+            guest=self.guest,
+            property=self.listing,
+            check_in_date=self.today + timedelta(days=offset),
+            check_out_date=self.today + timedelta(days=offset + nights),
+            num_guests=1,
+            total_price=total,
+            status=status,
+        )
+
+    def test_series_spread_revenue_over_booked_nights(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._book(5, 2, 4400, 'confirmed')
+            self._book(10, 3, 6000, 'pending')
+
+        data = self.client.get(reverse('hosts:performance_analytics')).json()
+        daily = data['daily']['listings'][0]
+        night = ANALYTICS_PAST_DAYS + 5
+        self.assertEqual(data['daily']['labels'][night], (self.today + timedelta(days=5)).isoformat())
+        self.assertEqual(daily['occupancy'][night:night + 3], [1.0, 1.0, 0.0])
+        self.assertEqual(daily['adr'][night], 2200.0)
+        self.assertEqual(daily['occupancy'][ANALYTICS_PAST_DAYS + 10], 0.0)
+        # Nights before the listing existed are not supply.
+        self.assertEqual(daily['revpar'][0], 0.0)
+        arrival = self.today + timedelta(days=5)
+        week = data['weekly']['labels'].index((arrival - timedelta(days=arrival.weekday())).isoformat())
+        self.assertEqual(data['weekly']['listings'][0]['adr'][week], 2200.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._book(20, 1, 2500, 'confirmed')
+        refreshed = self.client.get(reverse('hosts:performance_analytics')).json()
+        self.assertEqual(refreshed['daily']['total']['adr'][ANALYTICS_PAST_DAYS + 20], 2500.0)
+
+
+class HostBookingsBoardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.host = CustomUser.objects.create_user(username='boardhost', email='boardhost@example.com', password='testpass123', role='host')
+        self.guest = CustomUser.objects.create_user(username='boardguest', email='boardguest@example.com', password='testpass123', role='guest', first_name='Wanjiru')
+        other_guest = CustomUser.objects.create_user(username='otherguest', email='otherguest@example.com', password='testpass123', role='guest')
+        self.listing = Property.objects.create(
+            owner=self.host,
+            name='Board House',
+            description='Busy stay.',
+            property_type='house',
+            address='Naivasha',
+            city='Naivasha',
+            state='Nakuru',
+            price_per_night=1500,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+        day = timezone.localdate()
+        Booking.objects.bulk_create([
+            Booking(
+                guest=self.guest if index % 6 == 0 else other_guest,
+                property=self.listing,
+                check_in_date=day + timedelta(days=index * 2),
+                check_out_date=day + timedelta(days=index * 2 + 1),
+                num_guests=1,
+                total_price=1500,
+                status='pending' if index % 3 == 0 else 'confirmed',
+            )
+            for index in range(30)
+        ])
+        self.client.force_login(self.host)
+
+    def test_pages_walk_every_booking_once_with_controls_for_the_page_only(self):
+        url = reverse('hosts:property_bookings')
+        with mock.patch.object(host_views, '_booking_action_state', wraps=host_views._booking_action_state) as controls:
+            first = self.client.get(url)
+        self.assertEqual(controls.call_count, host_views.HOST_BOOKINGS_PAGE_SIZE)
+        second = self.client.get(f"{url}?{first.context['next_page_query']}")
+        seen = [booking.id for page in (first, second) for booking in page.context['bookings']]
+        self.assertEqual(sorted(seen), sorted(Booking.objects.values_list('id', flat=True)))
+        self.assertEqual(second.context['next_page_query'], '')
+
+    def test_filters_apply_to_the_page_and_the_live_poll(self):
+        response = self.client.get(reverse('hosts:property_bookings'), {'status': 'pending', 'q': 'wanjiru'})
+        self.assertEqual([booking.guest_id for booking in response.context['bookings']], [self.guest.id] * 5)
+        self.assertTrue(all(booking.status == 'pending' for booking in response.context['bookings']))
+
+        payload = self.client.get(reverse('hosts:property_bookings_live'), {'status': 'pending', 'q': 'wanjiru'}).json()
+        self.assertEqual(payload['html'].count('data-booking-row'), 5)
+
+    def test_malformed_property_filter_is_ignored(self):
+        for name in ('hosts:property_bookings', 'hosts:property_bookings_live'):
+            self.assertEqual(self.client.get(reverse(name), {'property': '²'}).status_code, 200)
@@ -11,6 +11,7 @@ urlpatterns = [
     path('logout/', views.logout_host, name='logout'),
     path('dashboard/', views.dashboard, name='dashboard'),
     path('dashboard/live/', views.dashboard_live, name='dashboard_live'),
+    path('dashboard/analytics/', views.performance_analytics, name='performance_analytics'),
 
     # Property management routes
     path('properties/', views.my_listings, name='my_listings'),
@@ -24,6 +25,7 @@ urlpatterns = [
     # Booking management
     path('bookings/', views.property_bookings, name='property_bookings'),
     path('bookings/live/', views.property_bookings_live, name='property_bookings_live'),
+    path('bookings/bulk/', views.bulk_update_booking_status, name='bulk_update_booking_status'),
     path('bookings/<int:booking_id>/<str:status>/', views.update_booking_status, name='update_booking_status'),
     path('finance/withdrawals/request/', views.request_withdrawal, name='request_withdrawal'),
 
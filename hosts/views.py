@@ -1,30 +1,54 @@
+import hashlib
 from datetime import datetime, timedelta
 from decimal import Decimal
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, get_user_model, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
 from django.db import transaction
-from django.db.models import Avg, Count, Q, Sum
-from django.http import JsonResponse
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.http import JsonResponse, QueryDict
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from django.views.generic import View
 
 from bookings.forms import WithdrawalRequestForm
+from bookings.live import announce_booking_changes, bump_host_live_versions, host_live_version_namespace
 from bookings.models import Booking, BookingPayment, HostWithdrawal
 from bookings.services import simulate_withdrawal_payout
+from bookings.sync import notify_bookings_changed
 from core.mixins import HostRequiredMixin, LoginRequiredMixin, LogoutRequiredMixin, UserPassesTestMixin
+from core.pagination import decode_cursor, encode_cursor, keyset_paginate, query_fingerprint
 from core.realtime import announce_live_update
+from core.versioning import get_version
+from hosts.analytics import host_performance_analytics
 from hosts.models import Host
+from hosts.stats import PROPERTY_STAT_FIELDS, host_stats_for, property_stats_for
 from properties.forms import PropertyForm, PropertyImageFormSet
 from properties.models import Property
 
 from .forms import HostRegistrationForm
 
+HOST_LIVE_CACHE_SECONDS = getattr(settings, 'HOST_LIVE_CACHE_SECONDS', 60)
+HOST_BOOKINGS_PAGE_SIZE = 25
+LISTING_BOOKINGS_PAGE_SIZE = 8
+# Newest first; id breaks created_at ties so keyset cursors are unambiguous.
+HOST_BOOKING_ORDERING = ('-created_at', '-id')
+
+# action: (new status, control that must allow it, timestamp field, past-tense label)
+BULK_BOOKING_ACTIONS = {
+    'confirm': ('confirmed', 'can_confirm', 'confirmed_at', 'confirmed'),
+    'cancel': ('cancelled', 'can_cancel', 'cancelled_at', 'cancelled'),
+    'check_in': ('checked_in', 'can_check_in', 'checked_in_at', 'marked as checked in'),
+    'check_out': ('checked_out', 'can_check_out', 'checked_out_at', 'marked as checked out'),
+}
+
 
 def _ensure_host_mode(request):
     if not (request.user.role in ['host', 'both']):
@@ -54,6 +78,7 @@ def _host_live_groups(user, property_id=None):
 
 
 def _announce_host_update(user, property_id=None, extra_groups=None, message='updated'):
+    bump_host_live_versions([user.id])
     groups = _host_live_groups(user, property_id=property_id)
     if extra_groups:
         groups.extend(extra_groups)
@@ -117,28 +142,18 @@ def _available_withdrawal_amount(user):
     return max(total_received - committed, Decimal('0.00'))
 
 
-def _refresh_host_rollups(host_profile, properties, bookings):
-    host_profile.total_properties = properties.count()
-    host_profile.total_bookings = bookings.count()
-    host_profile.total_earnings = _coalesce_decimal(
-        bookings.filter(status__in=Booking.REVENUE_ACTIVE_STATUSES).aggregate(total=Sum('total_price'))['total']
-    )
-    host_profile.average_rating = properties.aggregate(avg=Avg('average_rating'))['avg'] or 0
-    host_profile.save(update_fields=[
-        'total_properties',
-        'total_bookings',
-        'total_earnings',
-        'average_rating',
-        'id_verified',
-        'email_verified',
-        'phone_verified',
-        'fully_verified',
-        'is_superhost',
-        'superhost_since',
-    ])
+def _sync_host_verification(host_profile, user):
+    """Save the host profile only when the user's verification flags moved; Host.save() copies them over."""
+    current = (host_profile.id_verified, host_profile.email_verified, host_profile.phone_verified)
+    if current != (user.government_id_status == 'verified', user.email_verified, user.phone_verified):
+        host_profile.save()
     return host_profile
 
 
+def _stat_values(stats):
+    return {field: getattr(stats, field) for field in PROPERTY_STAT_FIELDS}
+
+
 def _base_host_finance_context(user):
     host_payments = BookingPayment.objects.filter(host=user).select_related('booking', 'guest', 'booking__property')
     withdrawals = HostWithdrawal.objects.filter(host=user)
@@ -163,21 +178,20 @@ def _base_host_finance_context(user):
 
 
 def _host_dashboard_context(user):
-    host_profile = _get_host_profile(user)
-    properties = Property.objects.filter(owner=user).prefetch_related('images').order_by('-created_at')
+    host_profile = _sync_host_verification(_get_host_profile(user), user)
+    properties = list(Property.objects.filter(owner=user).order_by('-created_at'))
+    property_stats = property_stats_for(properties)
+    host_stats = host_stats_for(user)
     bookings = Booking.objects.filter(property__owner=user).select_related('property', 'guest')
-    host_profile = _refresh_host_rollups(host_profile, properties, bookings)
     today = timezone.localdate()
     now = timezone.localtime()
 
-    total_bookings = bookings.count()
-    pending_bookings = bookings.filter(status='pending').count()
-    confirmed_bookings = bookings.filter(status='confirmed').count()
-    active_stays = bookings.filter(status='checked_in').count()
-    completed_bookings = bookings.filter(status__in=['completed', 'checked_out']).count()
-    revenue = _coalesce_decimal(
-        bookings.filter(status__in=Booking.REVENUE_ACTIVE_STATUSES).aggregate(total_revenue=Sum('total_price'))['total_revenue']
-    )
+    total_bookings = host_stats.booking_count
+    pending_bookings = host_stats.pending_count
+    confirmed_bookings = host_stats.confirmed_count
+    active_stays = host_stats.active_count
+    completed_bookings = host_stats.completed_count
+    revenue = host_stats.revenue
 
     next_week = today + timedelta(days=7)
     upcoming_arrivals = bookings.filter(
@@ -192,31 +206,16 @@ def _host_dashboard_context(user):
     active_guest_contacts = bookings.filter(
         status__in=['pending', 'confirmed', 'checked_in'],
     ).select_related('guest', 'property').order_by('check_in_date')[:6]
-    active_properties = properties.filter(is_active=True).count()
-    paused_properties = properties.filter(is_active=False).count()
-    avg_listing_rating = properties.aggregate(avg=Avg('average_rating'))['avg'] or 0
+    active_properties = host_stats.active_property_count
+    paused_properties = host_stats.property_count - active_properties
+    avg_listing_rating = host_stats.average_rating
 
     property_summaries = []
     attention_items = []
     for property_obj in properties:
-        property_bookings = bookings.filter(property=property_obj)
-        image_count = property_obj.images.count()
-        summary = {
-            'property': property_obj,
-            'image_count': image_count,
-            'booking_count': property_bookings.count(),
-            'pending_count': property_bookings.filter(status='pending').count(),
-            'confirmed_count': property_bookings.filter(status='confirmed').count(),
-            'active_count': property_bookings.filter(status='checked_in').count(),
-            'completed_count': property_bookings.filter(status__in=['completed', 'checked_out']).count(),
-            'revenue': _coalesce_decimal(property_bookings.filter(status__in=Booking.REVENUE_ACTIVE_STATUSES).aggregate(total=Sum('total_price'))['total']),
-            'next_arrival': property_bookings.filter(
-                status__in=['pending', 'confirmed'],
-                check_in_date__gte=today,
-            ).order_by('check_in_date').first(),
-        }
+        summary = {'property': property_obj, **_stat_values(property_stats[property_obj.id])}
         property_summaries.append(summary)
-        if image_count == 0:
+        if summary['image_count'] == 0:
             attention_items.append(f"{property_obj.name} needs gallery photos.")
         if not property_obj.latitude or not property_obj.longitude:
             attention_items.append(f"{property_obj.name} is missing an exact map pin.")
@@ -240,10 +239,9 @@ def _host_dashboard_context(user):
         {'label': 'Tax and payout details added', 'done': bool(host_profile.tax_id and (host_profile.mpesa_phone_number or host_profile.bank_name))},
     ]
 
-    property_latest = properties.order_by('-updated_at').values_list('updated_at', flat=True).first()
-    booking_latest = bookings.order_by('-updated_at').values_list('updated_at', flat=True).first()
+    property_latest = max((property_obj.updated_at for property_obj in properties), default=None)
     latest_update = max(
-        [stamp for stamp in [property_latest, booking_latest] if stamp is not None],
+        [stamp for stamp in [property_latest, host_stats.latest_booking_update] if stamp is not None],
         default=None,
     )
 
@@ -254,7 +252,7 @@ def _host_dashboard_context(user):
         'host_profile': host_profile,
         'readiness_checks': readiness_checks,
         'attention_items': attention_items[:7],
-        'total_properties': properties.count(),
+        'total_properties': len(properties),
         'active_properties': active_properties,
         'paused_properties': paused_properties,
         'total_bookings': total_bookings,
@@ -271,60 +269,132 @@ def _host_dashboard_context(user):
         'check_ins_today': check_ins_today,
         'check_outs_today': check_outs_today,
         'now': now,
-        'live_version': f"{properties.count()}:{total_bookings}:{latest_update.isoformat() if latest_update else 'none'}",
+        'live_version': f"{len(properties)}:{total_bookings}:{latest_update.isoformat() if latest_update else 'none'}",
     }
     context.update(_base_host_finance_context(user))
     return context
 
 
 def _host_listings_context(user):
-    properties = Property.objects.filter(owner=user).prefetch_related('images').order_by('-created_at')
+    properties = list(Property.objects.filter(owner=user).order_by('-created_at'))
+    property_stats = property_stats_for(properties)
     listing_rows = []
     for property_obj in properties:
-        property_bookings = Booking.objects.filter(property=property_obj)
+        stats = property_stats[property_obj.id]
         listing_rows.append({
             'property': property_obj,
-            'bookings_count': property_bookings.count(),
-            'pending_count': property_bookings.filter(status='pending').count(),
-            'confirmed_count': property_bookings.filter(status='confirmed').count(),
-            'active_count': property_bookings.filter(status='checked_in').count(),
-            'revenue': _coalesce_decimal(property_bookings.filter(status__in=Booking.REVENUE_ACTIVE_STATUSES).aggregate(total=Sum('total_price'))['total']),
-            'image_count': property_obj.images.count(),
+            'bookings_count': stats.booking_count,
+            'pending_count': stats.pending_count,
+            'confirmed_count': stats.confirmed_count,
+            'active_count': stats.active_count,
+            'revenue': stats.revenue,
+            'image_count': stats.image_count,
         })
 
-    latest_update = properties.order_by('-updated_at').values_list('updated_at', flat=True).first()
+    latest_update = max((property_obj.updated_at for property_obj in properties), default=None)
     return {
         'properties': properties,
         'listing_rows': listing_rows,
-        'live_version': f"{properties.count()}:{latest_update.isoformat() if latest_update else 'none'}",
+        'live_version': f"{len(properties)}:{latest_update.isoformat() if latest_update else 'none'}",
     }
 
 
-def _host_bookings_context(user):
-    properties = Property.objects.filter(owner=user)
-    bookings = Booking.objects.filter(property__in=properties).select_related(
-        'property', 'guest'
-    ).order_by('-created_at')
-    today = timezone.localdate()
+def _host_booking_filters(params):
+    """Board filters from query parameters; unknown or malformed values are ignored."""
+    filters = {'status': '', 'property': None, 'start': None, 'end': None, 'q': params.get('q', '').strip()[:100]}
+    if params.get('status') in dict(Booking.STATUS_CHOICES):
+        filters['status'] = params['status']
+    property_id = params.get('property', '')
+    # isdigit() alone accepts characters like '²' that int() rejects.
+    if property_id.isascii() and property_id.isdigit():
+        filters['property'] = int(property_id)
+    for name in ('start', 'end'):
+        try:
+            filters[name] = datetime.strptime(params.get(name, ''), '%Y-%m-%d').date()
+        except ValueError:
+            pass
+    return filters
+
+
+def _filter_host_bookings(bookings, filters):
+    if filters['status']:
+        bookings = bookings.filter(status=filters['status'])
+    if filters['property']:
+        bookings = bookings.filter(property_id=filters['property'])
+    # The window keeps any stay touching it, arrival and departure days included.
+    if filters['start']:
+        bookings = bookings.filter(check_out_date__gte=filters['start'])
+    if filters['end']:
+        bookings = bookings.filter(check_in_date__lte=filters['end'])
+    if filters['q']:
+        query = filters['q']
+        bookings = bookings.filter(
+            Q(guest__first_name__icontains=query)
+            | Q(guest__last_name__icontains=query)
+            | Q(guest__username__icontains=query)
+            | Q(guest__email__icontains=query)
+        )
+    return bookings
+
+
+def _host_booking_page(bookings, params, page_size):
+    """One keyset page of the filtered ``bookings`` with ``host_controls`` attached to its rows only.
+
+    Returns the page context: ``bookings``, ``filters``, the query strings
+    for the next and first pages, and a digest of the visible rows.
+    """
+    filters = _host_booking_filters(params)
+    fingerprint = query_fingerprint(params)
+    cursor = decode_cursor(params.get('cursor'))
+    after = cursor['k'] if cursor and cursor.get('q') == fingerprint else None
+    page = keyset_paginate(_filter_host_bookings(bookings, filters), HOST_BOOKING_ORDERING, page_size, after=after)
     now = timezone.localtime()
-    for booking in bookings:
+    for booking in page:
         booking.host_controls = _booking_action_state(booking, now=now)
+
+    query = params.copy()
+    query.pop('cursor', None)
+    first_page_query = query.urlencode()
+    next_page_query = ''
+    if page.has_next:
+        query['cursor'] = encode_cursor({'q': fingerprint, 'k': page.next_key})
+        next_page_query = query.urlencode()
+    visible = repr([(booking.id, booking.status, booking.updated_at.isoformat()) for booking in page])
+    return {
+        'bookings': page,
+        'filters': filters,
+        'next_page_query': next_page_query,
+        'first_page_query': first_page_query if after else None,
+        'page_digest': hashlib.sha1(visible.encode('utf-8')).hexdigest()[:12],
+    }
+
+
+def _host_bookings_context(user, params=None):
+    properties = Property.objects.filter(owner=user)
+    bookings = Booking.objects.filter(property__owner=user).select_related('property', 'guest')
+    page = _host_booking_page(bookings, params or QueryDict(), HOST_BOOKINGS_PAGE_SIZE)
+    today = timezone.localdate()
+    host_stats = host_stats_for(user)
     stats = {
-        'total_bookings': bookings.count(),
-        'pending_bookings': bookings.filter(status='pending').count(),
-        'confirmed_bookings': bookings.filter(status='confirmed').count(),
-        'active_bookings': bookings.filter(status='checked_in').count(),
-        'cancelled_bookings': bookings.filter(status='cancelled').count(),
-        'completed_bookings': bookings.filter(status__in=['completed', 'checked_out']).count(),
-        'revenue': _coalesce_decimal(bookings.filter(status__in=Booking.REVENUE_ACTIVE_STATUSES).aggregate(total=Sum('total_price'))['total']),
+        'total_bookings': host_stats.booking_count,
+        'pending_bookings': host_stats.pending_count,
+        'confirmed_bookings': host_stats.confirmed_count,
+        'active_bookings': host_stats.active_count,
+        'cancelled_bookings': host_stats.cancelled_count,
+        'completed_bookings': host_stats.completed_count,
+        'revenue': host_stats.revenue,
     }
-    latest_update = bookings.order_by('-updated_at').values_list('updated_at', flat=True).first()
+    latest_update = host_stats.latest_booking_update
     return {
-        'bookings': bookings,
+        **page,
         'stats': stats,
-        'properties': properties,
+        'properties': properties.only('id', 'name').order_by('name'),
+        'status_choices': Booking.STATUS_CHOICES,
         'upcoming_arrivals': bookings.filter(status__in=['pending', 'confirmed'], check_in_date__gte=today).order_by('check_in_date')[:6],
-        'live_version': f"{properties.count()}:{bookings.count()}:{latest_update.isoformat() if latest_update else 'none'}",
+        'live_version': (
+            f"{host_stats.property_count}:{host_stats.booking_count}:"
+            f"{latest_update.isoformat() if latest_update else 'none'}:{page['page_digest']}"
+        ),
     }
 
 
@@ -449,25 +519,28 @@ def view_listing(request, property_id):
     if host_gate:
         return host_gate
     property_obj = get_object_or_404(Property, id=property_id, owner=request.user)
-    bookings = Booking.objects.filter(property=property_obj).select_related('guest').order_by('-created_at')
+    bookings = Booking.objects.filter(property=property_obj).select_related('guest')
+    # The property comes from the URL, so a ?property= parameter cannot widen the page.
+    params = request.GET.copy()
+    params.pop('property', None)
+    page = _host_booking_page(bookings, params, LISTING_BOOKINGS_PAGE_SIZE)
     today = timezone.localdate()
-    now = timezone.localtime()
-    for booking in bookings:
-        booking.host_controls = _booking_action_state(booking, now=now)
+    stats = property_stats_for([property_obj])[property_obj.id]
     listing_stats = {
-        'total_bookings': bookings.count(),
-        'pending_bookings': bookings.filter(status='pending').count(),
-        'confirmed_bookings': bookings.filter(status='confirmed').count(),
-        'active_bookings': bookings.filter(status='checked_in').count(),
-        'completed_bookings': bookings.filter(status__in=['completed', 'checked_out']).count(),
-        'revenue': _coalesce_decimal(bookings.filter(status__in=Booking.REVENUE_ACTIVE_STATUSES).aggregate(total=Sum('total_price'))['total']),
+        'total_bookings': stats.booking_count,
+        'pending_bookings': stats.pending_count,
+        'confirmed_bookings': stats.confirmed_count,
+        'active_bookings': stats.active_count,
+        'completed_bookings': stats.completed_count,
+        'revenue': stats.revenue,
         'next_arrival': bookings.filter(status__in=['pending', 'confirmed'], check_in_date__gte=today).order_by('check_in_date').first(),
     }
     context = {
+        **page,
         'property': property_obj,
-        'bookings': bookings[:8],
         'listing_stats': listing_stats,
-        'pending_requests': bookings.filter(status='pending')[:4],
+        'status_choices': Booking.STATUS_CHOICES,
+        'pending_requests': bookings.filter(status='pending').order_by(*HOST_BOOKING_ORDERING)[:4],
     }
     return render(request, 'hosts/view_listing.html', context)
 
@@ -506,7 +579,36 @@ def property_bookings(request):
     if host_gate:
         return host_gate
 
-    return render(request, 'hosts/owner_bookings.html', _host_bookings_context(request.user))
+    return render(request, 'hosts/owner_bookings.html', _host_bookings_context(request.user, request.GET))
+
+
+def _cached_live_response(request, kind, template_name, build_context):
+    """Live poll payload for the requesting host, re-rendered only when their live version moves.
+
+    Keyed by the host's live version (bumped with every host or booking
+    announcement), the query string for filtered pages, today's date for
+    the arrival lists and the CSRF secret because the fragment embeds forms. An unchanged poll is one version read
+    and one cache read; the short timeout bounds time-based drift such as
+    check-in windows opening.
+    """
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+    key = None
+    if csrf_cookie:
+        # A poll without the cookie gets a fresh secret, so it is rendered but never cached.
+        version = get_version(host_live_version_namespace(request.user.id))
+        csrf_secret = hashlib.sha1(csrf_cookie.encode('utf-8')).hexdigest()[:12]
+        params = query_fingerprint(request.GET, ignore=())
+        key = f'host-live:{kind}:{request.user.id}:{version}:{params}:{timezone.localdate():%Y%m%d}:{csrf_secret}'
+    payload = cache.get(key) if key else None
+    if payload is None:
+        context = build_context(request.user)
+        payload = {
+            'html': render_to_string(template_name, context, request=request),
+            'version': context['live_version'],
+        }
+        if key:
+            cache.set(key, payload, HOST_LIVE_CACHE_SECONDS)
+    return JsonResponse(payload)
 
 
 @login_required
@@ -514,11 +616,7 @@ def dashboard_live(request):
     host_gate = _ensure_host_mode(request)
     if host_gate:
         return JsonResponse({'redirect_url': reverse('core:home')}, status=403)
-    context = _host_dashboard_context(request.user)
-    return JsonResponse({
-        'html': render_to_string('hosts/_dashboard_content.html', context, request=request),
-        'version': context['live_version'],
-    })
+    return _cached_live_response(request, 'dashboard', 'hosts/_dashboard_content.html', _host_dashboard_context)
 
 
 @login_required
@@ -526,11 +624,7 @@ def my_listings_live(request):
     host_gate = _ensure_host_mode(request)
     if host_gate:
         return JsonResponse({'redirect_url': reverse('core:home')}, status=403)
-    context = _host_listings_context(request.user)
-    return JsonResponse({
-        'html': render_to_string('hosts/_my_listings_content.html', context, request=request),
-        'version': context['live_version'],
-    })
+    return _cached_live_response(request, 'listings', 'hosts/_my_listings_content.html', _host_listings_context)
 
 
 @login_required
@@ -538,11 +632,20 @@ def property_bookings_live(request):
     host_gate = _ensure_host_mode(request)
     if host_gate:
         return JsonResponse({'redirect_url': reverse('core:home')}, status=403)
-    context = _host_bookings_context(request.user)
-    return JsonResponse({
-        'html': render_to_string('hosts/_owner_bookings_content.html', context, request=request),
-        'version': context['live_version'],
-    })
+    return _cached_live_response(
+        request, 'bookings', 'hosts/_owner_bookings_content.html', lambda user: _host_bookings_context(user, request.GET),
+    )
+
+
+@login_required
+def performance_analytics(request):
+    """Occupancy, ADR and RevPAR series for the host's charts."""
+    host_gate = _ensure_host_mode(request)
+    if host_gate:
+        return JsonResponse({'redirect_url': reverse('core:home')}, status=403)
+    response = JsonResponse(host_performance_analytics(request.user.id))
+    patch_cache_control(response, private=True, max_age=0)
+    return response
 
 
 @login_required
@@ -606,6 +709,71 @@ def update_booking_status(request, booking_id, status):
     return redirect('hosts:property_bookings')
 
 
+@login_required
+def bulk_update_booking_status(request):
+    host_gate = _ensure_host_mode(request)
+    if host_gate:
+        return host_gate
+    if request.method != 'POST':
+        return redirect('hosts:property_bookings')
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    next_url = request.POST.get('next')
+    action = request.POST.get('action')
+    booking_ids = {int(value) for value in request.POST.getlist('booking_ids') if value.isascii() and value.isdigit()}
+    if action not in BULK_BOOKING_ACTIONS or not booking_ids:
+        if is_ajax:
+            return JsonResponse({'ok': False, 'errors': {'action': ['Pick an action and at least one booking.']}}, status=400)
+        messages.error(request, 'Pick an action and at least one booking.')
+        return redirect(next_url or 'hosts:property_bookings')
+
+    status, control, stamp_field, label = BULK_BOOKING_ACTIONS[action]
+    now = timezone.localtime()
+    changed = []
+    skipped = {}
+    with transaction.atomic():
+        # One locked read validates the whole selection against the same rules as the single-booking buttons.
+        bookings = Booking.objects.select_for_update(of=('self',)).select_related('property').filter(
+            id__in=booking_ids,
+            property__owner=request.user,
+        )
+        for booking in bookings:
+            controls = _booking_action_state(booking, now=now)
+            if not controls[control]:
+                skipped[booking.id] = controls['next_message'] or 'That action is not available from the current reservation state.'
+                continue
+            booking.status = status
+            booking.updated_at = now
+            booking.hold_expires_at = None
+            if status == 'confirmed':
+                booking.confirmed_at = booking.confirmed_at or now
+            else:
+                setattr(booking, stamp_field, now)
+            changed.append(booking)
+        if changed:
+            Booking.objects.bulk_update(changed, ['status', 'updated_at', 'hold_expires_at', stamp_field])
+            notify_bookings_changed({booking.property_id for booking in changed})
+    for booking_id in booking_ids - {booking.id for booking in changed} - set(skipped):
+        skipped[booking_id] = 'Booking not found among your listings.'
+    if changed:
+        announce_booking_changes(
+            [(booking.property_id, request.user.id, booking.guest_id) for booking in changed],
+            message='booking-updated',
+            per='host',
+        )
+
+    if is_ajax:
+        return JsonResponse({
+            'ok': True,
+            'updated': sorted(booking.id for booking in changed),
+            'skipped': [{'id': booking_id, 'reason': reason} for booking_id, reason in sorted(skipped.items())],
+        })
+    if changed:
+        messages.success(request, f"{len(changed)} booking{'s' if len(changed) != 1 else ''} {label}.")
+    if skipped:
+        messages.error(request, f"{len(skipped)} selected booking{'s' if len(skipped) != 1 else ''} could not be {label}.")
+    return redirect(next_url or 'hosts:property_bookings')
+
+
 @login_required
 def toggle_listing_status(request, property_id):
     host_gate = _ensure_host_mode(request)
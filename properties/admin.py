@@ -1,3 +1,12 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import PricingRule
+
+
+class PricingRuleAdmin(admin.ModelAdmin):
+    list_display = ['property', 'kind', 'adjustment_percent', 'start_date', 'end_date', 'min_nights', 'is_active']
+    list_filter = ['kind', 'is_active']
+    raw_id_fields = ['property']
+
+
+admin.site.register(PricingRule, PricingRuleAdmin)
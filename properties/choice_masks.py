@@ -0,0 +1,32 @@
+from django.db.models import Count, F, Q
+
+from .models import Property, choices_mask
+
+
+def filter_by_choices(queryset, source, values):
+    """Keep properties whose ``source`` list holds every one of ``values``.
+
+    Uses the derived bitmask column, so any number of required choices is a
+    single ``mask & required = required`` predicate. Unknown choices can
+    never match.
+    """
+    values = [value for value in values if value]
+    if not values:
+        return queryset
+    mask_field, bits = Property.CHOICE_MASKS[source]
+    if any(value not in bits for value in values):
+        return queryset.none()
+    required = choices_mask(values, bits)
+    hits = f'{mask_field}_hits'
+    return queryset.alias(**{hits: F(mask_field).bitand(required)}).filter(**{hits: required})
+
+
+def choice_facet_counts(queryset, source):
+    """Return ``{choice: count}`` for every choice of ``source`` in one aggregate query."""
+    mask_field, bits = Property.CHOICE_MASKS[source]
+    aliases = {f'facet_bit_{key}': F(mask_field).bitand(bit) for key, bit in bits.items()}
+    counts = queryset.order_by().alias(**aliases).aggregate(**{
+        f'facet_{key}': Count('id', filter=~Q(**{f'facet_bit_{key}': 0}))
+        for key in bits
+    })
+    return {key: counts[f'facet_{key}'] for key in bits}
@@ -0,0 +1,157 @@
+import math
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.versioning import bump_version, get_version
+
+from .models import Property
+
+SPATIAL_INDEX_VERSION_NAMESPACE = 'property-spatial-index'
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+GRID_CELL_DEGREES = 0.1
+DEFAULT_SEARCH_RADIUS_KM = 50.0
+MAX_SEARCH_RADIUS_KM = 500.0
+
+_GRID_COLUMNS = int(round(360 / GRID_CELL_DEGREES))
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points, in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def valid_pin(lat, lng):
+    """Whether ``(lat, lng)`` is a finite point on the globe."""
+    return math.isfinite(lat) and math.isfinite(lng) and -90 <= lat <= 90 and -180 <= lng <= 180
+
+
+def _cell_row(lat):
+    return int(math.floor((lat + 90) / GRID_CELL_DEGREES))
+
+
+def _cell_column(lng):
+    return int(math.floor((lng + 180) / GRID_CELL_DEGREES)) % _GRID_COLUMNS
+
+
+class SpatialIndex:
+    """Fixed-size lat/lng grid over active, pinned properties.
+
+    Radius queries visit only the cells overlapping the search circle's
+    bounding box and then keep points within the exact haversine distance.
+    """
+
+    def __init__(self):
+        self.version = None
+        self._cells = {}
+        self._points = {}
+        self._lock = threading.RLock()
+
+    def _add_point(self, property_id, lat, lng):
+        cell = (_cell_row(lat), _cell_column(lng))
+        self._cells.setdefault(cell, {})[property_id] = (lat, lng)
+        self._points[property_id] = cell
+
+    def _remove_point(self, property_id):
+        cell = self._points.pop(property_id, None)
+        if cell is None:
+            return
+        members = self._cells.get(cell, {})
+        members.pop(property_id, None)
+        if not members:
+            self._cells.pop(cell, None)
+
+    def rebuild(self):
+        version = get_version(SPATIAL_INDEX_VERSION_NAMESPACE)
+        rows = Property.objects.filter(
+            is_active=True,
+            latitude__isnull=False,
+            longitude__isnull=False,
+        ).values_list('id', 'latitude', 'longitude')
+        with self._lock:
+            self._cells = {}
+            self._points = {}
+            for property_id, lat, lng in rows.iterator():
+                self._add_point(property_id, float(lat), float(lng))
+            self.version = version
+
+    def ensure_fresh(self):
+        if self.version != get_version(SPATIAL_INDEX_VERSION_NAMESPACE):
+            self.rebuild()
+
+    def apply_change(self, property_id, lat=None, lng=None):
+        """Move one property to ``(lat, lng)``, or drop it when it has no usable pin."""
+        previous = self.version
+        current = bump_version(SPATIAL_INDEX_VERSION_NAMESPACE)
+        if previous is None or current != previous + 1:
+            self.version = None
+            return
+        with self._lock:
+            self._remove_point(property_id)
+            if lat is not None and lng is not None:
+                self._add_point(property_id, float(lat), float(lng))
+            self.version = current
+
+    def _candidate_cells(self, lat, lng, radius_km):
+        lat_span = radius_km / KM_PER_DEGREE_LAT
+        row_start = _cell_row(max(lat - lat_span, -90.0))
+        row_end = _cell_row(min(lat + lat_span, 90.0))
+        widest_lat = min(abs(lat) + lat_span, 89.9)
+        lng_span = radius_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(widest_lat)))
+        if lng_span >= 180:
+            columns = range(_GRID_COLUMNS)
+        else:
+            first = int(math.floor((lng - lng_span + 180) / GRID_CELL_DEGREES))
+            last = int(math.floor((lng + lng_span + 180) / GRID_CELL_DEGREES))
+            columns = [column % _GRID_COLUMNS for column in range(first, last + 1)]
+        for row in range(row_start, row_end + 1):
+            for column in columns:
+                yield row, column
+
+    def nearby(self, lat, lng, radius_km=DEFAULT_SEARCH_RADIUS_KM):
+        """Return ``[(property_id, distance_km), ...]`` within ``radius_km``, nearest first."""
+        if not valid_pin(lat, lng):
+            return []
+        self.ensure_fresh()
+        radius_km = min(max(radius_km, 0.0), MAX_SEARCH_RADIUS_KM) if math.isfinite(radius_km) else DEFAULT_SEARCH_RADIUS_KM
+        matches = []
+        with self._lock:
+            for cell in self._candidate_cells(lat, lng, radius_km):
+                for property_id, (point_lat, point_lng) in self._cells.get(cell, {}).items():
+                    distance = haversine_km(lat, lng, point_lat, point_lng)
+                    if distance <= radius_km:
+                        matches.append((property_id, distance))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
+
+
+_index = SpatialIndex()
+
+
+def get_spatial_index():
+    return _index
+
+
+def nearby_properties(lat, lng, radius_km=DEFAULT_SEARCH_RADIUS_KM):
+    return _index.nearby(lat, lng, radius_km=radius_km)
+
+
+@receiver(post_save, sender=Property)
+def index_saved_property_location(sender, instance, **kwargs):
+    pinned = instance.is_active and instance.latitude is not None and instance.longitude is not None
+    lat, lng = (instance.latitude, instance.longitude) if pinned else (None, None)
+    transaction.on_commit(lambda: _index.apply_change(instance.id, lat, lng))
+
+
+@receiver(post_delete, sender=Property)
+def unindex_deleted_property_location(sender, instance, **kwargs):
+    property_id = instance.id
+    transaction.on_commit(lambda: _index.apply_change(property_id))
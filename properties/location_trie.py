@@ -0,0 +1,196 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.versioning import bump_version, get_version
+
+from .models import Property
+from .search_index import tokenize
+
+LOCATION_TRIE_VERSION_NAMESPACE = 'property-location-trie'
+
+# Narrowest first; also the tie-break order between equally popular places.
+PLACE_KINDS = ('neighbourhood', 'city', 'state', 'country')
+# Search radius handed to the geo filter when a suggestion is picked.
+PLACE_RADIUS_KM = {'neighbourhood': 5.0, 'city': 25.0, 'state': 150.0, 'country': 500.0}
+DEFAULT_SUGGESTION_LIMIT = 8
+
+_PLACE_COLUMNS = ('id', 'address', 'city', 'state', 'country', 'latitude', 'longitude', 'is_active')
+
+
+def _clean(text):
+    return ' '.join(str(text or '').split()).strip(' ,')
+
+
+def _places(values):
+    """The (kind, name, parent) places an active property belongs to."""
+    if not values.get('is_active'):
+        return []
+    city, state, country = _clean(values.get('city')), _clean(values.get('state')), _clean(values.get('country'))
+    places = []
+    if country:
+        places.append(('country', country, ''))
+    if state:
+        places.append(('state', state, country))
+    if city:
+        places.append(('city', city, state or country))
+    # Addresses look like "Milimani, Kisumu"; a leading part that is not the
+    # city, state or country is taken as the neighbourhood.
+    parts = [_clean(part) for part in str(values.get('address') or '').split(',')]
+    if len(parts) > 1 and parts[0] and city:
+        taken = {name.casefold() for name in (city, state, country) if name}
+        if parts[0].casefold() not in taken:
+            places.append(('neighbourhood', parts[0], city))
+    return places
+
+
+def _keys(name):
+    """Trie keys for a place: its whole name and every word-started tail of it."""
+    tokens = tokenize(name)
+    return {' '.join(tokens[start:]) for start in range(len(tokens))}
+
+
+class LocationTrie:
+    """Prefix trie over the places listings sit in, with per-place listing counts and centroids.
+
+    Each trie node keeps the set of places whose name (or a later word of
+    it) starts with the node's prefix, so a lookup is one walk down the
+    typed characters followed by ranking a small set.
+    """
+
+    def __init__(self):
+        self.version = None
+        self._root = ({}, set())
+        self._stats = {}
+        self._contributions = {}
+        self._lock = threading.RLock()
+
+    def _walk(self, key):
+        node = self._root
+        for char in key:
+            node = node[0].get(char)
+            if node is None:
+                return None
+        return node
+
+    def _link(self, place, add):
+        for key in _keys(place[1]):
+            node = self._root
+            for char in key:
+                node = node[0].setdefault(char, ({}, set())) if add else node[0].get(char)
+                if node is None:
+                    break
+                if add:
+                    node[1].add(place)
+                else:
+                    node[1].discard(place)
+
+    def _add_property(self, property_id, values):
+        lat, lng = values.get('latitude'), values.get('longitude')
+        point = (float(lat), float(lng)) if lat is not None and lng is not None else None
+        places = _places(values)
+        for place in places:
+            stats = self._stats.get(place)
+            if stats is None:
+                stats = self._stats[place] = [0, 0, 0.0, 0.0]
+                self._link(place, add=True)
+            stats[0] += 1
+            if point:
+                stats[1] += 1
+                stats[2] += point[0]
+                stats[3] += point[1]
+        if places:
+            self._contributions[property_id] = (places, point)
+
+    def _remove_property(self, property_id):
+        places, point = self._contributions.pop(property_id, ((), None))
+        for place in places:
+            stats = self._stats[place]
+            stats[0] -= 1
+            if point:
+                stats[1] -= 1
+                stats[2] -= point[0]
+                stats[3] -= point[1]
+            if stats[0] <= 0:
+                del self._stats[place]
+                self._link(place, add=False)
+
+    def rebuild(self):
+        version = get_version(LOCATION_TRIE_VERSION_NAMESPACE)
+        with self._lock:
+            self._root = ({}, set())
+            self._stats = {}
+            self._contributions = {}
+            for values in Property.objects.filter(is_active=True).values(*_PLACE_COLUMNS).iterator():
+                self._add_property(values['id'], values)
+            self.version = version
+
+    def ensure_fresh(self):
+        if self.version != get_version(LOCATION_TRIE_VERSION_NAMESPACE):
+            self.rebuild()
+
+    def apply_change(self, property_id, values=None):
+        """Re-file one property under its saved ``values``, or drop it when ``values`` is None."""
+        previous = self.version
+        current = bump_version(LOCATION_TRIE_VERSION_NAMESPACE)
+        if previous is None or current != previous + 1:
+            self.version = None
+            return
+        with self._lock:
+            self._remove_property(property_id)
+            if values is not None:
+                self._add_property(property_id, values)
+            self.version = current
+
+    def suggest(self, prefix, limit=DEFAULT_SUGGESTION_LIMIT):
+        """Places matching ``prefix``, most listings first, as JSON-ready dicts."""
+        key = ' '.join(tokenize(prefix))
+        if not key:
+            return []
+        self.ensure_fresh()
+        with self._lock:
+            node = self._walk(key)
+            if node is None:
+                return []
+            ranked = sorted(
+                ((place, list(self._stats[place])) for place in node[1]),
+                key=lambda item: (-item[1][0], PLACE_KINDS.index(item[0][0]), item[0][1]),
+            )[:limit]
+        suggestions = []
+        for (kind, name, parent), (count, pinned, lat_total, lng_total) in ranked:
+            suggestions.append({
+                'label': f'{name}, {parent}' if parent else name,
+                'name': name,
+                'kind': kind,
+                'context': parent,
+                'count': count,
+                'lat': round(lat_total / pinned, 6) if pinned else None,
+                'lng': round(lng_total / pinned, 6) if pinned else None,
+                'radius_km': PLACE_RADIUS_KM[kind],
+            })
+        return suggestions
+
+
+_trie = LocationTrie()
+
+
+def get_location_trie():
+    return _trie
+
+
+def suggest_locations(prefix, limit=DEFAULT_SUGGESTION_LIMIT):
+    return _trie.suggest(prefix, limit=limit)
+
+
+@receiver(post_save, sender=Property)
+def file_saved_property_location(sender, instance, **kwargs):
+    values = {column: getattr(instance, column) for column in _PLACE_COLUMNS}
+    transaction.on_commit(lambda: _trie.apply_change(instance.id, values))
+
+
+@receiver(post_delete, sender=Property)
+def unfile_deleted_property_location(sender, instance, **kwargs):
+    property_id = instance.id
+    transaction.on_commit(lambda: _trie.apply_change(property_id))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from properties.models import Property, choices_mask
+
+
+class Command(BaseCommand):
+    help = 'Recompute the amenity, stay detail and policy bitmask columns from the JSON lists.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        sources = list(Property.CHOICE_MASKS)
+        mask_fields = [mask_field for mask_field, _ in Property.CHOICE_MASKS.values()]
+        pending = []
+        updated = 0
+        for property_obj in Property.objects.only('id', *sources, *mask_fields).iterator(chunk_size=batch_size):
+            changed = False
+            for source, (mask_field, bits) in Property.CHOICE_MASKS.items():
+                mask = choices_mask(getattr(property_obj, source), bits)
+                if getattr(property_obj, mask_field) != mask:
+                    setattr(property_obj, mask_field, mask)
+                    changed = True
+            if changed:
+                pending.append(property_obj)
+            if len(pending) >= batch_size:
+                Property.objects.bulk_update(pending, mask_fields)
+                updated += len(pending)
+                pending = []
+        if pending:
+            Property.objects.bulk_update(pending, mask_fields)
+            updated += len(pending)
+        self.stdout.write(self.style.SUCCESS(f'Updated choice masks on {updated} properties.'))
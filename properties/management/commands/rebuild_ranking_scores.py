@@ -0,0 +1,17 @@
+from core.management.base import SharedCacheCommand
+from properties.ranking import refresh_ranking_scores
+
+
+class Command(SharedCacheCommand):
+    help = (
+        'Recompute the recommended ranking score of every property. Run it daily: '
+        'review and booking writes refresh scores as they happen, but recency and '
+        'freshness only decay when this runs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        updated = refresh_ranking_scores(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Updated ranking scores on {updated} properties.'))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0015_property_policies_property_stay_details'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='amenities_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='policies_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='stay_details_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+    ]
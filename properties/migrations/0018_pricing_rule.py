@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:26
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0017_property_ranking_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PricingRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('weekend', 'Weekend nights'), ('season', 'Seasonal dates'), ('length_of_stay', 'Length-of-stay discount')], max_length=20)),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('adjustment_percent', models.DecimalField(decimal_places=2, help_text='Percent added to the rate; use a negative value for discounts.', max_digits=5, validators=[django.core.validators.MinValueValidator(Decimal('-90')), django.core.validators.MaxValueValidator(Decimal('500'))])),
+                ('start_date', models.DateField(blank=True, help_text='First night of a seasonal rule.', null=True)),
+                ('end_date', models.DateField(blank=True, help_text='Last night of a seasonal rule.', null=True)),
+                ('min_nights', models.PositiveIntegerField(blank=True, help_text='Stay length a length-of-stay discount starts at.', null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pricing_rules', to='properties.property')),
+            ],
+            options={
+                'ordering': ['property', 'kind', 'start_date', 'min_nights'],
+            },
+        ),
+    ]
@@ -1,7 +1,23 @@
+from decimal import Decimal
+
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from users.models import CustomUser
 from datetime import time
 
+
+def choice_bits(choices):
+    """Map each choice key to its own bit. Append new choices so stored masks keep their meaning."""
+    return {key: 1 << position for position, (key, _) in enumerate(choices)}
+
+
+def choices_mask(values, bits):
+    mask = 0
+    for value in values or []:
+        mask |= bits.get(value, 0)
+    return mask
+
+
 class Property(models.Model):
     PROPERTY_TYPES = (
         ('apartment', 'Apartment'),
@@ -55,6 +71,17 @@ class Property(models.Model):
         ('late_check_out', 'Late check-out available'),
     )
 
+    AMENITY_BITS = choice_bits(AMENITY_CHOICES)
+    STAY_DETAIL_BITS = choice_bits(STAY_DETAIL_CHOICES)
+    POLICY_BITS = choice_bits(POLICY_CHOICES)
+
+    # JSON list field -> (derived bitmask column, bit map)
+    CHOICE_MASKS = {
+        'amenities': ('amenities_mask', AMENITY_BITS),
+        'stay_details': ('stay_details_mask', STAY_DETAIL_BITS),
+        'policies': ('policies_mask', POLICY_BITS),
+    }
+
     owner = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='properties')
     name = models.CharField(max_length=200)
     description = models.TextField()
@@ -74,16 +101,45 @@ class Property(models.Model):
     amenities = models.JSONField(default=list)
     stay_details = models.JSONField(default=list, blank=True)
     policies = models.JSONField(default=list, blank=True)
+    amenities_mask = models.BigIntegerField(default=0, editable=False)
+    stay_details_mask = models.BigIntegerField(default=0, editable=False)
+    policies_mask = models.BigIntegerField(default=0, editable=False)
     average_rating = models.FloatField(default=0.0)
+    # Maintained by properties.ranking; "recommended" ordering reads ranking_score.
+    reviews_count = models.PositiveIntegerField(default=0, editable=False)
+    recent_bookings_count = models.PositiveIntegerField(default=0, editable=False)
+    ranking_score = models.FloatField(default=0.0, editable=False)
     check_in_time = models.TimeField(default=time(15, 0))
     check_out_time = models.TimeField(default=time(11, 0))
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-ranking_score', '-id'], name='property_ranking_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
+    def sync_choice_masks(self):
+        """Recompute the bitmask columns from the JSON choice lists."""
+        for source, (mask_field, bits) in self.CHOICE_MASKS.items():
+            setattr(self, mask_field, choices_mask(getattr(self, source), bits))
+
+    def save(self, *args, **kwargs):
+        self.sync_choice_masks()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            update_fields.update(
+                mask_field
+                for source, (mask_field, _) in self.CHOICE_MASKS.items()
+                if source in update_fields
+            )
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
 
     @property
     def amenities_list(self):
@@ -114,6 +170,39 @@ class PropertyImage(models.Model):
     def __str__(self):
         return f"Image for {self.property.name}"
 
+class PricingRule(models.Model):
+    """A host's adjustment to a property's nightly rate; see ``properties.pricing`` for how rules combine."""
+
+    KIND_CHOICES = (
+        ('weekend', 'Weekend nights'),
+        ('season', 'Seasonal dates'),
+        ('length_of_stay', 'Length-of-stay discount'),
+    )
+    # date.weekday() values of the nights a weekend rule covers: Friday and Saturday.
+    WEEKEND_NIGHTS = (4, 5)
+
+    property = models.ForeignKey(Property, related_name='pricing_rules', on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    name = models.CharField(max_length=100, blank=True)
+    adjustment_percent = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        validators=[MinValueValidator(Decimal('-90')), MaxValueValidator(Decimal('500'))],
+        help_text='Percent added to the rate; use a negative value for discounts.',
+    )
+    start_date = models.DateField(null=True, blank=True, help_text='First night of a seasonal rule.')
+    end_date = models.DateField(null=True, blank=True, help_text='Last night of a seasonal rule.')
+    min_nights = models.PositiveIntegerField(null=True, blank=True, help_text='Stay length a length-of-stay discount starts at.')
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['property', 'kind', 'start_date', 'min_nights']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} ({self.adjustment_percent}%) for {self.property.name}"
+
 class Review(models.Model):
     property = models.ForeignKey(Property, related_name='reviews', on_delete=models.CASCADE)
     user = models.ForeignKey('users.CustomUser', on_delete=models.CASCADE, related_name='property_reviews')
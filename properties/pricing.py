@@ -0,0 +1,111 @@
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.versioning import bump_version
+
+from .models import PricingRule, Property
+
+CENT = Decimal('0.01')
+
+
+def pricing_version_namespace(property_id):
+    return f'property-pricing:{property_id}'
+
+
+def _rule_rows(property_ids):
+    return list(
+        PricingRule.objects.filter(property_id__in=property_ids, is_active=True)
+        .order_by('min_nights', 'id')
+        .values_list('property_id', 'kind', 'adjustment_percent', 'start_date', 'end_date', 'min_nights')
+    )
+
+
+def price_stays(stays, base_prices=None):
+    """Total prices for ``(property_id, check_in, check_out)`` stays, priced together.
+
+    Every night of every stay becomes one element of a flat array, so weekend
+    and seasonal rules are one masked multiply each and the per-stay sums one
+    ``bincount``. Weekend and seasonal adjustments compound; the length-of-stay
+    rule with the highest ``min_nights`` the stay reaches then applies to the
+    whole total. ``base_prices`` (``{property_id: nightly price}``) saves the
+    property query when the caller already has the rows. Returns Decimals
+    aligned with ``stays``, None for empty stays or unknown properties.
+    """
+    stays = list(stays)
+    totals = [None] * len(stays)
+    property_ids = {stay[0] for stay in stays if stay[0] and stay[1] and stay[2] and stay[2] > stay[1]}
+    if not property_ids:
+        return totals
+    if base_prices is None:
+        base_prices = dict(Property.objects.filter(id__in=property_ids).values_list('id', 'price_per_night'))
+    priced = [
+        index for index, (property_id, check_in, check_out) in enumerate(stays)
+        if property_id in property_ids and base_prices.get(property_id) is not None and check_out > check_in
+    ]
+    if not priced:
+        return totals
+
+    stay_property = np.array([stays[index][0] for index in priced], dtype=np.int64)
+    stay_start = np.array([stays[index][1].toordinal() for index in priced], dtype=np.int64)
+    stay_nights = np.array([(stays[index][2] - stays[index][1]).days for index in priced], dtype=np.int64)
+    stay_base = np.array([float(base_prices[stays[index][0]]) for index in priced])
+
+    night_stay = np.repeat(np.arange(len(priced)), stay_nights)
+    night_offset = np.arange(len(night_stay)) - np.repeat(np.cumsum(stay_nights) - stay_nights, stay_nights)
+    night_date = stay_start[night_stay] + night_offset
+    night_property = stay_property[night_stay]
+    # Ordinal 1 is a Monday, so this is date.weekday() of each night.
+    night_weekday = (night_date - 1) % 7
+    weekend_night = np.isin(night_weekday, PricingRule.WEEKEND_NIGHTS)
+    night_factor = np.ones(len(night_stay))
+    stay_discount = np.zeros(len(priced))
+
+    for property_id, kind, percent, start_date, end_date, min_nights in _rule_rows(property_ids):
+        factor = 1 + float(percent) / 100
+        if kind == 'length_of_stay':
+            # Rows come ordered by min_nights, so the longest qualifying rule wins.
+            reached = (stay_property == property_id) & (stay_nights >= (min_nights or 1))
+            stay_discount[reached] = factor - 1
+            continue
+        nights = night_property == property_id
+        if kind == 'weekend':
+            nights &= weekend_night
+        elif kind == 'season' and start_date and end_date:
+            nights &= (night_date >= start_date.toordinal()) & (night_date <= end_date.toordinal())
+        else:
+            continue
+        night_factor[nights] *= factor
+
+    subtotal = np.bincount(night_stay, weights=stay_base[night_stay] * night_factor, minlength=len(priced))
+    for index, total in zip(priced, np.round(subtotal * (1 + stay_discount), 2)):
+        totals[index] = Decimal(str(total)).quantize(CENT)
+    return totals
+
+
+def stay_price(property_obj, check_in, check_out):
+    """Total price of one stay at ``property_obj``."""
+    return price_stays([(property_obj.id, check_in, check_out)], {property_obj.id: property_obj.price_per_night})[0]
+
+
+def attach_stay_totals(rows, stays):
+    """Set ``stay_total`` and ``stay_nights`` on property rows from ``{property_id: (check_in, check_out)}``, pricing them together."""
+    rows = [row for row in rows if row.id in stays]
+    totals = price_stays(
+        [(row.id, *stays[row.id]) for row in rows],
+        {row.id: row.price_per_night for row in rows},
+    )
+    for row, total in zip(rows, totals):
+        if total is not None:
+            row.stay_total = total
+            row.stay_nights = (stays[row.id][1] - stays[row.id][0]).days
+
+
+@receiver(post_save, sender=Property)
+@receiver([post_save, post_delete], sender=PricingRule)
+def pricing_changed(sender, instance, **kwargs):
+    property_id = instance.id if sender is Property else instance.property_id
+    transaction.on_commit(lambda: bump_version(pricing_version_namespace(property_id)))
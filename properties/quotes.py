@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from bookings.intervals import booking_version_namespace, get_booking_intervals
+from core.versioning import get_versions
+
+from .models import Property
+from .pricing import price_stays, pricing_version_namespace
+
+STAY_QUOTE_CACHE_SECONDS = getattr(settings, 'STAY_QUOTE_CACHE_SECONDS', 300)
+
+
+def _build_quote(property_id, check_in, check_out, guests):
+    listing = Property.objects.filter(pk=property_id, is_active=True).values('price_per_night', 'max_guests').first()
+    if listing is None:
+        return False
+    conflicts = get_booking_intervals(property_id).overlapping(check_in, check_out)
+    total = price_stays([(property_id, check_in, check_out)], {property_id: listing['price_per_night']})[0]
+    reason = 'booked' if conflicts else 'guests' if guests > listing['max_guests'] else None
+    return {
+        'available': reason is None,
+        'reason': reason,
+        'nights': (check_out - check_in).days,
+        'total': str(total),
+        'conflict': {
+            'check_in': conflicts[0]['check_in_date'].isoformat(),
+            'check_out': conflicts[0]['check_out_date'].isoformat(),
+        } if conflicts else None,
+    }
+
+
+def stay_quote(property_id, check_in, check_out, guests):
+    """Availability and price of a proposed stay, or None for an unknown or inactive listing.
+
+    Keyed by the property's booking and pricing versions, so a repeated
+    quote costs one cache round trip for the versions and one for the answer.
+    """
+    booking_namespace, pricing_namespace = booking_version_namespace(property_id), pricing_version_namespace(property_id)
+    versions = get_versions([booking_namespace, pricing_namespace])
+    key = (
+        f'stay-quote:{property_id}:{versions[booking_namespace]}:{versions[pricing_namespace]}:'
+        f'{check_in:%Y%m%d}:{check_out:%Y%m%d}:{guests}'
+    )
+    quote = cache.get(key)
+    if quote is None:
+        quote = _build_quote(property_id, check_in, check_out, guests)
+        cache.set(key, quote, STAY_QUOTE_CACHE_SECONDS)
+    return quote or None
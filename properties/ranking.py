@@ -0,0 +1,112 @@
+import math
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from bookings.models import Booking
+from bookings.sync import bookings_changed
+from core.search_cache import CATALOG_VERSION_NAMESPACE
+from core.versioning import bump_version
+
+from .models import Property, Review
+
+RECENT_BOOKING_DAYS = 90
+FRESHNESS_HALF_LIFE_DAYS = 45
+
+# Ratings are shrunk toward this prior until a listing has a few reviews, so
+# a single five-star review does not outrank a long track record.
+PRIOR_RATING = 3.5
+PRIOR_REVIEW_WEIGHT = 3
+
+RATING_WEIGHT = 0.5
+REVIEW_VOLUME_WEIGHT = 0.15
+BOOKING_WEIGHT = 0.25
+FRESHNESS_WEIGHT = 0.1
+REVIEW_VOLUME_SATURATION = 50
+BOOKING_SATURATION = 20
+
+
+def _saturating(count, saturation):
+    return min(math.log1p(count) / math.log1p(saturation), 1.0)
+
+
+def ranking_score(average_rating, reviews_count, recent_bookings_count, created_at, now=None):
+    """Blend rating, review volume, recent demand and listing age into a 0-100 score."""
+    now = now or timezone.now()
+    rated = (PRIOR_RATING * PRIOR_REVIEW_WEIGHT + (average_rating or 0) * reviews_count) / (PRIOR_REVIEW_WEIGHT + reviews_count)
+    age_days = max((now - created_at).total_seconds() / 86400, 0) if created_at else 0
+    score = (
+        RATING_WEIGHT * rated / 5
+        + REVIEW_VOLUME_WEIGHT * _saturating(reviews_count, REVIEW_VOLUME_SATURATION)
+        + BOOKING_WEIGHT * _saturating(recent_bookings_count, BOOKING_SATURATION)
+        + FRESHNESS_WEIGHT * 0.5 ** (age_days / FRESHNESS_HALF_LIFE_DAYS)
+    )
+    return round(score * 100, 4)
+
+
+def refresh_ranking_scores(property_ids=None, batch_size=500):
+    """Recompute ranking inputs and scores, for ``property_ids`` or every property.
+
+    Returns how many properties changed. Review and booking totals come from
+    two grouped queries; only changed rows are written back.
+    """
+    now = timezone.now()
+    properties = Property.objects.only(
+        'id', 'average_rating', 'created_at', 'reviews_count', 'recent_bookings_count', 'ranking_score',
+    )
+    reviews = Review.objects.all()
+    bookings = Booking.objects.filter(created_at__gte=now - timedelta(days=RECENT_BOOKING_DAYS)).exclude(status='cancelled')
+    if property_ids is not None:
+        property_ids = set(property_ids)
+        properties = properties.filter(id__in=property_ids)
+        reviews = reviews.filter(property_id__in=property_ids)
+        bookings = bookings.filter(property_id__in=property_ids)
+    review_totals = dict(reviews.values('property_id').annotate(total=Count('id')).values_list('property_id', 'total'))
+    booking_totals = dict(bookings.values('property_id').annotate(total=Count('id')).values_list('property_id', 'total'))
+
+    changed = []
+    updated = 0
+    for property_obj in properties.iterator(chunk_size=batch_size):
+        reviews_count = review_totals.get(property_obj.id, 0)
+        recent_bookings_count = booking_totals.get(property_obj.id, 0)
+        score = ranking_score(property_obj.average_rating, reviews_count, recent_bookings_count, property_obj.created_at, now)
+        if (property_obj.reviews_count, property_obj.recent_bookings_count, property_obj.ranking_score) == (reviews_count, recent_bookings_count, score):
+            continue
+        property_obj.reviews_count = reviews_count
+        property_obj.recent_bookings_count = recent_bookings_count
+        property_obj.ranking_score = score
+        changed.append(property_obj)
+        if len(changed) >= batch_size:
+            Property.objects.bulk_update(changed, ['reviews_count', 'recent_bookings_count', 'ranking_score'])
+            updated += len(changed)
+            changed = []
+    if changed:
+        Property.objects.bulk_update(changed, ['reviews_count', 'recent_bookings_count', 'ranking_score'])
+        updated += len(changed)
+    if updated:
+        # bulk_update skips model signals, so retire cached result orderings here.
+        transaction.on_commit(lambda: bump_version(CATALOG_VERSION_NAMESPACE))
+    return updated
+
+
+@receiver(post_save, sender=Property)
+def rank_saved_property(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'average_rating', 'created_at'} & set(update_fields):
+        return
+    property_id = instance.id
+    transaction.on_commit(lambda: refresh_ranking_scores([property_id]))
+
+
+@receiver([post_save, post_delete], sender=Review)
+def rank_reviewed_property(sender, instance, **kwargs):
+    property_id = instance.property_id
+    transaction.on_commit(lambda: refresh_ranking_scores([property_id]))
+
+
+@receiver(bookings_changed)
+def rank_booked_properties(sender, property_ids, **kwargs):
+    refresh_ranking_scores(property_ids)
@@ -0,0 +1,208 @@
+import bisect
+import re
+import threading
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.versioning import bump_version, get_version
+
+from .models import Property
+
+TEXT_INDEX_VERSION_NAMESPACE = 'property-text-index'
+
+FIELD_WEIGHTS = {
+    'name': 4.0,
+    'city': 3.0,
+    'state': 2.0,
+    'address': 2.0,
+    'country': 1.5,
+    'amenities': 1.5,
+    'description': 1.0,
+}
+FIELD_BITS = {field: 1 << position for position, field in enumerate(FIELD_WEIGHTS)}
+LOCATION_FIELDS = ('city', 'state', 'country', 'address', 'name')
+KEYWORD_FIELDS = ('name', 'description', 'address', 'amenities')
+
+# A prefix hit counts for less than the whole word so "kis" ranks an exact
+# "Kis" above "Kisumu" when both exist.
+PREFIX_MATCH_FACTOR = 0.6
+
+_TOKEN_PATTERN = re.compile(r'[0-9a-z]+')
+_INDEXED_COLUMNS = ('id', 'name', 'city', 'state', 'address', 'country', 'amenities', 'description')
+
+
+def tokenize(text):
+    """Lower-case, accent-folded alphanumeric tokens of ``text``."""
+    if not text:
+        return []
+    folded = unicodedata.normalize('NFKD', str(text))
+    folded = ''.join(char for char in folded if not unicodedata.combining(char))
+    return _TOKEN_PATTERN.findall(folded.lower())
+
+
+def _fields_mask(fields):
+    if fields is None:
+        return sum(FIELD_BITS.values())
+    return sum(FIELD_BITS[field] for field in fields)
+
+
+def _document_fields(values):
+    amenity_labels = dict(Property.AMENITY_CHOICES)
+    amenities = values.get('amenities') or []
+    values = dict(values)
+    values['amenities'] = ' '.join(
+        f"{amenity} {amenity_labels.get(amenity, '')}" for amenity in amenities
+    )
+    return {field: values.get(field) or '' for field in FIELD_WEIGHTS}
+
+
+class PropertyTextIndex:
+    """In-process inverted index over the searchable Property text fields.
+
+    Each token maps to ``{property_id: field_bits}`` so one posting list can
+    answer both the explore location box and the keyword search while only
+    counting the fields each caller asked for.
+    """
+
+    def __init__(self):
+        self.version = None
+        self._postings = {}
+        self._document_tokens = {}
+        self._sorted_tokens = []
+        self._tokens_dirty = False
+        self._lock = threading.RLock()
+
+    def _add_document(self, property_id, fields):
+        tokens = {}
+        for field, text in fields.items():
+            bit = FIELD_BITS[field]
+            for token in tokenize(text):
+                tokens[token] = tokens.get(token, 0) | bit
+        for token, bits in tokens.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._tokens_dirty = True
+            postings[property_id] = bits
+        self._document_tokens[property_id] = set(tokens)
+
+    def _remove_document(self, property_id):
+        for token in self._document_tokens.pop(property_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(property_id, None)
+            if not postings:
+                del self._postings[token]
+                self._tokens_dirty = True
+
+    def rebuild(self):
+        version = get_version(TEXT_INDEX_VERSION_NAMESPACE)
+        with self._lock:
+            self._postings = {}
+            self._document_tokens = {}
+            for values in Property.objects.values(*_INDEXED_COLUMNS).iterator():
+                self._add_document(values['id'], _document_fields(values))
+            self._tokens_dirty = True
+            self.version = version
+
+    def ensure_fresh(self):
+        if self.version != get_version(TEXT_INDEX_VERSION_NAMESPACE):
+            self.rebuild()
+
+    def apply_change(self, property_id, values=None):
+        """Re-index one property from its saved ``values``, or drop it when ``values`` is None."""
+        previous = self.version
+        current = bump_version(TEXT_INDEX_VERSION_NAMESPACE)
+        if previous is None or current != previous + 1:
+            self.version = None
+            return
+        with self._lock:
+            self._remove_document(property_id)
+            if values is not None:
+                self._add_document(property_id, _document_fields(values))
+            self.version = current
+
+    def _expand(self, term):
+        if self._tokens_dirty:
+            self._sorted_tokens = sorted(self._postings)
+            self._tokens_dirty = False
+        position = bisect.bisect_left(self._sorted_tokens, term)
+        while position < len(self._sorted_tokens) and self._sorted_tokens[position].startswith(term):
+            token = self._sorted_tokens[position]
+            yield token, 1.0 if token == term else PREFIX_MATCH_FACTOR
+            position += 1
+
+    def search(self, query, fields=None):
+        """Rank property ids whose ``fields`` contain every query term as a word or word prefix.
+
+        Returns None when the query has no searchable terms, so callers can
+        skip the text constraint entirely.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return None
+        self.ensure_fresh()
+        allowed = _fields_mask(fields)
+        weights = [(bit, FIELD_WEIGHTS[field]) for field, bit in FIELD_BITS.items() if bit & allowed]
+        scores = None
+        with self._lock:
+            for term in terms:
+                term_scores = {}
+                for token, factor in self._expand(term):
+                    for property_id, bits in self._postings[token].items():
+                        matched = bits & allowed
+                        if not matched:
+                            continue
+                        score = factor * sum(weight for bit, weight in weights if bit & matched)
+                        if score > term_scores.get(property_id, 0):
+                            term_scores[property_id] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        property_id: score + term_scores[property_id]
+                        for property_id, score in scores.items()
+                        if property_id in term_scores
+                    }
+                if not scores:
+                    return []
+        return sorted(scores, key=lambda property_id: (-scores[property_id], property_id))
+
+
+_index = PropertyTextIndex()
+
+
+def get_text_index():
+    return _index
+
+
+def search_property_ids(query, fields=None):
+    return _index.search(query, fields=fields)
+
+
+def order_by_relevance(queryset, ranked_ids):
+    """Order ``queryset`` best match first, following ``ranked_ids`` from :func:`search_property_ids`."""
+    return queryset.alias(
+        relevance_rank=Case(
+            *[When(id=property_id, then=Value(rank)) for rank, property_id in enumerate(ranked_ids)],
+            default=Value(len(ranked_ids)),
+            output_field=IntegerField(),
+        )
+    ).order_by('relevance_rank', 'id')
+
+
+@receiver(post_save, sender=Property)
+def index_saved_property(sender, instance, **kwargs):
+    values = {column: getattr(instance, column) for column in _INDEXED_COLUMNS}
+    transaction.on_commit(lambda: _index.apply_change(instance.id, values))
+
+
+@receiver(post_delete, sender=Property)
+def unindex_deleted_property(sender, instance, **kwargs):
+    property_id = instance.id
+    transaction.on_commit(lambda: _index.apply_change(property_id))
@@ -1,3 +1,497 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import Booking
+
+from properties.choice_masks import choice_facet_counts, filter_by_choices
+from properties.geo import get_spatial_index, nearby_properties
+from properties.location_trie import get_location_trie
+from properties.models import PricingRule, Property, Review
+from properties.pricing import price_stays
+from properties.ranking import refresh_ranking_scores
+from properties.search_index import KEYWORD_FIELDS, LOCATION_FIELDS, get_text_index, search_property_ids
+from users.models import CustomUser
+
+
+class PropertyTextIndexTests(TestCase):
+    def setUp(self):
+        self.host = CustomUser.objects.create_user(
+            username='indexhost',
+            email='indexhost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        self.loft = self._listing('Milimani Loft', city='Kisumu', amenities=['wifi', 'pool'])
+        self.villa = self._listing('Dunga Villa', city='Kisumu', description='Sunset views near Kisumu Yacht Club.')
+        self.cottage = self._listing('Shoreline Cottage', city='Homa Bay', state='Homa Bay County')
+        get_text_index().rebuild()
+
+    def _listing(self, name, city, state='Kisumu County', description='A calm stay.', amenities=None):
+        return Property.objects.create(
+            owner=self.host,
+            name=name,
+            description=description,
+            property_type='house',
+            address=f'{name}, {city}',
+            city=city,
+            state=state,
+            price_per_night=3000,
+            max_guests=4,
+            bedrooms=2,
+            bathrooms=1,
+            amenities=amenities or [],
+        )
+
+    def test_prefix_terms_match_location_fields(self):
+        self.assertCountEqual(search_property_ids('kisu', fields=LOCATION_FIELDS), [self.loft.id, self.villa.id])
+        self.assertEqual(search_property_ids('homa bay', fields=LOCATION_FIELDS), [self.cottage.id])
+
+    def test_field_restriction_and_relevance(self):
+        self.assertEqual(search_property_ids('yacht', fields=LOCATION_FIELDS), [])
+        self.assertEqual(search_property_ids('swimming', fields=KEYWORD_FIELDS), [self.loft.id])
+        self.assertIsNone(search_property_ids('  ,  '))
+
+    def test_keyword_search_lists_the_best_matches_first(self):
+        response = self.client.get(reverse('properties:property_search'), {'q': 'kisumu'})
+
+        self.assertEqual([listing.id for listing in response.context['properties']], [self.villa.id, self.loft.id])
+
+    def test_saved_and_deleted_properties_update_the_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cottage.city = 'Mbita'
+            self.cottage.save()
+        self.assertEqual(search_property_ids('mbita', fields=LOCATION_FIELDS), [self.cottage.id])
+
+        cottage_id = self.cottage.id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cottage.delete()
+        self.assertNotIn(cottage_id, search_property_ids('homa', fields=LOCATION_FIELDS))
+
+
+class SpatialIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.host = CustomUser.objects.create_user(
+            username='geohost',
+            email='geohost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        self.kisumu = self._listing('Kisumu Pier', -0.0917, 34.7680)
+        self.dunga = self._listing('Dunga Beach', -0.1400, 34.7400)
+        self.homa_bay = self._listing('Homa Bay Cove', -0.5273, 34.4571)
+        get_spatial_index().rebuild()
+
+    def _listing(self, name, lat, lng):
+        return Property.objects.create(
+            owner=self.host,
+            name=name,
+            description='Pinned stay.',
+            property_type='house',
+            address=name,
+            city=name,
+            state='Nyanza',
+            latitude=lat,
+            longitude=lng,
+            price_per_night=2000,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+
+    def test_radius_search_returns_nearest_first_within_radius(self):
+        matches = nearby_properties(-0.0917, 34.7680, radius_km=20)
+
+        self.assertEqual([property_id for property_id, _ in matches], [self.kisumu.id, self.dunga.id])
+        self.assertLess(matches[1][1], 20)
+
+    def test_unusable_pins_fall_back_to_the_text_match(self):
+        self.assertEqual(nearby_properties(float('inf'), 34.74), [])
+        for lat, lng in (('inf', '36'), ('1e308', '1e308'), ('nan', '34.74'), ('91', '34.74')):
+            response = self.client.get(reverse('core:properties_list'), {'location': 'Dunga', 'location_lat': lat, 'location_lng': lng})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([property_obj.id for property_obj in response.context['properties']], [self.dunga.id])
+
+    def test_explore_nearest_sort_orders_by_distance(self):
+        response = self.client.get(reverse('core:properties_list'), {
+            'location': 'Somewhere on the lake',
+            'location_lat': '-0.14',
+            'location_lng': '34.74',
+            'radius_km': '100',
+            'sort': 'nearest',
+        })
+
+        self.assertEqual(
+            [property_obj.id for property_obj in response.context['properties']],
+            [self.dunga.id, self.kisumu.id, self.homa_bay.id],
+        )
+
+
+class ChoiceMaskTests(TestCase):
+    def setUp(self):
+        self.host = CustomUser.objects.create_user(
+            username='maskhost',
+            email='maskhost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        self.wifi_pool = self._listing('Pool House', ['wifi', 'pool'])
+        self.wifi_only = self._listing('Wifi Flat', ['wifi'])
+        self.bare = self._listing('Bare Room', [])
+
+    def _listing(self, name, amenities):
+        return Property.objects.create(
+            owner=self.host,
+            name=name,
+            description='Mask stay.',
+            property_type='apartment',
+            address=name,
+            city='Kisumu',
+            state='Kisumu County',
+            price_per_night=1500,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+            amenities=amenities,
+            policies=['no_smoking'],
+        )
+
+    def test_filter_requires_every_selected_amenity(self):
+        properties = Property.objects.all()
+
+        self.assertCountEqual(filter_by_choices(properties, 'amenities', ['wifi']), [self.wifi_pool, self.wifi_only])
+        self.assertEqual(list(filter_by_choices(properties, 'amenities', ['wifi', 'pool'])), [self.wifi_pool])
+        self.assertEqual(list(filter_by_choices(properties, 'amenities', ['wifi', 'moat'])), [])
+
+    def test_search_form_offers_amenities_with_counts(self):
+        response = self.client.get(reverse('properties:property_search'), {'amenities': 'wifi'})
+        self.assertEqual(len(response.context['properties']), 2)
+        self.assertContains(response, 'name="amenities" value="wifi" checked')
+        counts = {value: count for value, _, count in response.context['amenity_choices']}
+        self.assertEqual((counts['wifi'], counts['pool']), (2, 1))
+
+    def test_search_form_counts_amenities_after_the_date_filter(self):
+        cache.clear()
+        check_in = timezone.localdate() + timedelta(days=3)
+        Booking.objects.create(
+            guest=self.host,
+            property=self.wifi_pool,
+            check_in_date=check_in,
+            check_out_date=check_in + timedelta(days=2),
+            num_guests=1,
+            total_price=3000,
+            status='confirmed',
+        )
+
+        response = self.client.get(reverse('properties:property_search'), {
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=1)).isoformat(),
+        })
+        counts = {value: count for value, _, count in response.context['amenity_choices']}
+        self.assertEqual((counts['wifi'], counts['pool']), (1, 0))
+
+    def test_facet_counts_and_backfill(self):
+        counts = choice_facet_counts(Property.objects.all(), 'amenities')
+        self.assertEqual((counts['wifi'], counts['pool'], counts['gym']), (2, 1, 0))
+
+        Property.objects.filter(pk=self.bare.pk).update(amenities=['gym'], amenities_mask=0, policies_mask=0)
+        call_command('backfill_choice_masks', stdout=StringIO())
+
+        self.bare.refresh_from_db()
+        self.assertEqual(self.bare.amenities_mask, Property.AMENITY_BITS['gym'])
+        self.assertEqual(self.bare.policies_mask, Property.POLICY_BITS['no_smoking'])
+
+
+class RankingScoreTests(TestCase):
+    def setUp(self):
+        self.host = CustomUser.objects.create_user(
+            username='rankhost',
+            email='rankhost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        self.guest = CustomUser.objects.create_user(
+            username='rankguest',
+            email='rankguest@example.com',
+            password='testpass123',
+            role='guest',
+        )
+        self.quiet = self._listing('Quiet Stay')
+        self.loved = self._listing('Loved Stay')
+        refresh_ranking_scores()
+
+    def _listing(self, name):
+        return Property.objects.create(
+            owner=self.host,
+            name=name,
+            description='Ranked stay.',
+            property_type='house',
+            address=name,
+            city='Kisumu',
+            state='Kisumu County',
+            price_per_night=2500,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+
+    def test_reviews_refresh_the_score_incrementally(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                Review.objects.create(property=self.loved, user=self.guest, rating=5.0, comment='Lovely.')
+            self.loved.average_rating = 5.0
+            self.loved.save(update_fields=['average_rating'])
+
+        self.loved.refresh_from_db()
+        self.quiet.refresh_from_db()
+        self.assertEqual(self.loved.reviews_count, 3)
+        self.assertGreater(self.loved.ranking_score, self.quiet.ranking_score)
+        self.assertEqual(
+            list(Property.objects.order_by('-ranking_score', '-id').values_list('id', flat=True)),
+            [self.loved.id, self.quiet.id],
+        )
+
+    def test_rebuild_command_fills_missing_scores(self):
+        Property.objects.update(ranking_score=0, reviews_count=0)
+        call_command('rebuild_ranking_scores', allow_local_cache=True, stdout=StringIO(), stderr=StringIO())
+
+        self.quiet.refresh_from_db()
+        self.assertGreater(self.quiet.ranking_score, 0)
+
+
+class LocationTrieTests(TestCase):
+    def setUp(self):
+        self.host = CustomUser.objects.create_user(
+            username='triehost',
+            email='triehost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        self.milimani = self._listing('Milimani, Kisumu', 'Kisumu', -0.09, 34.76)
+        self._listing('Dunga, Kisumu', 'Kisumu', -0.13, 34.74)
+        self._listing('Pier Road, Homa Bay', 'Homa Bay', None, None)
+        get_location_trie().rebuild()
+
+    def _listing(self, address, city, lat, lng):
+        return Property.objects.create(
+            owner=self.host,
+            name=f'Stay at {address}',
+            description='Trie stay.',
+            property_type='house',
+            address=address,
+            city=city,
+            state='Nyanza',
+            latitude=lat,
+            longitude=lng,
+            price_per_night=2000,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+
+    def _suggest(self, query):
+        return self.client.get(reverse('properties:location_suggestions'), {'q': query}).json()['results']
+
+    def test_suggestions_carry_counts_and_centroids(self):
+        kisumu = self._suggest('kis')[0]
+
+        self.assertEqual((kisumu['kind'], kisumu['name'], kisumu['count']), ('city', 'Kisumu', 2))
+        self.assertAlmostEqual(kisumu['lat'], -0.11)
+        self.assertEqual(
+            [(place['kind'], place['name']) for place in self._suggest('bay')],
+            [('city', 'Homa Bay')],
+        )
+        self.assertEqual(self._suggest('mili')[0]['kind'], 'neighbourhood')
+
+    def test_saves_and_deactivation_update_the_trie(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milimani.is_active = False
+            self.milimani.save()
+
+        self.assertEqual(self._suggest('mili'), [])
+        self.assertEqual(self._suggest('kisumu')[0]['count'], 1)
+
+
+class AvailabilityCalendarTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.day = lambda offset: timezone.localdate() + timedelta(days=offset)
+        self.host = CustomUser.objects.create_user(
+            username='calendarapihost',
+            email='calendarapihost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        self.cabin, self.flat, self.hidden = (self._listing(name, active) for name, active in (('Cabin', True), ('Flat', True), ('Hidden', False)))
+        Booking.objects.create(
+            guest=self.host,
+            property=self.cabin,
+            check_in_date=self.day(2),
+            check_out_date=self.day(5),
+            num_guests=1,
+            total_price=6000,
+            status='confirmed',
+        )
+
+    def _listing(self, name, is_active):
+        return Property.objects.create(
+            owner=self.host,
+            name=name,
+            description='Calendar stay.',
+            property_type='house',
+            address='Naivasha',
+            city='Naivasha',
+            state='Nakuru',
+            price_per_night=2000,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+            is_active=is_active,
+        )
+
+    def _get(self, **headers):
+        ids = f'{self.cabin.id},{self.flat.id},{self.hidden.id}'
+        return self.client.get(
+            reverse('properties:availability_calendar'),
+            {'ids': ids, 'start': self.day(0).isoformat(), 'end': self.day(10).isoformat()},
+            **headers,
+        )
+
+    def test_returns_run_lengths_and_revalidates_by_etag(self):
+        response = self._get()
+
+        self.assertEqual(response.json()['properties'], [
+            {'id': self.cabin.id, 'runs': [2, 3, 5]},
+            {'id': self.flat.id, 'runs': [10]},
+        ])
+        self.assertEqual(self._get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(
+                guest=self.host,
+                property=self.flat,
+                check_in_date=self.day(0),
+                check_out_date=self.day(1),
+                num_guests=1,
+                total_price=2000,
+                status='pending',
+            )
+
+        refreshed = self._get(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertEqual(refreshed.json()['properties'][1]['runs'], [0, 1, 9])
+
+    def test_malformed_ids_and_dates_are_rejected(self):
+        url = reverse('properties:availability_calendar')
+        self.assertEqual(self.client.get(url, {'ids': '²'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'ids': str(self.cabin.id), 'start': '9999-12-30'}).status_code, 400)
+
+
+class PricingEngineTests(TestCase):
+    def setUp(self):
+        self.host = CustomUser.objects.create_user(
+            username='pricinghost',
+            email='pricinghost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        self.villa = self._listing('Rate Villa', 1000)
+        self.plain = self._listing('Flat Rate', 800)
+        PricingRule.objects.create(property=self.villa, kind='weekend', adjustment_percent=50)
+        PricingRule.objects.create(property=self.villa, kind='season', adjustment_percent=20, start_date=date(2030, 1, 13), end_date=date(2030, 1, 13))
+        PricingRule.objects.create(property=self.villa, kind='length_of_stay', adjustment_percent=-5, min_nights=3)
+        PricingRule.objects.create(property=self.villa, kind='length_of_stay', adjustment_percent=-10, min_nights=7)
+
+    def _listing(self, name, price):
+        return Property.objects.create(
+            owner=self.host,
+            name=name,
+            description='Priced stay.',
+            property_type='villa',
+            address='Diani',
+            city='Diani',
+            state='Kwale',
+            price_per_night=price,
+            max_guests=4,
+            bedrooms=2,
+            bathrooms=1,
+        )
+
+    def test_rules_combine_across_many_stays_in_one_pass(self):
+        # 2030-01-07 is a Monday: Friday and Saturday nights carry the weekend
+        # rate, Sunday the seasonal one, and a week earns the weekly discount.
+        with self.assertNumQueries(2):
+            totals = price_stays([
+                (self.villa.id, date(2030, 1, 7), date(2030, 1, 14)),
+                (self.villa.id, date(2030, 1, 10), date(2030, 1, 12)),
+                (self.plain.id, date(2030, 1, 10), date(2030, 1, 13)),
+                (self.villa.id, date(2030, 1, 12), date(2030, 1, 12)),
+            ])
+
+        self.assertEqual(totals, [Decimal('7380.00'), Decimal('2500.00'), Decimal('2400.00'), None])
+
+    def test_bookings_are_priced_by_the_engine(self):
+        booking = Booking(guest=self.host, property=self.villa, check_in_date=date(2030, 1, 10), check_out_date=date(2030, 1, 13), num_guests=1)
+
+        # 1000 + 1500 + 1500, less the 5% three-night discount.
+        self.assertEqual(booking.calculate_total_price(), Decimal('3800.00'))
+
+
+class StayQuoteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.day = lambda offset: timezone.localdate() + timedelta(days=offset)
+        self.host = CustomUser.objects.create_user(
+            username='quotehost',
+            email='quotehost@example.com',
+            password='testpass123',
+            role='host',
+        )
+        self.listing = Property.objects.create(
+            owner=self.host,
+            name='Quote Cottage',
+            description='Quoted stay.',
+            property_type='house',
+            address='Nanyuki',
+            city='Nanyuki',
+            state='Laikipia',
+            price_per_night=1500,
+            max_guests=2,
+            bedrooms=1,
+            bathrooms=1,
+        )
+
+    def _quote(self, check_in, check_out, guests=1):
+        return self.client.get(
+            reverse('properties:property_quote', args=[self.listing.id]),
+            {'check_in': self.day(check_in).isoformat(), 'check_out': self.day(check_out).isoformat(), 'guests': guests},
+        )
+
+    def test_quotes_are_cached_until_bookings_or_pricing_change(self):
+        self.assertEqual(self._quote(3, 5).json(), {'available': True, 'reason': None, 'nights': 2, 'total': '3000.00', 'conflict': None})
+        with self.assertNumQueries(0):
+            self._quote(3, 5)
+        self.assertEqual(self._quote(3, 5, guests=3).json()['reason'], 'guests')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(
+                guest=self.host,
+                property=self.listing,
+                check_in_date=self.day(4),
+                check_out_date=self.day(6),
+                num_guests=1,
+                total_price=3000,
+                status='confirmed',
+            )
+            PricingRule.objects.create(property=self.listing, kind='length_of_stay', adjustment_percent=-10, min_nights=2)
 
-# Create your tests here.
+        quote = self._quote(3, 5).json()
+        self.assertEqual((quote['available'], quote['reason'], quote['total']), (False, 'booked', '2700.00'))
+        self.assertEqual(quote['conflict'], {'check_in': self.day(4).isoformat(), 'check_out': self.day(6).isoformat()})
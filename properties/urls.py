@@ -7,7 +7,11 @@ urlpatterns = [
     # Example: path('', views.property_list, name='property_list'),
     # Add your property-related URLs here
     path('', views.property_search, name='property_search'),
+    path('availability/', views.availability_calendar, name='availability_calendar'),
+    path('locations/suggest/', views.location_suggestions, name='location_suggestions'),
     path('<int:property_id>/', views.PropertyDetailView.as_view(), name='property_detail'),
+    path('<int:property_id>/quote/', views.property_quote, name='property_quote'),
+    path('<int:property_id>/calendar.ics', views.property_calendar, name='property_calendar'),
     path('<int:property_id>/live/', views.property_detail_live, name='property_detail_live'),
     path('<int:property_id>/reviews/', views.submit_review, name='submit_review'),
 
@@ -8,16 +8,31 @@ from django.template.loader import render_to_string
 
 from bookings.forms import BookingForm
 from .forms import ReviewForm
+from .choice_masks import choice_facet_counts, filter_by_choices
+from .location_trie import DEFAULT_SUGGESTION_LIMIT, suggest_locations
+from .pricing import attach_stay_totals
+from .quotes import stay_quote
+from .search_index import KEYWORD_FIELDS, order_by_relevance, search_property_ids
 from django.db.models import Sum, Max
 from django.utils import timezone
 from django.db.models import Q, Avg
-from datetime import datetime
+from datetime import date, datetime, timedelta
+import hashlib
 import json
+from bookings.ical import property_calendar_feed
+from bookings.intervals import booking_versions, get_booking_intervals
+from bookings.occupancy import booked_property_ids, occupancy_runs
 from bookings.utils import check_property_availability, get_available_properties
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.contrib import messages
 
+CALENDAR_MAX_PROPERTIES = 100
+CALENDAR_MAX_DAYS = 366
+CALENDAR_DEFAULT_DAYS = 90
+
 AMENITY_ICONS = {
     'wifi': 'fa-solid fa-wifi',
     'kitchen': 'fa-solid fa-kitchen-set',
@@ -66,20 +81,20 @@ def _property_detail_context_data(property_obj, user):
             guest=user,
         ).exclude(status='cancelled').order_by('-check_in_date')
 
-    unavailable_bookings = Booking.objects.filter(
-        property=property_obj,
-        status__in=['confirmed', 'pending', 'checked_in']
-    ).order_by('check_in_date')
+    unavailable_periods = get_booking_intervals(property_obj.id).ranges()
     unavailable_periods_json = json.dumps([
         {
-            'check_in': booking.check_in_date.isoformat(),
-            'check_out': booking.check_out_date.isoformat(),
-            'status': booking.status,
+            'check_in': period['check_in_date'].isoformat(),
+            'check_out': period['check_out_date'].isoformat(),
+            'status': period['status'],
         }
-        for booking in unavailable_bookings
+        for period in unavailable_periods
     ])
 
-    booking_latest = unavailable_bookings.order_by('-updated_at').values_list('updated_at', flat=True).first()
+    booking_latest = Booking.objects.filter(
+        property=property_obj,
+        status__in=Booking.AVAILABILITY_BLOCKING_STATUSES,
+    ).order_by('-updated_at').values_list('updated_at', flat=True).first()
     review_latest = reviews.order_by('-updated_at').values_list('updated_at', flat=True).first()
     latest_update = max(
         [stamp for stamp in [property_obj.updated_at, booking_latest, review_latest] if stamp is not None],
@@ -99,7 +114,7 @@ def _property_detail_context_data(property_obj, user):
         'can_book_listing': can_book_listing,
         'existing_guest_bookings': existing_guest_bookings[:4],
         'has_existing_booking': existing_guest_bookings.exists(),
-        'unavailable_periods': unavailable_bookings[:6],
+        'unavailable_periods': unavailable_periods[:6],
         'unavailable_periods_json': unavailable_periods_json,
         'amenities_display': [
             (
@@ -109,7 +124,7 @@ def _property_detail_context_data(property_obj, user):
             )
             for amenity in property_obj.amenities
         ],
-        'live_version': f"{property_obj.id}:{reviews.count()}:{unavailable_bookings.count()}:{latest_update.isoformat() if latest_update else 'none'}",
+        'live_version': f"{property_obj.id}:{reviews.count()}:{len(unavailable_periods)}:{latest_update.isoformat() if latest_update else 'none'}",
     }
 
 class PropertyListView(ListView):
@@ -217,12 +232,9 @@ def property_search(request):
     # Search query
     query = request.GET.get('q')
     if query:
-        properties = properties.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query) |
-            Q(address__icontains=query) |
-            Q(amenities__icontains=query)
-        )
+        query_matches = search_property_ids(query, fields=KEYWORD_FIELDS)
+        if query_matches is not None:
+            properties = order_by_relevance(properties.filter(id__in=query_matches), query_matches)
 
     # Property type filter
     property_type = request.GET.get('property_type')
@@ -243,26 +255,33 @@ def property_search(request):
     if guests:
         properties = properties.filter(max_guests__gte=guests)
 
+    # Amenities: every selected amenity must be offered
+    amenities = request.GET.getlist('amenities')
+    if amenities:
+        properties = filter_by_choices(properties, 'amenities', amenities)
+
     # Dates availability
     check_in = request.GET.get('check_in')
     check_out = request.GET.get('check_out')
 
+    stay = None
     if check_in and check_out:
         try:
             check_in_date = datetime.strptime(check_in, '%Y-%m-%d').date()
             check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
 
-            # Find properties that have conflicting bookings
-            booked_properties = Booking.objects.filter(
-                check_in_date__lt=check_out_date,
-                check_out_date__gt=check_in_date,
-                status__in=['confirmed', 'pending']
-            ).values_list('property_id', flat=True)
-
-            properties = properties.exclude(id__in=booked_properties)
+            # Skip properties that have conflicting bookings
+            properties = properties.exclude(id__in=booked_property_ids(check_in_date, check_out_date))
+            stay = (check_in_date, check_out_date)
         except ValueError:
             pass
 
+    # Counted after the date filter so each amenity count matches what ticking it would list.
+    amenity_counts = choice_facet_counts(properties, 'amenities')
+    if stay:
+        properties = list(properties)
+        attach_stay_totals(properties, dict.fromkeys((row.id for row in properties), stay))
+
     context = {
         'properties': properties,
         'search_query': query or '',
@@ -272,6 +291,102 @@ def property_search(request):
         'guests': guests or '',
         'check_in': check_in or '',
         'check_out': check_out or '',
+        'amenities': amenities,
+        'amenity_choices': [(value, label, amenity_counts[value]) for value, label in Property.AMENITY_CHOICES],
     }
 
     return render(request, 'properties/property_list.html', context)
+
+
+def location_suggestions(request):
+    """Listing-backed place suggestions for the explore location box."""
+    try:
+        limit = min(max(int(request.GET.get('limit', DEFAULT_SUGGESTION_LIMIT)), 1), 20)
+    except (TypeError, ValueError):
+        limit = DEFAULT_SUGGESTION_LIMIT
+    query = request.GET.get('q', '')
+    return JsonResponse({'query': query, 'results': suggest_locations(query, limit=limit)})
+
+
+def property_quote(request, property_id):
+    """Availability and total for a proposed stay, polled by the booking date picker."""
+    try:
+        check_in = date.fromisoformat(request.GET.get('check_in', ''))
+        check_out = date.fromisoformat(request.GET.get('check_out', ''))
+        guests = int(request.GET.get('guests') or 1)
+    except ValueError:
+        return JsonResponse({'ok': False, 'errors': {'check_in': ['Pass check_in, check_out as YYYY-MM-DD and a guest count.']}}, status=400)
+    if not 0 < (check_out - check_in).days <= CALENDAR_MAX_DAYS or guests < 1:
+        return JsonResponse({'ok': False, 'errors': {'check_out': ['Check-out must be after check-in.']}}, status=400)
+
+    quote = stay_quote(property_id, check_in, check_out, guests)
+    if quote is None:
+        return JsonResponse({'ok': False, 'errors': {'property': ['This listing is not available.']}}, status=404)
+    if quote['available'] and check_in <= timezone.localdate():
+        quote = {**quote, 'available': False, 'reason': 'advance'}
+    return JsonResponse(quote)
+
+
+def _calendar_property_ids(request):
+    ids = []
+    for value in request.GET.getlist('ids'):
+        for part in value.split(','):
+            part = part.strip()
+            # isdigit() alone accepts characters like '²' that int() rejects.
+            if part.isascii() and part.isdigit():
+                ids.append(int(part))
+    return list(dict.fromkeys(ids))
+
+
+def availability_calendar(request):
+    """Night-by-night availability for many properties as run lengths, with ETag revalidation.
+
+    ``?ids=1,2,3&start=YYYY-MM-DD&end=YYYY-MM-DD``; each property's ``runs``
+    alternate free and booked night counts from ``start``, free first.
+    """
+    property_ids = _calendar_property_ids(request)
+    if not property_ids or len(property_ids) > CALENDAR_MAX_PROPERTIES:
+        return JsonResponse({'ok': False, 'errors': {'ids': [f'Pass between 1 and {CALENDAR_MAX_PROPERTIES} property ids.']}}, status=400)
+    try:
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else timezone.localdate()
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else start + timedelta(days=CALENDAR_DEFAULT_DAYS)
+    except (ValueError, OverflowError):
+        return JsonResponse({'ok': False, 'errors': {'start': ['Dates must look like YYYY-MM-DD.']}}, status=400)
+    if not 0 < (end - start).days <= CALENDAR_MAX_DAYS:
+        return JsonResponse({'ok': False, 'errors': {'end': [f'End must fall 1 to {CALENDAR_MAX_DAYS} days after start.']}}, status=400)
+
+    visible = Q(is_active=True)
+    if request.user.is_authenticated:
+        visible |= Q(owner_id=request.user.id)
+    property_ids = sorted(Property.objects.filter(visible, id__in=property_ids).values_list('id', flat=True))
+
+    versions = booking_versions(property_ids)
+    fingerprint = repr((start, end, [(property_id, versions[property_id]) for property_id in property_ids]))
+    etag = f'"{hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        runs = occupancy_runs(property_ids, start, end)
+        response = JsonResponse({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'properties': [{'id': property_id, 'runs': runs[property_id]} for property_id in property_ids],
+        })
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def property_calendar(request, property_id):
+    """iCal feed of a listing's booked nights for other sites to import; revalidates with ETag / Last-Modified."""
+    feed = property_calendar_feed(property_id)
+    if feed is None:
+        raise Http404('This listing is not available.')
+    last_modified = int(feed['last_modified'].timestamp())
+    response = get_conditional_response(request, etag=feed['etag'], last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(feed['body'], content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = f'inline; filename="baystays-property-{property_id}.ics"'
+    response['ETag'] = feed['etag']
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -838,6 +838,49 @@
         const rate = Number(bookingCalculator.dataset.nightlyRate || 0);
         let unavailableRanges = JSON.parse(bookingCalculator.dataset.unavailableRanges || '[]');
         const todayIso = new Date(Date.now() + 86400000).toISOString().slice(0, 10);
+        const quoteUrl = bookingCalculator.dataset.quoteUrl;
+        let activeQuote = 0;
+
+        const fetchServerQuote = debounce(async () => {
+            if (!quoteUrl || !checkIn?.value || !checkOut?.value) {
+                return;
+            }
+            const requestId = ++activeQuote;
+            const params = new URLSearchParams({
+                check_in: checkIn.value,
+                check_out: checkOut.value,
+                guests: guests?.value || '1',
+            });
+            try {
+                const response = await fetch(`${quoteUrl}?${params}`, {
+                    headers: {
+                        'Accept': 'application/json',
+                    },
+                });
+                if (!response.ok || requestId !== activeQuote) {
+                    return;
+                }
+                const quote = await response.json();
+                if (requestId !== activeQuote) {
+                    return;
+                }
+                if (totalNode && quote.total) {
+                    totalNode.textContent = 'KES ' + Number(quote.total).toLocaleString();
+                }
+                if (quote.reason === 'booked' && quote.conflict) {
+                    showInlineFeedback(
+                        availabilityNode,
+                        'error',
+                        `Those dates overlap a booking from ${quote.conflict.check_in} to ${quote.conflict.check_out}. Try different dates before sending your request.`
+                    );
+                    submitButton?.setAttribute('disabled', 'disabled');
+                } else if (quote.reason === 'guests') {
+                    showInlineFeedback(availabilityNode, 'error', 'This stay cannot host that many guests.');
+                }
+            } catch (error) {
+                // Keep the local estimate when the quote cannot be fetched.
+            }
+        }, 150);
 
         const normalizeBlockedRanges = () => unavailableRanges.map((range) => {
             const start = new Date(range.check_in);
@@ -896,6 +939,7 @@
                 }
                 clearInlineFeedback(availabilityNode);
                 submitButton?.removeAttribute('disabled');
+                activeQuote += 1;
                 return;
             }
             const diff = Math.max(0, Math.round((end - start) / 86400000));
@@ -929,6 +973,9 @@
                 clearInlineFeedback(availabilityNode);
                 submitButton?.removeAttribute('disabled');
             }
+            if (diff > 0) {
+                fetchServerQuote();
+            }
         };
 
         bookingCalculator._updateQuote = updateQuote;
@@ -1278,6 +1325,8 @@
         const stateField = wrapper.querySelector('[data-location-state]');
         const countryField = wrapper.querySelector('[data-location-country]');
         const hostForm = wrapper.closest('form');
+        const placeSource = wrapper.dataset.locationSource;
+        const radiusField = wrapper.querySelector('input[name="radius_km"]');
         let activeRequest = 0;
 
         const hideSuggestions = () => {
@@ -1326,7 +1375,63 @@
             hideSuggestions();
         };
 
-        const fetchSuggestions = debounce(async () => {
+        const fetchListingPlaces = async () => {
+            if (!input || !suggestions) {
+                return;
+            }
+            const query = input.value.trim();
+            if (query.length < 2) {
+                hideSuggestions();
+                return;
+            }
+            const requestId = ++activeRequest;
+            try {
+                const response = await fetch(`${placeSource}?q=${encodeURIComponent(query)}`, {
+                    headers: {
+                        'Accept': 'application/json',
+                    },
+                });
+                const data = await response.json();
+                if (requestId !== activeRequest) {
+                    return;
+                }
+                const places = Array.isArray(data.results) ? data.results : [];
+                suggestions.classList.remove('hidden');
+                if (!places.length) {
+                    suggestions.innerHTML = '<div class="px-4 py-4 text-sm text-slate-500">No stays listed there yet. Try a nearby town or area.</div>';
+                    return;
+                }
+                suggestions.innerHTML = places.map((place, index) => `
+                    <button type="button" class="location-suggestion" data-place-index="${index}">
+                        <i class="fa-solid fa-location-dot mt-1 text-red-500"></i>
+                        <span>
+                            <span class="block font-semibold text-slate-800">${escapeHtml(place.name)}</span>
+                            <span class="block text-sm text-slate-500 mt-1">${escapeHtml(place.context || place.kind)} &middot; ${escapeHtml(String(place.count))} ${place.count === 1 ? 'stay' : 'stays'}</span>
+                        </span>
+                    </button>
+                `).join('');
+                suggestions.querySelectorAll('[data-place-index]').forEach((button) => {
+                    button.addEventListener('click', () => {
+                        const place = places[Number(button.dataset.placeIndex)];
+                        if (radiusField) {
+                            radiusField.value = place.lat !== null ? place.radius_km : '';
+                        }
+                        applyLocationPayload({
+                            lat: place.lat ?? '',
+                            lng: place.lng ?? '',
+                            address: place.label,
+                            city: place.kind === 'city' ? place.name : '',
+                            state: place.kind === 'state' ? place.name : '',
+                            country: place.kind === 'country' ? place.name : '',
+                        });
+                    });
+                });
+            } catch (error) {
+                hideSuggestions();
+            }
+        };
+
+        const fetchGeocoderSuggestions = async () => {
             if (!input || !suggestions) {
                 return;
             }
@@ -1370,9 +1475,15 @@
             } catch (error) {
                 suggestions.innerHTML = '<div class="px-4 py-4 text-sm text-slate-500">Place suggestions are temporarily unavailable. You can still type the location manually.</div>';
             }
-        }, 320);
+        };
+
+        // Explore searches suggest places we have listings in; listing editors geocode full addresses.
+        const fetchSuggestions = placeSource ? debounce(fetchListingPlaces, 120) : debounce(fetchGeocoderSuggestions, 320);
 
         input?.addEventListener('input', () => {
+            if (radiusField) {
+                radiusField.value = '';
+            }
             if (hiddenLat) {
                 hiddenLat.value = '';
             }
@@ -1418,7 +1529,47 @@
         });
     });
 
+    const refreshExploreFacets = async (form, params) => {
+        if (!form.dataset.facetsUrl) {
+            return;
+        }
+        try {
+            const response = await fetch(`${form.dataset.facetsUrl}?${params.toString()}`, {
+                headers: {
+                    'X-Requested-With': 'XMLHttpRequest',
+                },
+            });
+            const facets = await response.json();
+            [['property-type', facets.property_type], ['guests', facets.guests]].forEach(([name, counts]) => {
+                const select = form.querySelector(`select[name="${name}"]`);
+                if (!select || !Array.isArray(counts)) {
+                    return;
+                }
+                const countsByValue = new Map(counts.map((item) => [item.value, item.count]));
+                select.querySelectorAll('option').forEach((option) => {
+                    if (!option.value || !countsByValue.has(option.value)) {
+                        return;
+                    }
+                    option.dataset.label = option.dataset.label || option.textContent.trim();
+                    option.textContent = `${option.dataset.label} (${countsByValue.get(option.value)})`;
+                });
+            });
+            if (Array.isArray(facets.amenities)) {
+                facets.amenities.forEach((item) => {
+                    const checkbox = form.querySelector(`input[name="amenities"][value="${item.value}"]`);
+                    const label = checkbox?.parentElement.querySelector('[data-facet-label]');
+                    if (label) {
+                        label.textContent = `${label.dataset.facetLabel} (${item.count})`;
+                    }
+                });
+            }
+        } catch (error) {
+            // Counts are a hint only; the filters keep working without them.
+        }
+    };
+
     document.querySelectorAll('form[data-explore-form]').forEach((form) => {
+        refreshExploreFacets(form, new URLSearchParams(new FormData(form)));
         const results = document.querySelector('[data-explore-results]');
         const overlay = document.querySelector('[data-results-overlay]');
         const countNode = document.querySelector('[data-results-count]');
@@ -1458,6 +1609,7 @@
                 if (payload.version) {
                     form.dataset.liveExploreVersion = payload.version;
                 }
+                refreshExploreFacets(form, params);
                 markAreaUpdated(results?.closest('.results-shell') || results);
                 const url = new URL(window.location.href);
                 url.search = params.toString();
@@ -11,7 +11,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth.password_validation import validate_password
 from django.core.mail import EmailMultiAlternatives
-from django.db.models import Avg, Sum
+from django.db.models import Sum
 from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.utils import timezone
@@ -19,7 +19,7 @@ from django.utils import timezone
 from bookings.forms import WithdrawalRequestForm
 from bookings.models import Booking, BookingPayment, HostWithdrawal
 from hosts.models import Host
-from properties.models import Property
+from hosts.stats import host_stats_for
 
 from .forms import (
     CustomUserCreationForm,
@@ -210,7 +210,7 @@ def profile(request):
 
     guest_bookings = Booking.objects.filter(guest=request.user).exclude(status='cancelled')
     guest_payments = BookingPayment.objects.filter(guest=request.user).select_related('booking', 'booking__property', 'host')
-    host_properties = Property.objects.filter(owner=request.user)
+    rollup = host_stats_for(request.user) if request.user.role in ['host', 'both'] else None
     host_bookings = Booking.objects.filter(property__owner=request.user)
     host_payments = BookingPayment.objects.filter(host=request.user).select_related('booking', 'guest', 'booking__property')
     host_withdrawals = HostWithdrawal.objects.filter(host=request.user)
@@ -236,12 +236,12 @@ def profile(request):
             'failed_payments': guest_payments.filter(status='failed').count(),
         },
         'host_stats': {
-            'total_properties': host_properties.count(),
-            'live_properties': host_properties.filter(is_active=True).count(),
-            'total_bookings': host_bookings.count(),
-            'revenue': _coalesce_decimal(host_bookings.filter(status__in=Booking.REVENUE_ACTIVE_STATUSES).aggregate(total=Sum('total_price'))['total']),
-            'avg_rating': host_properties.aggregate(avg=Avg('average_rating'))['avg'] or 0,
-        },
+            'total_properties': rollup.property_count,
+            'live_properties': rollup.active_property_count,
+            'total_bookings': rollup.booking_count,
+            'revenue': rollup.revenue,
+            'avg_rating': rollup.average_rating,
+        } if rollup else None,
         'host_finance_stats': {
             'payments_received': _coalesce_decimal(host_payments.filter(status='paid').aggregate(total=Sum('amount'))['total']),
             'withdrawn_total': _coalesce_decimal(host_withdrawals.filter(status='paid').aggregate(total=Sum('amount'))['total']),